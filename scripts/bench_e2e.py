@@ -0,0 +1,150 @@
+# scripts/bench_e2e.py
+# Full build_graph() interviews against the scripted fake Ollama (HTTP,
+# streaming, JSON parsing included); reports per-node p50/p95 latency and
+# sessions per second, plus how much of each prompt the server's KV cache
+# could reuse. Exits non-zero when a --max-p95-ms or
+# --min-sessions-per-s budget is missed, so it can gate CI.
+# Usage: python -m scripts.bench_e2e [sessions] [questions] [concurrency] [latency_s] [tokens_per_s] [prompt_tokens_per_s]
+#        [--max-p95-ms=N] [--min-sessions-per-s=N]
+from __future__ import annotations
+import asyncio
+import builtins
+import contextlib
+import io
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from scripts.fake_ollama import start_fake_ollama
+
+# none of these are in the shipped seed bank, so every question is generated
+TOPICS = ["Go", "Rust", "SQL", "Kotlin"]
+# a fixed rotation: the short one forces a follow-up
+ANSWERS = [
+    "It keeps a bounded pool and reuses connections across requests",
+    "not sure",
+    "Use a queue with backpressure and measure tail latency under load",
+]
+
+
+def _pct(samples: List[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * p + 0.5) - 1)] if samples else 0.0
+
+
+async def _session(app, i: int, questions: int, samples: Dict[str, List[float]]) -> None:
+    from src.core.state import new_interview_state
+
+    state = new_interview_state(topics=[TOPICS[i % len(TOPICS)]], max_q=questions, question_type="theory")
+    last = time.perf_counter()
+    # nodes run one after another, so the gap between updates is the node time
+    # each question takes up to 5 steps with a follow-up; LangGraph's default limit is 25
+    config = {"recursion_limit": 6 * questions + 10}
+    async for chunk in app.astream(state, config, stream_mode="updates"):
+        now = time.perf_counter()
+        for node in chunk:
+            samples.setdefault(node, []).append((now - last) * 1000)
+        last = now
+
+
+async def _drive(app, sessions: int, questions: int, concurrency: int, samples) -> float:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with gate:
+            await _session(app, i, questions, samples)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    return time.perf_counter() - t0
+
+
+def run(
+    sessions: int = 20, questions: int = 3, concurrency: int = 4, latency: float = 0.02,
+    tokens_per_s: float = 0.0, prompt_tokens_per_s: float = 0.0,
+) -> Dict:
+    server, url = start_fake_ollama(
+        latency=latency, tokens_per_s=tokens_per_s, prompt_tokens_per_s=prompt_tokens_per_s, num_slots=concurrency,
+    )
+    saved_env = {k: os.environ.get(k) for k in ("OLLAMA_HOST", "OLLAMA_MAX_CONCURRENCY")}
+    os.environ["OLLAMA_HOST"] = url
+    os.environ.setdefault("OLLAMA_MAX_CONCURRENCY", str(concurrency))
+
+    from src.graph.flow import build_graph
+    from src.llm import base as llmbase
+
+    answers = itertools.cycle(ANSWERS)
+    lock = threading.Lock()
+
+    def fake_input(prompt: str = "") -> str:
+        with lock:
+            return next(answers)
+
+    samples: Dict[str, List[float]] = {}
+    real_input = builtins.input
+    builtins.input = fake_input
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            wall = asyncio.run(_drive(build_graph(), sessions, questions, concurrency, samples))
+    finally:
+        builtins.input = real_input
+        llmbase.close_llm()
+        server.shutdown()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    nodes = {
+        node: {"count": len(s), "p50": round(_pct(s, 0.5), 2), "p95": round(_pct(s, 0.95), 2)}
+        for node, s in sorted(samples.items())
+    }
+    return {
+        "sessions": sessions,
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(sessions / wall, 2),
+        "llm_requests": server.requests,
+        "prompt_tokens": server.prompt_tokens,
+        "prompt_tokens_evaluated": server.prompt_tokens_evaluated,
+        "nodes": nodes,
+    }
+
+
+def main(argv: List[str]) -> int:
+    flags = dict(a[2:].split("=", 1) for a in argv if a.startswith("--") and "=" in a)
+    args = [a for a in argv if not a.startswith("--")]
+    report = run(
+        int(args[0]) if len(args) > 0 else 20,
+        int(args[1]) if len(args) > 1 else 3,
+        int(args[2]) if len(args) > 2 else 4,
+        float(args[3]) if len(args) > 3 else 0.02,
+        float(args[4]) if len(args) > 4 else 0.0,
+        float(args[5]) if len(args) > 5 else 0.0,
+    )
+    print(f"sessions={report['sessions']} wall={report['wall_s']}s sessions/s={report['sessions_per_s']} "
+          f"llm_requests={report['llm_requests']}")
+    print(f"prompt tokens={report['prompt_tokens']} evaluated={report['prompt_tokens_evaluated']} "
+          f"({report['prompt_tokens_evaluated'] / max(1, report['prompt_tokens']):.0%})")
+    print(f"{'node':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}")
+    for node, s in report["nodes"].items():
+        print(f"{node:<22}{s['count']:>7}{s['p50']:>10.2f}{s['p95']:>10.2f}")
+
+    failed = False
+    max_p95 = float(flags.get("max-p95-ms", 0))
+    for node, s in report["nodes"].items():
+        if max_p95 and s["p95"] > max_p95:
+            print(f"FAIL: {node} p95 {s['p95']}ms > {max_p95}ms")
+            failed = True
+    min_rate = float(flags.get("min-sessions-per-s", 0))
+    if min_rate and report["sessions_per_s"] < min_rate:
+        print(f"FAIL: {report['sessions_per_s']} sessions/s < {min_rate}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
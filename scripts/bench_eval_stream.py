@@ -0,0 +1,51 @@
+# scripts/bench_eval_stream.py
+# Tokens generated and wall time of evaluate_answer with and without early
+# stopping, against a fake Ollama that keeps writing prose after the JSON.
+# Usage: python -m scripts.bench_eval_stream [calls] [ms_per_token]
+from __future__ import annotations
+import os
+import statistics
+import sys
+import time
+
+from scripts.fake_ollama import EVAL_REPLY, start_fake_ollama
+from src.llm import base as llmbase
+from src.services import evaluate
+
+TRAILER = " ".join(["Overall the candidate shows a reasonable grasp of the topic."] * 15)
+
+
+def _run(calls: int, early_stop: bool, server) -> tuple:
+    evaluate.EVAL_EARLY_STOP = early_stop
+    server.tokens_sent = 0
+    samples = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        result = evaluate.evaluate_answer("Python", f"What is a generator? ({i})", "It yields values lazily.")
+        samples.append((time.perf_counter() - t0) * 1000)
+        assert result["overall"] == 6, result
+    return samples, server.tokens_sent / calls
+
+
+def main(calls: int = 20, ms_per_token: float = 5.0) -> None:
+    server, url = start_fake_ollama(reply=f"{EVAL_REPLY}\n\n{TRAILER}", token_delay=ms_per_token / 1000)
+    os.environ["OLLAMA_HOST"] = url
+    try:
+        results = {}
+        for label, early in (("full", False), ("early-stop", True)):
+            samples, tokens = _run(calls, early, server)
+            results[label] = statistics.mean(samples)
+            print(f"{label:<11} mean={statistics.mean(samples):.1f}ms p50={statistics.median(samples):.1f}ms "
+                  f"tokens/call={tokens:.1f}")
+        saved = results["full"] - results["early-stop"]
+        print(f"Saved per evaluation: {saved:.1f}ms ({saved / results['full'] * 100:.1f}%)")
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5.0,
+    )
@@ -0,0 +1,75 @@
+# scripts/bench_json_mode.py
+# Prompt tokens and parse failure rate of grading and summary calls in the
+# default (prompted JSON) mode vs structured output (schema as `format`).
+# Usage: python -m scripts.bench_json_mode [calls] [--live]
+#   --live uses OLLAMA_HOST/OLLAMA_MODEL (needs Ollama >= 0.5); default is the fake server
+from __future__ import annotations
+import os
+import sys
+
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+from src.services import evaluate, summary
+from src.utils import metrics
+
+SAMPLES = [
+    ("Python", "What does the GIL protect?", "It protects interpreter state so only one thread runs bytecode at a time."),
+    ("Python", "When would you use a generator?", "For large or infinite sequences, since values are produced lazily."),
+    ("SQL", "What is an index?", "idk"),
+    ("Go", "How do channels differ from mutexes?", "Channels pass ownership of data; mutexes guard shared memory."),
+]
+
+
+def _mean(name: str) -> float:
+    obs = metrics.snapshot()["observations"].get(name)
+    return obs["sum"] / obs["count"] if obs else 0.0
+
+
+def _rate(kind: str) -> str:
+    calls = metrics.counter(f"{kind}.parses")
+    return f"{metrics.counter(f'{kind}.parse_failures') / calls:.1%}" if calls else "n/a"
+
+
+def _run(calls: int, structured: bool) -> None:
+    evaluate.STRUCTURED_OUTPUT = summary.STRUCTURED_OUTPUT = structured
+    # usage counts arrive on the final message, which early stopping skips
+    evaluate.EVAL_EARLY_STOP = False
+    metrics.reset()
+    evals = []
+    for i in range(calls):
+        topic, question, answer = SAMPLES[i % len(SAMPLES)]
+        evals.append(evaluate.evaluate_answer(topic, f"{question} ({i})", answer))
+    eval_prompt = _mean("llm.prompt_tokens")
+    eval_out = _mean("llm.eval_tokens")
+    eval_failures = _rate("eval")
+
+    metrics.reset()
+    digest = None
+    for ev in evals[:4]:
+        digest = summary.add_to_digest(digest, ev)
+    for _ in range(max(1, calls // 4)):
+        summary.generate_summary("Mixed", digest, 4)
+    label = "structured" if structured else "prompted"
+    print(f"{label:<10} eval: prompt_tokens={eval_prompt:.0f} output_tokens={eval_out:.0f} "
+          f"parse_failures={eval_failures} | summary: prompt_tokens={_mean('llm.prompt_tokens'):.0f} "
+          f"parse_failures={_rate('summary')}")
+
+
+def main(calls: int = 20, live: bool = False) -> None:
+    server = None
+    if not live:
+        # no simulated KV cache: compare whole prompt sizes
+        server, url = start_fake_ollama(num_slots=0)
+        os.environ["OLLAMA_HOST"] = url
+    try:
+        _run(calls, structured=False)
+        _run(calls, structured=True)
+    finally:
+        llmbase.close_llm()
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(int(args[0]) if args else 20, "--live" in sys.argv)
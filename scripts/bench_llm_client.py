@@ -0,0 +1,54 @@
+# scripts/bench_llm_client.py
+# Per-call overhead of a fresh OllamaClient per call vs the pooled build_llm() client.
+# Usage: python -m scripts.bench_llm_client [calls]
+from __future__ import annotations
+import os
+import statistics
+import sys
+import time
+
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+from src.llm.ollama_client import OllamaClient
+
+MESSAGES = [{"role": "user", "content": "Respond with exactly: pong"}]
+
+
+def _timed(fn, calls: int):
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _report(label: str, samples, connections: int) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<10} mean={statistics.mean(samples):.3f}ms p50={statistics.median(samples):.3f}ms "
+          f"p95={p95:.3f}ms connections={connections}")
+
+
+def main(calls: int = 500) -> None:
+    server, url = start_fake_ollama()
+    os.environ["OLLAMA_HOST"] = url
+    try:
+        server.connections.clear()
+        before = _timed(lambda: OllamaClient().chat(MESSAGES), calls)
+        _report("fresh", before, len(server.connections))
+
+        server.connections.clear()
+        llmbase.build_llm().chat(MESSAGES)
+        after = _timed(lambda: llmbase.build_llm().chat(MESSAGES), calls)
+        _report("pooled", after, len(server.connections))
+
+        saved = statistics.mean(before) - statistics.mean(after)
+        print(f"Saved per call: {saved:.3f}ms ({saved / statistics.mean(before) * 100:.1f}%)")
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,75 @@
+# scripts/bench_parsing.py
+# Extract + validate cost on adversarial model output: the old rescanning
+# extractor + json.loads + normalize_eval vs parse_json_block with the
+# TypeAdapter as its check (one validate_json per candidate).
+# Usage: python -m scripts.bench_parsing [size]
+from __future__ import annotations
+import json
+import sys
+import time
+
+from src.core.scoring import normalize_eval
+from src.services.evaluate import _parse_eval
+
+VALID = '{"accuracy": 7, "clarity": 8, "depth": 6, "overall": 7, "followup_needed": false}'
+
+
+def legacy_extract(text: str) -> str:
+    # the pre-refactor _extract_json_block scan (fence handling omitted)
+    start = text.find("{")
+    while start != -1:
+        depth, in_str, esc = 0, False, False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_str:
+                if esc:
+                    esc = False
+                elif ch == "\\":
+                    esc = True
+                elif ch == '"':
+                    in_str = False
+                continue
+            if ch == '"':
+                in_str = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        start = text.find("{", start + 1)
+    return "{}"
+
+
+def legacy_parse(raw: str) -> dict:
+    try:
+        parsed = json.loads(legacy_extract(raw))
+    except Exception:
+        parsed = {}
+    return normalize_eval(parsed if isinstance(parsed, dict) else {})
+
+
+def cases(n: int):
+    yield "unclosed braces", "{" * n + VALID
+    yield "echoed code", "Your code `" + "if (x) { y(); } " * (n // 16) + "` is fine. " + VALID
+    yield "brace strings", '{"rationale": "' + "}{" * (n // 2) + '", "accuracy": 5}'
+    yield "clean reply", VALID
+
+
+def _time(fn, text: str):
+    t0 = time.perf_counter()
+    out = fn(text)
+    # "found" = the grading object was recovered rather than defaulted to zeros
+    return (time.perf_counter() - t0) * 1000, out["accuracy"] > 0
+
+
+def main(size: int = 4000) -> None:
+    print(f"{'case':<16} {'chars':>8} {'legacy ms':>10} {'found':>6} {'new ms':>8} {'found':>6}")
+    for label, text in cases(size):
+        old, old_ok = _time(legacy_parse, text)
+        new, new_ok = _time(lambda t: _parse_eval(t, "Python", "q", "a"), text)
+        print(f"{label:<16} {len(text):>8} {old:>10.2f} {old_ok!s:>6} {new:>8.2f} {new_ok!s:>6}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
@@ -0,0 +1,104 @@
+# scripts/bench_pool.py
+# Several fake Ollama boxes of different speeds behind one OLLAMA_HOST list:
+# throughput and latency under round-robin vs least-outstanding-requests
+# routing, then how much prompt evaluation session affinity saves when each
+# session's conversation grows turn by turn (the KV-cache reuse it buys).
+# Usage: python -m scripts.bench_pool [calls] [concurrency]
+from __future__ import annotations
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+from src.llm import resilience
+from src.utils import logging as tracing
+
+# two fast boxes and one that is five times slower (older GPU, bigger quant)
+LATENCIES = (0.03, 0.03, 0.15)
+SYSTEM = "You are a senior interviewer. " * 40
+
+
+def _pct(samples: List[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def _start(latencies=LATENCIES, **kwargs):
+    started = [start_fake_ollama(latency=s, **kwargs) for s in latencies]
+    os.environ["OLLAMA_HOST"] = ",".join(url for _, url in started)
+    resilience.reset()
+    return [server for server, _ in started]
+
+
+def _stop(servers) -> None:
+    llmbase.close_llm()
+    for server in servers:
+        server.shutdown()
+
+
+def _throughput(policy: str, calls: int, concurrency: int) -> None:
+    os.environ["LLM_POOL_POLICY"] = policy
+    servers = _start(reply="pong")
+    llm = llmbase.build_llm()
+
+    def one(i: int) -> float:
+        t0 = time.perf_counter()
+        llm.chat([{"role": "user", "content": f"question {i}"}])
+        return (time.perf_counter() - t0) * 1000
+
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, range(calls)))
+        wall = time.perf_counter() - t0
+    finally:
+        _stop(servers)
+    share = "/".join(str(s.requests) for s in servers)
+    print(f"{policy:<12} {calls / wall:6.1f} calls/s p50={_pct(samples, 0.5):.0f}ms "
+          f"p95={_pct(samples, 0.95):.0f}ms per host={share}")
+
+
+def _affinity(on: bool, sessions: int, turns: int) -> None:
+    os.environ["LLM_POOL_POLICY"] = "least"
+    os.environ["LLM_POOL_AFFINITY"] = "1" if on else "0"
+    # equal boxes here, so only the KV cache differs; prompt evaluation at
+    # 2000 tokens/s is CPU-offload territory, where reuse matters most
+    servers = _start((0.03, 0.03, 0.03), reply="A short answer.", prompt_tokens_per_s=2000)
+    llm = llmbase.build_llm()
+
+    def session(n: int) -> None:
+        tracing.set_session(f"s-{n}")
+        messages: List[Dict] = [{"role": "system", "content": SYSTEM}]
+        for turn in range(turns):
+            messages.append({"role": "user", "content": f"Session {n} answer {turn}: " + "detail " * 30})
+            messages.append({"role": "assistant", "content": llm.chat(messages)})
+
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            list(pool.map(session, range(sessions)))
+        wall = time.perf_counter() - t0
+    finally:
+        _stop(servers)
+    total = sum(s.prompt_tokens for s in servers)
+    evaluated = sum(s.prompt_tokens_evaluated for s in servers)
+    print(f"affinity {'on ' if on else 'off'} prompt tokens evaluated {evaluated}/{total} "
+          f"({evaluated / total:.0%}) in {wall:.2f}s")
+
+
+def main(calls: int = 300, concurrency: int = 8) -> None:
+    print(f"hosts with time to first token {', '.join(f'{s * 1000:.0f}ms' for s in LATENCIES)}; "
+          f"{calls} calls at concurrency {concurrency}")
+    _throughput("round_robin", calls, concurrency)
+    _throughput("least", calls, concurrency)
+    print("8 sessions x 6 turns of growing conversations on three equal hosts:")
+    _affinity(False, 8, 6)
+    _affinity(True, 8, 6)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 300, int(args[1]) if len(args) > 1 else 8)
@@ -0,0 +1,80 @@
+# scripts/bench_pregrade.py
+# Share of grading calls the reference-answer pre-grader settles locally, and
+# how its verdicts line up with the scores the LLM gave in logged sessions.
+# A labelled self-check over the seed bank follows, because most logged
+# questions are generated rather than seeds and so have no reference.
+# Usage: python -m scripts.bench_pregrade [runs_dir]
+from __future__ import annotations
+import sys
+import time
+from collections import Counter
+
+from src.services import pregrade, questions
+from src.services.regrade import load_sessions
+
+
+def _agrees(decision: str, original: float) -> bool:
+    # empty and off-topic answers should have been graded low
+    return original <= 3
+
+
+def _logged(directory: str) -> None:
+    pairs = load_sessions(directory)
+    decided = Counter()
+    scored = agree = 0
+    for p in pairs:
+        decision = pregrade.assess(p["question"], p["answer"])["decision"]
+        decided[decision or "deferred"] += 1
+        if decision and p["original"] is not None:
+            scored += 1
+            agree += _agrees(decision, p["original"])
+    total = len(pairs)
+    skipped = total - decided["deferred"]
+    print(f"{directory}: {total} answers, LLM calls avoided {skipped}"
+          f" ({skipped / total:.0%})" if total else f"{directory}: no answers")
+    print(f"  decisions: {dict(decided)}")
+    print(f"  agreement with LLM scores: {agree}/{scored}" if scored else "  agreement: no scored pre-graded answers")
+
+
+def _samples():
+    # (topic, question, answer, expected) built from the seed references
+    seeds = [(topic, questions._seed_text(e), e) for topic, types in questions._load_seeds().items()
+             for bucket in types.values() for e in bucket if isinstance(e, dict) and e.get("reference")]
+    for i, (topic, question, entry) in enumerate(seeds):
+        other = seeds[(i + len(seeds) // 2) % len(seeds)][2]["reference"]
+        words = entry["reference"].split()
+        # looks complete, but only the grader can tell whether it is right
+        yield topic, question, entry["reference"], None
+        yield topic, question, other, "off_topic"
+        yield topic, question, "", "empty"
+        yield topic, question, " ".join(words[:len(words) // 3]), None
+        yield topic, question, " ".join(entry["concepts"]), None
+
+
+def _self_check() -> None:
+    right = wrong = 0
+    confusion = Counter()
+    t0 = time.perf_counter()
+    samples = list(_samples())
+    for topic, question, answer, expected in samples:
+        decision = pregrade.assess(question, answer)["decision"]
+        confusion[(expected or "deferred", decision or "deferred")] += 1
+        if decision == expected:
+            right += 1
+        elif decision is not None:
+            # settling a case that should have gone to the LLM is the costly miss
+            wrong += 1
+    per_call = (time.perf_counter() - t0) / len(samples) * 1e6
+    print(f"seed self-check: {right}/{len(samples)} as expected, {wrong} wrong local verdicts, "
+          f"{per_call:.0f} us per answer")
+    for (expected, got), n in sorted(confusion.items()):
+        print(f"  expected {expected:<9} got {got:<9} {n}")
+
+
+def main(directory: str = "runs") -> None:
+    _logged(directory)
+    _self_check()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "runs")
@@ -0,0 +1,81 @@
+# scripts/bench_resilience.py
+# Tail latency of LLM calls when a share of requests stall (a GC pause, a
+# model reload, a stuck slot): plain calls vs hedged calls, and the per-call
+# overhead of the resilience wrapper on a healthy server.
+# Usage: python -m scripts.bench_resilience [calls] [stall_rate] [stall_s]
+from __future__ import annotations
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+from src.llm import resilience
+from src.utils import metrics
+from src.utils.logging import call_kind
+
+MESSAGES = [{"role": "user", "content": "Ask one interview question about Go"}]
+
+
+@call_kind("question")
+def _call() -> float:
+    t0 = time.perf_counter()
+    llmbase.build_llm().chat(MESSAGES)
+    return (time.perf_counter() - t0) * 1000
+
+
+def _pct(samples: List[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def _run(label: str, calls: int, stall_rate: float, stall_s: float, hedge: bool) -> None:
+    server, url = start_fake_ollama(latency=0.03, tokens_per_s=400)
+    server.stall_rate, server.stall_s = stall_rate, stall_s
+    os.environ["OLLAMA_HOST"] = url
+    resilience.reset()
+    os.environ["LLM_HEDGE"] = "question" if hedge else "0"
+    metrics.reset()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            samples = list(pool.map(lambda _: _call(), range(calls)))
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+    extra = server.requests / calls - 1
+    print(f"{label:<8} p50={_pct(samples, 0.5):.0f}ms p95={_pct(samples, 0.95):.0f}ms p99={_pct(samples, 0.99):.0f}ms "
+          f"max={max(samples):.0f}ms hedges={metrics.counter('llm.hedges'):g} "
+          f"wins={metrics.counter('llm.hedge_wins'):g} extra_requests={extra:.1%}")
+
+
+def _overhead(calls: int) -> None:
+    server, url = start_fake_ollama()
+    os.environ["OLLAMA_HOST"] = url
+    try:
+        wrapped = llmbase.build_llm()
+        raw = wrapped.inner
+        for label, client in (("raw", raw), ("wrapped", wrapped)):
+            t0 = time.perf_counter()
+            for _ in range(calls):
+                client.chat(MESSAGES)
+            print(f"{label:<8} {(time.perf_counter() - t0) / calls * 1e6:.0f} us per call on a healthy server")
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+
+def main(calls: int = 400, stall_rate: float = 0.03, stall_s: float = 2.0) -> None:
+    # a hedge needs a free host slot; with every slot taken it only queues
+    os.environ.setdefault("OLLAMA_MAX_CONCURRENCY", "8")
+    print(f"{calls} calls, concurrency 4, {stall_rate:.0%} of requests stall for {stall_s}s")
+    _run("plain", calls, stall_rate, stall_s, hedge=False)
+    _run("hedged", calls, stall_rate, stall_s, hedge=True)
+    _overhead(500)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 400, float(args[1]) if len(args) > 1 else 0.03,
+         float(args[2]) if len(args) > 2 else 2.0)
@@ -0,0 +1,71 @@
+# scripts/bench_routes.py
+# Per-route LLM latency with everything on one large model vs a tiered
+# routing table (follow-ups and digest folds on a small, fast model served
+# over the OpenAI-compatible API, grading/questions/summary left on the large
+# one). Both models are scripted fakes with different speeds; latencies come
+# from the trace spans (call kind x model), plus bench_e2e's per-node figures.
+# Usage: python -m scripts.bench_routes [sessions] [questions] [concurrency]
+from __future__ import annotations
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+from scripts import bench_e2e
+from scripts.fake_ollama import start_fake_ollama
+from src.utils import logging as tracing
+
+# (latency_s, tokens_per_s, prompt_tokens_per_s)
+LARGE = (0.06, 40.0, 1500.0)
+SMALL = (0.015, 160.0, 6000.0)
+TIERED = {"LLM_ROUTE_FOLLOWUP": "openai:small", "LLM_ROUTE_DIGEST": "openai:small"}
+
+
+def _spans(path: str) -> Dict[Tuple[str, str], List[float]]:
+    out: Dict[Tuple[str, str], List[float]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            if rec["kind"] in ("chat", "stream") and not rec.get("cache_hit"):
+                out.setdefault((rec.get("call") or "-", rec.get("model") or "-"), []).append(rec["wall_ms"])
+    return out
+
+
+def _run(label: str, routes: Dict[str, str], sessions: int, questions: int, concurrency: int) -> None:
+    small, url = start_fake_ollama(latency=SMALL[0], tokens_per_s=SMALL[1], prompt_tokens_per_s=SMALL[2])
+    env = {"OPENAI_BASE_URL": url + "/v1", "OLLAMA_MODEL": "large", **routes}
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    tracing.configure(True, path)
+    try:
+        report = bench_e2e.run(sessions, questions, concurrency, *LARGE)
+    finally:
+        tracing.configure(False)
+        small.shutdown()
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    spans = _spans(path)
+    os.remove(path)
+
+    print(f"{label}: sessions/s={report['sessions_per_s']} wall={report['wall_s']}s")
+    print(f"  {'route':<20}{'model':<8}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}")
+    for (call, model), s in sorted(spans.items()):
+        print(f"  {call:<20}{model:<8}{len(s):>7}{bench_e2e._pct(s, 0.5):>10.1f}{bench_e2e._pct(s, 0.95):>10.1f}")
+    nodes = report["nodes"]
+    print("  node p50 ms: " + ", ".join(f"{n}={s['p50']:.1f}" for n, s in nodes.items() if n in ("followup", "evaluate", "summary")))
+
+
+def main(sessions: int = 12, questions: int = 3, concurrency: int = 4) -> None:
+    _run("single model", {}, sessions, questions, concurrency)
+    _run("tiered", TIERED, sessions, questions, concurrency)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
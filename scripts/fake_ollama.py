@@ -0,0 +1,257 @@
+# scripts/fake_ollama.py
+from __future__ import annotations
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# the scripted replies live with the in-process fake backend; the constants
+# are imported here too because tests and benchmarks take them from this module
+from src.llm.fake_client import EVAL_REPLY, FOLLOWUP_REPLY, QUESTION_REPLY, SUMMARY_REPLY, reply_for
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def _prompt_tokens(messages: List[Dict]) -> List[str]:
+    out: List[str] = []
+    for m in messages:
+        out.append(f"<{m.get('role', 'user')}>")
+        out.extend(_tokens(str(m.get("content", ""))))
+    return out
+
+
+def _common_prefix(a: List[str], b: List[str]) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, payload: dict) -> None:
+        self._write_chunk((json.dumps(payload) + "\n").encode("utf-8"))
+
+    def _send_event(self, payload: object) -> None:
+        # OpenAI-style server-sent event
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        self._write_chunk(f"data: {data}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_GET(self):
+        if self.server.down:
+            self._send_json({"error": "unavailable"}, status=503)
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-fake"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": [{"name": "fake"}]})
+        elif self.path == "/v1/models":
+            self._send_json({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        if self.path not in ("/api/chat", "/v1/chat/completions"):
+            self._send_json({"error": "not found"}, status=404)
+            return
+        # the same server also speaks the OpenAI-compatible API of llama.cpp
+        # and vLLM, so one fake covers every HTTP backend
+        openai = self.path.startswith("/v1/")
+        if self.server.down:
+            # a box that is up but not serving (model failed to load, draining)
+            self._send_json({"error": "unavailable"}, status=503)
+            return
+        self.server.connections.add(self.client_address)
+        self.server.requests += 1
+        self.server.paths[self.path] = self.server.paths.get(self.path, 0) + 1
+        # fault injection: the next fail_next requests get a 500, the next
+        # stall_next ones (and a stall_rate share of the rest) hang for
+        # stall_s before being served
+        with self.server.lock:
+            fail = self.server.fail_next > 0
+            stall = not fail and self.server.stall_next > 0
+            self.server.fail_next -= fail
+            self.server.stall_next -= stall
+            stall = stall or (not fail and self.server.rng.random() < self.server.stall_rate)
+        if fail:
+            self._send_json({"error": "injected failure"}, status=500)
+            return
+        if stall:
+            time.sleep(self.server.stall_s)
+        self.server.keep_alive = req.get("keep_alive")
+        t0 = time.perf_counter_ns()
+        messages = req.get("messages", [])
+        fmt = req.get("format")
+        if openai:
+            fmt = (req.get("response_format") or {}).get("json_schema", {}).get("schema")
+        reply = self.server.reply or reply_for(messages, fmt, self.server.occurrence(messages))
+        prompt = _prompt_tokens(messages)
+        prompt_tokens = len(prompt) - self.server.cached_prefix(prompt)
+        model = req.get("model", "fake")
+        pause = self.server.latency + prompt_tokens * self.server.prompt_token_delay
+        if pause:
+            time.sleep(pause)
+        t_prompt = time.perf_counter_ns()
+        tokens = _tokens(reply)
+        delay = self.server.token_delay
+
+        def final(content: str) -> dict:
+            # the timing fields a real server reports, in nanoseconds
+            now = time.perf_counter_ns()
+            return {"model": model, "message": {"role": "assistant", "content": content}, "done": True,
+                    "prompt_eval_count": prompt_tokens, "eval_count": len(tokens),
+                    "total_duration": now - t0, "load_duration": 0,
+                    "prompt_eval_duration": t_prompt - t0, "eval_duration": now - t_prompt}
+
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+
+        if not req.get("stream", not openai):
+            if delay:
+                time.sleep(delay * len(tokens))
+            self.server.tokens_sent += len(tokens)
+            if openai:
+                self._send_json({"object": "chat.completion", "model": model, "usage": usage, "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}]})
+            else:
+                self._send_json(final(reply))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if openai else "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for tok in tokens:
+                if delay:
+                    time.sleep(delay)
+                if openai:
+                    self._send_event({"object": "chat.completion.chunk", "model": model,
+                                      "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}]})
+                else:
+                    self._send_chunk({"model": model, "message": {"role": "assistant", "content": tok}, "done": False})
+                self.server.tokens_sent += 1
+            if openai:
+                if (req.get("stream_options") or {}).get("include_usage"):
+                    self._send_event({"object": "chat.completion.chunk", "model": model, "choices": [], "usage": usage})
+                self._send_event("[DONE]")
+            else:
+                self._send_chunk(final(""))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def handle_error(self, request, client_address):
+        # clients closing timed-out or hedged requests early is expected
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def cached_prefix(self, prompt: List[str]) -> int:
+        # like Ollama's multi-slot KV cache: the prompt reuses the longest
+        # prefix it shares with any slot. It takes over that slot only when it
+        # extends the slot's whole prompt; otherwise the prefix is copied into
+        # the least recently used slot, so other cached prompts survive
+        with self.lock:
+            self.prompt_tokens += len(prompt)
+            if not self.num_slots:
+                self.prompt_tokens_evaluated += len(prompt)
+                return 0
+            best, slot = 0, 0
+            for i, cached in enumerate(self.slots):
+                n = _common_prefix(cached, prompt)
+                if n > best:
+                    best, slot = n, i
+            if best and best == len(self.slots[slot]):
+                self.slots.pop(slot)
+            elif len(self.slots) >= self.num_slots:
+                self.slots.pop(0)
+            self.slots.append(prompt)
+            self.prompt_tokens_evaluated += len(prompt) - best
+        return best
+
+    def occurrence(self, messages: List[Dict]) -> int:
+        key = json.dumps(messages, sort_keys=True)
+        with self.lock:
+            n = self.seen.get(key, 0)
+            self.seen[key] = n + 1
+        return n
+
+
+def start_fake_ollama(
+    port: int = 0, reply: Optional[str] = None, latency: float = 0.0, token_delay: float = 0.0,
+    tokens_per_s: float = 0.0, prompt_tokens_per_s: float = 0.0, num_slots: int = 4,
+) -> Tuple[ThreadingHTTPServer, str]:
+    # latency is the time to first token; token_delay (or 1 / tokens_per_s)
+    # paces generation per token, so early-closed streams really do stop
+    # "decoding" (tokens_sent stops growing). prompt_tokens_per_s adds the
+    # cost of evaluating the uncached part of each prompt across num_slots
+    # KV-cache slots (0 turns the cache off, so every prompt token counts)
+    if tokens_per_s:
+        token_delay = 1.0 / tokens_per_s
+    server = FakeOllamaServer(("127.0.0.1", port), FakeOllamaHandler)
+    server.lock = threading.Lock()
+    server.seen = {}
+    server.reply = reply
+    server.latency = latency
+    server.token_delay = token_delay
+    server.prompt_token_delay = 1.0 / prompt_tokens_per_s if prompt_tokens_per_s else 0.0
+    server.num_slots = max(0, num_slots)
+    server.slots = []
+    server.prompt_tokens = 0
+    server.prompt_tokens_evaluated = 0
+    server.tokens_sent = 0
+    server.connections = set()
+    server.requests = 0
+    server.paths = {}
+    server.fail_next = 0
+    server.stall_next = 0
+    server.stall_s = 0.0
+    server.stall_rate = 0.0
+    server.rng = random.Random(7)
+    server.down = False
+    server.keep_alive = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    # Usage: python -m scripts.fake_ollama [port] [latency_s] [tokens_per_s]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 11434
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    tokens_per_s = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    server, url = start_fake_ollama(port, latency=latency, tokens_per_s=tokens_per_s)
+    print(f"Fake Ollama listening on {url} (latency {latency}s, {tokens_per_s or 'unlimited'} tokens/s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,94 @@
+# scripts/load_test_server.py
+# Drives many concurrent interviews through `serve` backed by the fake Ollama.
+# Usage: python -m scripts.load_test_server [sessions] [questions] [latency_s]
+from __future__ import annotations
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from scripts.fake_ollama import start_fake_ollama
+
+
+def _pct(samples, p: float) -> float:
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * p) - 1)] if samples else 0.0
+
+
+async def _interview(client: httpx.AsyncClient, questions: int, ttft, answer_lat) -> None:
+    sid = (await client.post("/sessions", json={"topics": ["Go"], "questions": questions, "type": "theory"})).json()["session_id"]
+    turn_start = time.perf_counter()
+    first_token = None
+    async with client.stream("GET", f"/sessions/{sid}/events") as resp:
+        async for line in resp.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+                continue
+            if not line.startswith("data: "):
+                continue
+            data = json.loads(line[6:])
+            if event == "token" and first_token is None:
+                first_token = time.perf_counter()
+                ttft.append((first_token - turn_start) * 1000)
+            elif event == "waiting":
+                first_token = None
+                t0 = time.perf_counter()
+                r = await client.post(f"/sessions/{sid}/answer", json={"answer": "Go uses goroutines and channels for this"})
+                r.raise_for_status()
+                answer_lat.append((time.perf_counter() - t0) * 1000)
+                turn_start = time.perf_counter()
+            elif event in ("done", "error"):
+                if event == "error":
+                    raise RuntimeError(data)
+                break
+
+
+async def _drive(base_url: str, sessions: int, questions: int) -> None:
+    ttft, answer_lat = [], []
+    limits = httpx.Limits(max_connections=sessions * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_interview(client, questions, ttft, answer_lat) for _ in range(sessions)))
+        wall = time.perf_counter() - t0
+    print(f"sessions={sessions} questions={questions} wall={wall:.2f}s sessions/s={sessions / wall:.2f}")
+    print(f"time-to-first-token ms: p50={_pct(ttft, 0.5):.1f} p95={_pct(ttft, 0.95):.1f}")
+    print(f"POST /answer ms:        p50={_pct(answer_lat, 0.5):.1f} p95={_pct(answer_lat, 0.95):.1f} "
+          f"mean={statistics.mean(answer_lat):.1f}")
+
+
+def main(sessions: int = 100, questions: int = 3, latency: float = 0.05) -> None:
+    fake, fake_url = start_fake_ollama(latency=latency)
+    os.environ["OLLAMA_HOST"] = fake_url
+    os.environ.setdefault("OLLAMA_MAX_CONCURRENCY", "32")
+
+    from src.server import create_app
+
+    config = uvicorn.Config(create_app(), host="127.0.0.1", port=0, log_level="warning", timeout_keep_alive=60)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    try:
+        asyncio.run(_drive(f"http://127.0.0.1:{port}", sessions, questions))
+    finally:
+        server.should_exit = True
+        thread.join()
+        fake.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 100,
+        int(args[1]) if len(args) > 1 else 3,
+        float(args[2]) if len(args) > 2 else 0.05,
+    )
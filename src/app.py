@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 import typer
 from rich import print
 
-from .llm.base import build_llm
+from .llm.base import build_llm, route
 
 app = typer.Typer(help="AI Interviewer — CLI", no_args_is_help=True)
 
@@ -28,7 +28,7 @@ def ping(text: List[str] = typer.Argument(None, metavar="TEXT...", help="Prompt
         {"role": "user", "content": prompt},
     ]
     reply = llm.chat(messages)
-    print(f"[bold cyan]Model ({os.getenv('OLLAMA_MODEL','mistral')}):[/] {reply}")
+    print(f"[bold cyan]Model ({getattr(llm, 'model', 'unknown')}):[/] {reply}")
 
 
 @app.command("ask-one")
@@ -112,35 +112,47 @@ def interview(
     qtype: str = typer.Option("mixed", "--type", "-y", help="coding|theory|design|debugging|mixed"),
     log_json: Optional[str] = typer.Option(None, "--log-json", help="Path to save the full interview session as JSON"),
     stdin_mode: bool = typer.Option(False, "--stdin", help="Type answers in stdin (multi-line; end with blank line)"),
+    plan: bool = typer.Option(False, "--plan", help="Generate all main questions concurrently before the first one"),
+    speculate: bool = typer.Option(False, "--speculate", help="Draft follow-ups in parallel with grading when an answer looks weak"),
+    summary: str = typer.Option("llm", "--summary", help="llm | local (computed from the evaluations, no model call)"),
 ):
 
     load_dotenv()
-    from .graph.flow import build_graph
+    if summary not in ("llm", "local"):
+        print(f"[bold red]Unknown --summary mode: {summary} (use llm or local).[/]")
+        raise typer.Exit(code=1)
+    from uuid import uuid4
+    from .graph import flow
+    from .graph.flow import build_graph, speculation_stats
+    from .core.state import new_interview_state
+    from .utils import metrics
+    from .utils import logging as tracing
+    # TRACE / TRACE_PATH may come from .env, which loads after the first import
+    tracing.configure_from_env()
+    tracing.set_session(uuid4().hex)
     topics_list = [t.strip() for t in topics.split(",") if t.strip()] if topics else [topic]
 
-    init_state: Dict = {
-    "topics": topics_list,
-    "topic_index": 0,
-    "difficulty": difficulty,
-    "max_q": questions,
-    "asked": [],
-    "answers": [],
-    "evals": [],
-    "followup_mode": False,
-    "followup_depth": 0,
-    "done": False,
-    "question_type": qtype,
-    "stdin_mode": stdin_mode,
-    "difficulty_counts": {"easy": 0, "medium": 0, "hard": 0},
-    "steps": 0, 
-    "topic_performance": {},
-    }
-
-
-        
+    init_state = new_interview_state(
+        topics=topics_list,
+        difficulty=difficulty,
+        max_q=questions,
+        question_type=qtype,
+        stdin_mode=stdin_mode,
+        plan_ahead=plan,
+        speculate=speculate,
+        summary_mode=summary,
+    )
+
+    flow.CONSOLE = True
     graph = build_graph()
     final_state = graph.invoke(init_state)
 
+    if speculate:
+        print(f"Speculation: {speculation_stats()}")
+    ttft = metrics.snapshot()["observations"].get("llm.ttft_ms")
+    if ttft:
+        print(f"Time to first token: avg {ttft['sum'] / ttft['count']:.0f} ms, max {ttft['max']:.0f} ms over {ttft['count']} streamed calls")
+
     if log_json:
         path = Path(log_json)
         path.parent.mkdir(parents=True, exist_ok=True)
@@ -149,5 +161,164 @@ def interview(
         print(f"Saved session to {path}")
 
 
+@app.command("warm-bank")
+def warm_bank_cmd(
+    topics: str = typer.Option(..., "--topics", help="Comma-separated topics, e.g., Python,JavaScript"),
+    difficulties: str = typer.Option("easy,medium,hard", "--difficulties", help="Comma-separated difficulties"),
+    types: str = typer.Option("coding,theory,design,debugging", "--types", help="Comma-separated question types"),
+    per_combo: int = typer.Option(5, "--per-combo", "-n", min=1, help="Target questions per (topic, difficulty, type)"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="Parallel LLM requests"),
+    path: Optional[str] = typer.Option(None, "--path", help="Seed bank file (defaults to QUESTION_SEED_PATH)"),
+):
+    load_dotenv()
+    import time
+    from .services.bank import warm_bank
+
+    def split(value: str) -> List[str]:
+        return [v.strip() for v in value.split(",") if v.strip()]
+
+    def progress(topic, difficulty, qtype, added, missing):
+        print(f"  {topic} / {difficulty} / {qtype}: +{added} of {missing} missing")
+
+    t0 = time.perf_counter()
+    stats = warm_bank(
+        topics=split(topics),
+        difficulties=split(difficulties),
+        types=split(types),
+        per_combo=per_combo,
+        concurrency=concurrency,
+        path=path,
+        progress=progress,
+    )
+    print(f"[bold green]Bank warmed[/] in {time.perf_counter() - t0:.1f}s → {stats}")
+
+
+@app.command("grade-batch")
+def grade_batch_cmd(
+    source: str = typer.Argument("-", help="JSONL of {topic, question, answer[, id]} records; - reads stdin"),
+    out: str = typer.Option(..., "--out", "-o", help="Results JSONL; appended to, and records already in it are skipped"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="Parallel grading requests"),
+    ordered: bool = typer.Option(True, "--ordered/--as-completed", help="Write results in input order or as they finish"),
+):
+    load_dotenv()
+    import sys
+    import time
+    from .services.grading import completed_ids, count_records, grade_batch, read_records
+
+    done = completed_ids(out)
+    total = None if source == "-" else max(0, count_records(source) - len(done))
+    last = [0.0]
+
+    def progress(stats):
+        now = time.perf_counter()
+        if now - last[0] < 1.0:
+            return
+        last[0] = now
+        n = stats["graded"] + stats["failed"]
+        rate = n / stats["elapsed"] if stats["elapsed"] else 0.0
+        line = f"  {n}{f'/{total}' if total else ''} graded, {rate:.1f}/s"
+        if total and rate:
+            line += f", ETA {max(0, total - n) / rate:.0f}s"
+        print(line)
+
+    if done:
+        print(f"Resuming: {len(done)} records already in {out}")
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    f_in = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        with open(out, "a", encoding="utf-8") as f_out:
+            stats = grade_batch(read_records(f_in), f_out, concurrency=concurrency, ordered=ordered, skip=done, progress=progress)
+    finally:
+        if f_in is not sys.stdin:
+            f_in.close()
+    print(f"[bold green]Graded[/] {stats['graded']} ({stats['failed']} failed, {stats['skipped']} already done) in {stats['elapsed_s']}s → {stats['per_s']}/s")
+    if stats["failed"]:
+        raise typer.Exit(code=1)
+
+
+@app.command("regrade")
+def regrade_cmd(
+    directory: str = typer.Argument("runs", help="Directory of --log-json session files"),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="Model to grade with (defaults to the eval route's model)"),
+    prompt: str = typer.Option("plain", "--prompt", help="Grading prompt: plain (EVAL_SYSTEM) | structured (schema mode)"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="Parallel grading requests"),
+    cache: bool = typer.Option(False, "--cache", help="Reuse graded pairs across runs via the LLM response cache"),
+    out: Optional[str] = typer.Option(None, "--out", "-o", help="Write per-question rows as JSONL"),
+):
+    load_dotenv()
+    if model:
+        os.environ["LLM_ROUTE_EVAL"] = f"{route('eval')[0]}:{model}"
+    if cache:
+        os.environ["LLM_CACHE"] = "1"
+    from rich.markup import escape
+    from .services import evaluate
+    from .services.regrade import load_sessions, regrade
+
+    evaluate.STRUCTURED_OUTPUT = prompt == "structured"
+    pairs = load_sessions(directory)
+    if not pairs:
+        print(f"[bold yellow]No graded answers found in {directory}.[/]")
+        raise typer.Exit(code=1)
+
+    rows, stats = regrade(pairs, concurrency=concurrency)
+    for r in rows:
+        old = "-" if r["original"] is None else f"{r['original']:.2f}"
+        new = "error" if r["regraded"] is None else f"{r['regraded']:.2f}"
+        delta = "" if r["delta"] is None else f" ({r['delta']:+.2f})"
+        print(f"  {r['session']}#{r['index']}: {old} → {new}{delta}  {escape(' '.join(r['question'].split())[:60])}")
+    print(
+        f"[bold green]Regraded[/] {stats['graded']} unique answers ({stats['cached']} repeats reused, {stats['failed']} failed) "
+        f"with {route('eval')[2]}/{prompt} in {stats['elapsed_s']}s → {stats['per_s']}/s"
+    )
+    print(f"Mean delta → {stats['mean_delta']}, mean |delta| → {stats['mean_abs_delta']}, Spearman ρ → {stats['spearman']}")
+    if out:
+        path = Path(out)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        print(f"Saved rows to {path}")
+
+
+cache_app = typer.Typer(help="Inspect and purge the LLM response cache", no_args_is_help=True)
+app.add_typer(cache_app, name="cache")
+
+
+def _open_cache():
+    from .llm.cache import get_cache
+
+    os.environ["LLM_CACHE"] = "1"
+    return get_cache()
+
+
+@cache_app.command("stats")
+def cache_stats():
+    load_dotenv()
+    stats = _open_cache().stats()
+    print(f"Cache {stats['path']}: {stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB of {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+    print(f"Hits → {stats['hits']}, misses → {stats['misses']}, hit rate → {stats['hit_rate']:.1%}")
+
+
+@cache_app.command("purge")
+def cache_purge(
+    expired: bool = typer.Option(False, "--expired", help="Only drop entries older than LLM_CACHE_TTL"),
+):
+    load_dotenv()
+    removed = _open_cache().purge(expired_only=expired)
+    print(f"[bold green]Purged[/] {removed} cached responses")
+
+
+@app.command("serve")
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind"),
+    port: int = typer.Option(8000, "--port", "-p", help="Port to listen on"),
+):
+    load_dotenv()
+    import uvicorn
+    from .server import create_app
+
+    uvicorn.run(create_app(), host=host, port=port, log_level="warning")
+
+
 if __name__ == "__main__":
     app()
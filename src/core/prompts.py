@@ -1,5 +1,4 @@
 # src/core/prompts.py
-from string import Template
 from textwrap import dedent
 
 SYSTEM_INTERVIEWER = dedent("""
@@ -10,26 +9,36 @@ Tone: professional, concise, fair.
 - Keep each question under 2 sentences.
 """).strip()
 
-QUESTION_GEN_PROMPT = dedent("""
-Generate ONE interview question on the topic: "{topic}".
+# Every call kind sends a static system message, byte-identical on every
+# call, followed by a short user message with the per-call values. Ollama
+# keeps the KV cache of the last prompt per slot, so the static part is
+# evaluated once rather than on every request. Keep anything variable out of
+# the *_SYSTEM strings.
+
+QUESTION_SYSTEM = SYSTEM_INTERVIEWER + "\n\n" + dedent("""
+Generate ONE interview question for the topic, type and difficulty given by the user.
 
 Constraints:
-- Question type: {question_type}  # one of: coding | theory | design | debugging
-- Difficulty: {difficulty}
 - Keep it under 2 sentences.
 - Avoid trivia (e.g., dates or version numbers).
 - Be unambiguous; ask for specifics when relevant.
 - Return ONLY the question text (no hints, no code unless needed).
 
-Definitions:
+Question types:
 - coding: requires a short code snippet or algorithmic approach.
 - theory: conceptual understanding, definitions, trade-offs, when/why.
 - design: architecture, components, interfaces, complexity/perf/scaling.
 - debugging: read/understand faulty snippet or scenario; ask how to find/fix.
 """).strip()
 
+QUESTION_USER = dedent("""
+Generate ONE interview question on the topic: "{topic}".
+Question type: {question_type}
+Difficulty: {difficulty}
+""").strip()
+
 
-EVAL_PROMPT = dedent("""
+EVAL_SYSTEM = dedent("""
 You are an expert technical interviewer and strict grader. Evaluate the candidate's answer
 to the given question with care and be conservative with high scores.
 
@@ -52,7 +61,7 @@ Example 1 (good, no follow-up):
 Q: Explain Python generators.
 A: Generators use 'yield' to produce values lazily; they pause and resume state between iterations, saving memory for large sequences.
 JSON:
-{{
+{
   "accuracy": 9,
   "clarity": 9,
   "depth": 8,
@@ -61,13 +70,13 @@ JSON:
   "rationale": "Defines yield, shows memory benefit and behavior.",
   "misconceptions": [],
   "hint": ""
-}}
+}
 
 Example 2 (incorrect, follow-up needed):
 Q: What is Big-O of binary search?
 A: Maybe O(n)?
 JSON:
-{{
+{
   "accuracy": 2,
   "clarity": 6,
   "depth": 3,
@@ -76,28 +85,33 @@ JSON:
   "rationale": "Incorrect complexity; candidate confuses linear and logarithmic searches.",
   "misconceptions": ["Thinks binary search is O(n)."],
   "hint": "Consider how halving the search space each step affects runtime."
-}}
+}
+
+The user message holds the topic, question and answer to grade. RETURN JSON only (no explanation).
+""").strip()
 
-Now evaluate the candidate's Answer below and RETURN JSON only (no explanation):
+# structured-output variant: the JSON shape is enforced by the schema passed
+# as Ollama's `format`, so the formatting rules and few-shot JSON are dropped
+EVAL_SYSTEM_STRUCTURED = dedent("""
+You are a strict technical interviewer grading one answer. Be conservative with high scores.
+- accuracy 0-10: 0 if blank, off-topic, nonsensical or keyword-only; high only if it correctly solves the question or explains the correct approach.
+- clarity 0-10: organization and readability.
+- depth 0-10: reasoning, trade-offs, edge cases, complexity, examples.
+- overall 0-10: average of accuracy, clarity and depth.
+- followup_needed: true if the answer is wrong, incomplete, under 3 words or a non-answer.
+- rationale: one short sentence. misconceptions: list. hint: a short nudge or "".
+""").strip()
 
+EVAL_USER = dedent("""
 Topic: {topic}
 Question: {question}
 Answer: {answer}
-
-Return JSON with the fields described above.
 """).strip()
 
 
-
-
-FOLLOWUP_PROMPT = dedent("""
+FOLLOWUP_SYSTEM = dedent("""
 Draft ONE focused follow-up that guides the candidate toward a better answer.
-
-Context:
-Question: {question}
-Answer: {answer}
-Hint: {hint}
-Misconceptions: {misconceptions}
+The user message gives the question, the candidate's answer, a grading hint and any misconceptions.
 
 Rules:
 - One sentence, crisp.
@@ -107,16 +121,21 @@ Rules:
 Return ONLY the follow-up question text.
 """).strip()
 
+FOLLOWUP_USER = dedent("""
+Question: {question}
+Answer: {answer}
+Hint: {hint}
+Misconceptions: {misconceptions}
+""").strip()
 
 
-SUMMARY_PROMPT_TMPL = Template(dedent("""
+SUMMARY_SYSTEM = dedent("""
 You are summarizing a short technical interview.
 
-Topic: $topic
-Total main questions: $n
-
-You are given a JSON list of evaluations. Each item includes:
-- question, answer, accuracy, clarity, depth, overall, followup_needed, rationale, misconceptions, hint
+The user message gives the topic, the number of main questions and a JSON digest of the evaluations:
+- answers, followups: counts. mean: average accuracy, clarity, depth and overall (0-10).
+- misconceptions: recurring misconceptions. notes: running notes on earlier answers.
+- recent: one line per recent answer (question, score, rationale).
 
 Return STRICT JSON only:
 {
@@ -126,4 +145,37 @@ Return STRICT JSON only:
   "final_grade": <0-10>,
   "signal": "hire | borderline | no hire"
 }
-""").strip())
+""").strip()
+
+SUMMARY_SYSTEM_STRUCTURED = dedent("""
+Summarize a technical interview from the evaluation digest in the user message
+(counts, mean scores 0-10, misconceptions, running notes and recent answers).
+feedback: 2-4 sentence overview. strengths: short bullets. recommendations: 2-3 specific next steps.
+final_grade: 0-10. signal: hire, borderline or no hire.
+""").strip()
+
+SUMMARY_USER = dedent("""
+Topic: {topic}
+Total main questions: {n}
+
+DIGEST_JSON:
+{digest}
+""").strip()
+
+
+# folds answers that left the digest's recent window into its running notes;
+# runs in the background while the candidate answers the next question
+DIGEST_SYSTEM = dedent("""
+You keep brief running notes on a candidate during a technical interview.
+The user message gives the current notes and a few newly graded answers.
+Rewrite the notes so they also cover the new answers: at most 4 sentences,
+naming the concepts handled well and the gaps or misconceptions seen.
+Return ONLY the updated notes.
+""").strip()
+
+DIGEST_USER = dedent("""
+Current notes: {notes}
+
+NEW_ANSWERS:
+{lines}
+""").strip()
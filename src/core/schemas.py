@@ -0,0 +1,107 @@
+# src/core/schemas.py
+# Reply shapes for the JSON calls: JSON schemas for Ollama's structured
+# outputs (`format=`) and the pydantic models that validate what comes back
+from __future__ import annotations
+from typing import Any, List, Optional
+
+from pydantic import AliasChoices, BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter, model_validator
+from typing_extensions import Annotated
+
+from .scoring import clamp_score, recompute_overall
+
+SCORE = {"type": "number", "minimum": 0, "maximum": 10}
+
+EVAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "accuracy": SCORE,
+        "clarity": SCORE,
+        "depth": SCORE,
+        "overall": SCORE,
+        "followup_needed": {"type": "boolean"},
+        "rationale": {"type": "string"},
+        "misconceptions": {"type": "array", "items": {"type": "string"}},
+        "hint": {"type": "string"},
+    },
+    "required": ["accuracy", "clarity", "depth", "overall", "followup_needed", "rationale", "misconceptions", "hint"],
+}
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "feedback": {"type": "string"},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "recommendations": {"type": "array", "items": {"type": "string"}},
+        "final_grade": SCORE,
+        "signal": {"type": "string", "enum": ["hire", "borderline", "no hire"]},
+    },
+    "required": ["feedback", "strengths", "recommendations", "final_grade", "signal"],
+}
+
+
+def _truthy(v: Any) -> bool:
+    if isinstance(v, str):
+        return v.strip().lower() not in ("", "false", "no", "0", "none", "null")
+    return bool(v)
+
+
+def _str_list(v: Any) -> List[str]:
+    if isinstance(v, list):
+        return [str(x) for x in v]
+    return [str(v)] if v else []
+
+
+def _truncate(limit: int):
+    return BeforeValidator(lambda v: "" if v is None else str(v)[:limit])
+
+
+Score = Annotated[float, BeforeValidator(clamp_score)]
+OptionalScore = Annotated[Optional[float], BeforeValidator(lambda v: None if v is None else clamp_score(v))]
+Flag = Annotated[bool, BeforeValidator(_truthy)]
+StrList = Annotated[List[str], BeforeValidator(_str_list)]
+
+SCORE_KEYS = ("accuracy", "clarity", "depth", "overall")
+
+
+class Evaluation(BaseModel):
+    # lenient on purpose: models nest scores, rename fields and send numbers
+    # as strings; everything is coerced and clamped here instead of failing
+    model_config = ConfigDict(extra="ignore")
+
+    accuracy: Score = 0.0
+    clarity: Score = 0.0
+    depth: Score = 0.0
+    overall: OptionalScore = None
+    followup_needed: Flag = Field(False, validation_alias=AliasChoices("followup_needed", "followup"))
+    rationale: Annotated[str, _truncate(500)] = Field("", validation_alias=AliasChoices("rationale", "explanation"))
+    hint: Annotated[str, _truncate(200)] = ""
+    misconceptions: StrList = Field(default_factory=list, validation_alias=AliasChoices("misconceptions", "errors"))
+
+    @model_validator(mode="before")
+    @classmethod
+    def _flatten_scores(cls, data: Any) -> Any:
+        if isinstance(data, dict) and isinstance(data.get("scores"), dict):
+            nested = {k: v for k, v in data["scores"].items() if k in SCORE_KEYS}
+            data = {**data, **nested}
+        return data
+
+    @model_validator(mode="after")
+    def _fill_overall(self) -> "Evaluation":
+        if not self.overall:
+            self.overall = recompute_overall(self.accuracy, self.clarity, self.depth)
+        return self
+
+
+class Summary(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    feedback: Annotated[str, _truncate(2000)] = ""
+    strengths: StrList = Field(default_factory=list)
+    recommendations: StrList = Field(default_factory=list)
+    final_grade: Score = 0.0
+    signal: Annotated[str, _truncate(40)] = "review"
+
+
+# built once: TypeAdapter compiles the validator on construction
+EVAL_ADAPTER = TypeAdapter(Evaluation)
+SUMMARY_ADAPTER = TypeAdapter(Summary)
@@ -1,9 +1,18 @@
 # src/core/state.py
 from __future__ import annotations
-from typing import List, Dict, Optional
-from typing_extensions import TypedDict
+import operator
+from typing import Any, Callable, List, Dict, Optional, get_type_hints
+from typing_extensions import Annotated, TypedDict
+
+
+def merge_dicts(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    # counter maps: nodes send only the entries they changed
+    return {**(left or {}), **(right or {})}
+
 
 class InterviewState(TypedDict, total=False):
+    # asked/answers/evals are append-only and the counter maps are merged
+    # key by key, so nodes return deltas instead of copying the whole state
    
     topic: str                  
     topics: List[str]            
@@ -11,20 +20,103 @@ class InterviewState(TypedDict, total=False):
 
    
     difficulty: str               
-    difficulty_counts: Dict[str, int]  
+    difficulty_counts: Annotated[Dict[str, int], merge_dicts]
     max_q: int                    
+    plan_ahead: bool
+    question_plan: List[Dict]
 
     
-    asked: List[Dict]             
-    answers: List[str]            
-    evals: List[Dict]            
-    topic_performance: Dict[str, Dict[str, float]]  
+    asked: Annotated[List[Dict], operator.add]
+    answers: Annotated[List[str], operator.add]
+    evals: Annotated[List[Dict], operator.add]
+    # incremental counters, so nothing rescans `asked`/`evals`
+    main_count: int
+    type_counts: Annotated[Dict[str, Dict[str, int]], merge_dicts]  # topic -> type -> n
+    topic_performance: Annotated[Dict[str, Dict[str, float]], merge_dicts]  # running mean/variance
+    digest: Dict                  # bounded summary input (services/summary.py)
+    summary_mode: str             # llm | local
 
    
     current_q: str
+    question_streamed: bool
     followup_mode: bool
+    followup_depth: int
+    speculate: bool
+    speculative_followup: Optional[str]
+    steps: int
+    last_eval: Dict
+    summary: Dict
     done: bool
     question_type: str            
 
     
     stdin_mode: bool             
+
+
+def new_interview_state(
+    topics: List[str],
+    difficulty: str = "mixed",
+    max_q: int = 4,
+    question_type: str = "mixed",
+    stdin_mode: bool = False,
+    plan_ahead: bool = False,
+    speculate: bool = False,
+    summary_mode: str = "llm",
+) -> InterviewState:
+    return {
+        "topics": topics,
+        "topic_index": 0,
+        "difficulty": difficulty,
+        "max_q": max_q,
+        "plan_ahead": plan_ahead,
+        "question_plan": [],
+        "asked": [],
+        "answers": [],
+        "evals": [],
+        "followup_mode": False,
+        "followup_depth": 0,
+        "speculate": speculate,
+        "summary_mode": summary_mode,
+        "done": False,
+        "question_type": question_type,
+        "stdin_mode": stdin_mode,
+        "difficulty_counts": {"easy": 0, "medium": 0, "hard": 0},
+        "main_count": 0,
+        "type_counts": {},
+        "steps": 0,
+        "topic_performance": {},
+    }
+
+
+def _reducers() -> Dict[str, Callable[[Any, Any], Any]]:
+    hints = get_type_hints(InterviewState, include_extras=True)
+    return {k: h.__metadata__[0] for k, h in hints.items() if getattr(h, "__metadata__", None)}
+
+
+_REDUCERS = _reducers()
+
+
+def apply_update(state: InterviewState, update: Optional[Dict[str, Any]]) -> InterviewState:
+    # what LangGraph does with a node's return value, for calling nodes directly
+    out = dict(state)
+    for key, value in (update or {}).items():
+        reducer = _REDUCERS.get(key)
+        out[key] = reducer(out[key], value) if reducer and key in out else value
+    return out
+
+
+def update_topic_performance(perf: Optional[Dict[str, float]], score: float) -> Dict[str, float]:
+    # Welford's update: O(1) per answer for the running mean and variance
+    perf = perf or {}
+    n = int(perf.get("questions", 0)) + 1
+    mean = float(perf.get("mean", 0.0))
+    delta = score - mean
+    mean += delta / n
+    m2 = float(perf.get("m2", 0.0)) + delta * (score - mean)
+    return {
+        "questions": n,
+        "total_score": float(perf.get("total_score", 0.0)) + score,
+        "mean": mean,
+        "m2": m2,
+        "variance": m2 / n,
+    }
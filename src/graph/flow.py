@@ -1,26 +1,55 @@
 # src/graph/flow.py
 from __future__ import annotations
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+import asyncio
+import contextvars
 import os
 import sys
 import re
+import time
 
 sys.setrecursionlimit(300)
 
 
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph.state import StateGraph
 START = "__start__"
 END = "__end__"
 
-from ..core.state import InterviewState
-from ..services.questions import generate_question
-from ..services.evaluate import evaluate_answer
-from ..services.followup import generate_followup
-from ..services.summary import generate_summary
+from ..core.state import InterviewState, update_topic_performance
+from ..services.questions import fallback_question, generate_question, agenerate_question
+from ..services.evaluate import aevaluate_answer, evaluate_answer, finalize_eval, is_non_answer, non_answer_eval
+from ..services.followup import generate_followup, agenerate_followup
+from ..services import pregrade as pregrader
+from ..services.summary import (
+    add_to_digest, afold_notes, agenerate_summary, apply_fold, fold_notes, generate_summary, local_summary,
+    new_digest, take_fold,
+)
+from ..services.planner import plan_questions, aplan_questions
+from ..utils import metrics
+from ..utils.logging import trace_node
 
 MAX_FOLLOWUPS_PER_Q = int(os.getenv("MAX_FOLLOWUPS_PER_Q", "1"))  
 MAX_TOTAL_STEPS = int(os.getenv("MAX_TOTAL_STEPS", "500"))       
 
+SPECULATIVE_FOLLOWUP = os.getenv("SPECULATIVE_FOLLOWUP", "0") == "1"
+SPECULATE_BELOW_WORDS = int(os.getenv("SPECULATE_BELOW_WORDS", "0"))
+SPECULATION_MAX_WASTE = float(os.getenv("SPECULATION_MAX_WASTE", "0.25"))
+SPECULATION_MIN_SAMPLES = 20
+STREAM_TOKENS = os.getenv("STREAM_TOKENS", "1") == "1"
+# the CLI turns this on; the HTTP service and benchmarks run the same nodes
+# and keep their stdout clean
+CONSOLE = False
+
+_speculation_pool = ThreadPoolExecutor(max_workers=int(os.getenv("SPECULATION_WORKERS", "4")))
+_digest_pool = ThreadPoolExecutor(max_workers=int(os.getenv("DIGEST_WORKERS", "2")))
+# background digest folds by digest id. Futures and tasks cannot be
+# checkpointed, so state only records the lines being folded; a session
+# resumed without its fold simply gets those lines back
+_digest_folds: Dict[str, Any] = {}
+
 
 TYPE_TAG_RE = re.compile(r"^\s*\[(coding|theory|design|debugging)\]\s*", flags=re.IGNORECASE)
 
@@ -29,6 +58,66 @@ def _strip_type_tag(q: str) -> str:
     return TYPE_TAG_RE.sub("", q).strip()
 
 
+def _token_writer(kind: str):
+    # forwards streamed tokens to graph.astream(stream_mode="custom") consumers
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return None
+    return lambda text: writer({"kind": kind, "text": text})
+
+
+def _say(*args: Any, **kwargs: Any) -> None:
+    if CONSOLE:
+        print(*args, **kwargs)
+
+
+class _ConsolePreview:
+    # prints streamed tokens on the "[Q]" line node_ask would print, so the
+    # candidate can start reading before generation finishes
+    def __init__(self, lead: str = "") -> None:
+        self.lead = lead
+        self.text = ""
+        self.shown = ""
+
+    def __call__(self, chunk: str) -> None:
+        if not self.text:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            print(f"\n[Q] {self.lead}", end="", flush=True)
+        self.text += chunk
+        # hold back trailing dots/whitespace: _tag may turn them into "?"
+        visible = self.text.rstrip(". \n")
+        if len(visible) > len(self.shown):
+            print(visible[len(self.shown):], end="", flush=True)
+            self.shown = visible
+
+    def retry(self) -> None:
+        # the streamed question was a near-duplicate and is being generated
+        # again: close its line with a marker so the retry starts a new one
+        if self.text:
+            print("  (too close to an earlier question, regenerating)", flush=True)
+        self.text = ""
+        self.shown = ""
+
+    def finish(self, line: str) -> bool:
+        # completes the line with whatever normalisation added; a final text
+        # that differs from what was streamed gets a fresh line
+        if not self.text:
+            return False
+        streamed = self.lead + self.shown
+        if line.startswith(streamed):
+            print(line[len(streamed):], flush=True)
+        else:
+            print(f"\n[Q] {line}", flush=True)
+        return True
+
+
+def _console_preview(lead: str = "") -> _ConsolePreview | None:
+    return _ConsolePreview(lead) if CONSOLE and STREAM_TOKENS else None
+
+
 def _read_multiline_answer(prompt: str = "Your answer (blank line to finish): ") -> str:
     print(prompt, end="", flush=True)
     lines = []
@@ -43,10 +132,7 @@ def _read_multiline_answer(prompt: str = "Your answer (blank line to finish): ")
     return "\n".join(lines).strip()
 
 
-def node_next_question(state: InterviewState) -> InterviewState:
-    if state.get("done"):
-        return state
-
+def _next_question_request(state: InterviewState) -> Dict[str, Any]:
     topics = state.get("topics", [state.get("topic", "Python")])
     topic_index = int(state.get("topic_index", 0))
     current_topic = topics[topic_index % len(topics)]
@@ -56,50 +142,140 @@ def node_next_question(state: InterviewState) -> InterviewState:
     if chosen_diff == "mixed":
         chosen_diff = min(difficulty_counts, key=difficulty_counts.get)
 
-
+    # the dedupe check still needs this topic's question texts
     asked_strings = [
         q["question"] for q in state.get("asked", [])
         if isinstance(q, dict) and q.get("topic") == current_topic and q.get("difficulty") != "follow-up"
     ]
+    return {
+        "topic": current_topic,
+        "difficulty": chosen_diff,
+        "question_type": state.get("question_type", "mixed"),
+        "asked_so_far": asked_strings,
+        "type_counts": (state.get("type_counts") or {}).get(current_topic, {}),
+    }
 
-    try:
-        q_tagged = generate_question(
-            topic=current_topic,
-            difficulty=chosen_diff,
-            question_type=state.get("question_type", "mixed"),
-            asked_so_far=asked_strings,
-        )
-    except Exception as e:
-        print(f"Error generating question: {e}")
-        return {**state, "done": True}
 
+def _apply_next_question(state: InterviewState, req: Dict[str, Any], q_tagged: str) -> Dict[str, Any]:
+    # returns only the changed keys; LangGraph appends `asked` and merges the
+    # counter maps (see InterviewState)
+    current_topic = req["topic"]
+    chosen_diff = req["difficulty"]
     shown = _strip_type_tag(q_tagged)
 
-    asked = [*state.get("asked", []), {"question": q_tagged, "topic": current_topic, "difficulty": chosen_diff}]
-    difficulty_counts[chosen_diff] = difficulty_counts.get(chosen_diff, 0) + 1
-
-    main_qs = [q for q in asked if isinstance(q, dict) and q.get("difficulty") != "follow-up"]
-    max_q = int(state.get("max_q", 4))
-    print(f"Question {len(main_qs)} of {max_q} (Topic: {current_topic}, Difficulty: {chosen_diff})")
-
-    return {
-        **state,
+    difficulty_counts = state.get("difficulty_counts") or {}
+    update: Dict[str, Any] = {
         "current_q": shown,
-        "asked": asked,
+        "question_streamed": False,
+        "asked": [{"question": q_tagged, "topic": current_topic, "difficulty": chosen_diff}],
         "followup_mode": False,
         "followup_depth": 0,
-        "topic_index": topic_index + 1,
-        "difficulty_counts": difficulty_counts,
+        "topic_index": int(state.get("topic_index", 0)) + 1,
+        "difficulty_counts": {chosen_diff: difficulty_counts.get(chosen_diff, 0) + 1},
+        "main_count": int(state.get("main_count", 0)) + 1,
     }
+    m = TYPE_TAG_RE.match(q_tagged)
+    if m:
+        qtype = m.group(1).lower()
+        types = dict((state.get("type_counts") or {}).get(current_topic, {}))
+        types[qtype] = types.get(qtype, 0) + 1
+        update["type_counts"] = {current_topic: types}
+    return update
+
+
+def _announce_question(state: InterviewState, req: Dict[str, Any]) -> None:
+    max_q = int(state.get("max_q", 4))
+    _say(f"Question {int(state.get('main_count', 0)) + 1} of {max_q} (Topic: {req['topic']}, Difficulty: {req['difficulty']})")
 
 
-def node_ask(state: InterviewState) -> InterviewState:
+def _pop_planned(state: InterviewState, req: Dict[str, Any]) -> Tuple[Dict[str, Any], str | None]:
+    # a planned question is used only if it still matches the live choice;
+    # otherwise the slot is dropped and generated on demand
+    plan = state.get("question_plan") or []
+    if not plan:
+        return {}, None
+    head = plan[0]
+    update = {"question_plan": plan[1:]}
+    if head.get("question") and head.get("topic") == req["topic"] and head.get("difficulty") == req["difficulty"]:
+        return update, head["question"]
+    return update, None
+
+
+def _fallback_question(req: Dict[str, Any], e: Exception) -> str:
+    # the model failed, timed out or its circuit is open: ask a bank (or
+    # generic) question instead of ending the interview
+    _say(f"Error generating question: {e}; asking a fallback question.")
+    metrics.incr("degraded.question")
+    return fallback_question(**req)
+
+
+def node_plan(state: InterviewState) -> Dict[str, Any]:
+    try:
+        plan = plan_questions(state)
+    except Exception as e:
+        _say(f"Error planning questions: {e}")
+        return {}
+    return {"question_plan": plan}
+
+
+async def anode_plan(state: InterviewState) -> Dict[str, Any]:
+    try:
+        plan = await aplan_questions(state)
+    except Exception as e:
+        _say(f"Error planning questions: {e}")
+        return {}
+    return {"question_plan": plan}
+
+
+def node_next_question(state: InterviewState) -> Dict[str, Any]:
+    if state.get("done"):
+        return {}
+
+    req = _next_question_request(state)
+    _announce_question(state, req)
+    popped, planned = _pop_planned(state, req)
+    if planned:
+        return {**popped, **_apply_next_question(state, req, planned)}
+    preview = _console_preview()
+    try:
+        q_tagged = generate_question(**req, on_token=preview, on_retry=preview and preview.retry)
+    except Exception as e:
+        if preview and preview.text:
+            _say()
+        q_tagged = _fallback_question(req, e)
+        preview = None
+
+    update = {**popped, **_apply_next_question(state, req, q_tagged)}
+    if preview:
+        update["question_streamed"] = preview.finish(update["current_q"])
+    return update
+
+
+async def anode_next_question(state: InterviewState) -> Dict[str, Any]:
+    if state.get("done"):
+        return {}
+
+    req = _next_question_request(state)
+    _announce_question(state, req)
+    popped, planned = _pop_planned(state, req)
+    if planned:
+        return {**popped, **_apply_next_question(state, req, planned)}
+    try:
+        q_tagged = await agenerate_question(**req, on_token=_token_writer("question"))
+    except Exception as e:
+        q_tagged = _fallback_question(req, e)
+
+    return {**popped, **_apply_next_question(state, req, q_tagged)}
+
+
+def node_ask(state: InterviewState) -> Dict[str, Any]:
 
     if not state.get("current_q"):
-        print("No question available.")
-        return state
+        _say("No question available.")
+        return {}
 
-    print(f"\n[Q] {state['current_q']}")
+    if not state.get("question_streamed"):
+        _say(f"\n[Q] {state['current_q']}")
     if state.get("stdin_mode"):
         ans = _read_multiline_answer()
         if not ans:
@@ -107,213 +283,462 @@ def node_ask(state: InterviewState) -> InterviewState:
     else:
         ans = input("Your answer: ").strip() or "(no answer)"
 
-    answers = [*state.get("answers", []), ans]
+    return {"answers": [ans], "steps": int(state.get("steps", 0)) + 1}
 
-    steps = int(state.get("steps", 0)) + 1
-    return {**state, "answers": answers, "steps": steps}
 
+async def anode_ask(state: InterviewState) -> Dict[str, Any]:
+    return await asyncio.to_thread(node_ask, state)
 
-def node_evaluate(state: InterviewState) -> InterviewState:
 
+def _eval_context(state: InterviewState) -> Tuple[str, str, str]:
     question = state.get("current_q", "")
     answers = state.get("answers", [])
     answer = answers[-1] if answers else ""
     topic_index = int(state.get("topic_index", 0))
     topics = state.get("topics", [state.get("topic", "Python")])
     current_topic = topics[(topic_index - 1) % len(topics)] if topic_index > 0 else topics[0]
+    return question, answer, current_topic
 
-    try:
 
-        if not answer.strip() or answer.strip().lower() in {
-            "i dont know", "sorry, i dont know", "idk", "don't know", "do not know",
-        }:
-            eval_data = {
-                "accuracy": 0.0,
-                "clarity": 0.0,
-                "depth": 0.0,
-                "overall": 0.0,
-                "scores": {"accuracy": 0.0, "clarity": 0.0, "depth": 0.0, "overall": 0.0},
-                "rationale": "Candidate explicitly said they do not know.",
-                "followup_needed": True,
-                "hint": "",
-                "misconceptions": [],
-                "question": question,
-                "answer": answer,
-                "topic": current_topic,
-            }
-        else:
-            raw = evaluate_answer(question=question, answer=answer, topic=current_topic)
-            if not isinstance(raw, dict):
-                raw = {}
-      
-            if "scores" not in raw:
-                raw_scores = {
-                    "accuracy": raw.get("accuracy", 0.0),
-                    "clarity": raw.get("clarity", 0.0),
-                    "depth": raw.get("depth", 0.0),
-                    "overall": raw.get("overall", 0.0),
-                }
-            else:
-                raw_scores = raw.get("scores", {"accuracy": 0.0, "clarity": 0.0, "depth": 0.0, "overall": 0.0})
-
-            eval_data = {
-                "accuracy": raw.get("accuracy", raw_scores.get("accuracy", 0.0)),
-                "clarity": raw.get("clarity", raw_scores.get("clarity", 0.0)),
-                "depth": raw.get("depth", raw_scores.get("depth", 0.0)),
-                "overall": raw.get("overall", raw_scores.get("overall", 0.0)),
-                "scores": raw_scores,
-                "rationale": raw.get("rationale", ""),
-                "followup_needed": bool(raw.get("followup_needed", False)),
-                "hint": raw.get("hint", ""),
-                "misconceptions": raw.get("misconceptions", []),
-                "question": question,
-                "answer": answer,
-                "topic": current_topic,
-            }
-
-            
-            words = [w for w in re.findall(r"\w+", answer) if w]
-            if len(words) < 3:
-              
-                eval_data["scores"] = {"accuracy": 0.0, "clarity": max(eval_data["scores"].get("clarity", 0.0), 1.0), "depth": 0.0, "overall": 0.0}
-                eval_data["rationale"] = (eval_data.get("rationale", "") + " | Overridden: Answer too short or uninformative.").strip(" |")
-                eval_data["followup_needed"] = True
-            else:
-              
-                q_tokens = set(re.findall(r"\w+", question.lower()))
-                overlap = sum(1 for w in words if w.lower() in q_tokens)
-                if overlap == 0:
-                  
-                    eval_data["scores"]["accuracy"] = min(eval_data["scores"].get("accuracy", 0.0), 2.0)
-                    eval_data["rationale"] = (eval_data.get("rationale", "") + " | Penalized: Answer may not address the question.").strip(" |")
-                    eval_data["followup_needed"] = True
+def _pregrade(question: str, answer: str, topic: str) -> Dict[str, Any] | None:
+    # clear-cut answers to seed questions with a reference skip the LLM
+    if not pregrader.PREGRADE:
+        return None
+    return pregrader.pregrade(question, answer, topic)
 
-    except Exception as e:
-        print(f"Error evaluating answer: {e}")
-        eval_data = {
-            "accuracy": 0.0,
-            "clarity": 0.0,
-            "depth": 0.0,
-            "overall": 0.0,
-            "scores": {"accuracy": 0.0, "clarity": 0.0, "depth": 0.0, "overall": 0.0},
-            "rationale": f"Evaluation failed: {e}",
-            "followup_needed": True,
-            "hint": "",
-            "misconceptions": [],
-            "question": question,
-            "answer": answer,
-            "topic": current_topic,
-        }
 
-   
-    topic_perf = state.get("topic_performance", {}) or {}
-    tp = topic_perf.get(current_topic, {"questions": 0, "total_score": 0.0})
-    tp["questions"] = tp.get("questions", 0) + 1
-    tp["total_score"] = tp.get("total_score", 0.0) + float(eval_data["scores"].get("overall", 0.0))
-    topic_perf[current_topic] = tp
+def _degraded_eval(e: Exception, question: str, answer: str, topic: str) -> Dict[str, Any]:
+    # grading failed (timeout, open circuit, bad reply): grade from local
+    # signals instead of scoring the candidate zero for an outage. No
+    # follow-up, since that would need the model too
+    metrics.incr("degraded.eval")
+    eval_data = pregrader.pregrade(question, answer, topic)
+    if eval_data is None:
+        score = 1.0 if _weak_answer_signal(question, answer) in ("short", "off_topic") else 5.0
+        scores = {"accuracy": score, "clarity": score, "depth": score, "overall": score}
+        eval_data = {**scores, "scores": dict(scores), "rationale": "", "hint": "", "misconceptions": [],
+                     "question": question, "answer": answer, "topic": topic}
+    eval_data["rationale"] = f"Graded locally; the model was unavailable ({e}). {eval_data['rationale']}".strip()
+    eval_data["followup_needed"] = False
+    eval_data["degraded"] = True
+    return eval_data
+
+
+def _apply_eval(state: InterviewState, eval_data: Dict[str, Any], current_topic: str) -> Dict[str, Any]:
+    tp = (state.get("topic_performance") or {}).get(current_topic)
+    tp = update_topic_performance(tp, float(eval_data["scores"].get("overall", 0.0)))
 
     scores = eval_data["scores"]
-    print(f"→ Scores: accuracy={scores['accuracy']}, clarity={scores['clarity']}, depth={scores['depth']}, overall={scores['overall']}")
-    print(f"→ Rationale: {eval_data.get('rationale','')}")
+    _say(f"→ Scores: accuracy={scores['accuracy']}, clarity={scores['clarity']}, depth={scores['depth']}, overall={scores['overall']}")
+    _say(f"→ Rationale: {eval_data.get('rationale','')}")
     if eval_data.get("followup_needed"):
-        print("→ Follow-up flagged.")
+        _say("→ Follow-up flagged.")
 
-    evals = [*state.get("evals", []), eval_data]
-    return {**state, "evals": evals, "last_eval": eval_data, "topic_performance": topic_perf}
+    return {"evals": [eval_data], "last_eval": eval_data, "topic_performance": {current_topic: tp}}
 
 
-def node_followup(state: InterviewState) -> InterviewState:
- 
-    last = state.get("evals", [])[-1] if state.get("evals") else {}
+def _fold_result(fold) -> str | None:
+    if fold is None or fold.cancelled():
+        return None
+    try:
+        return fold.result()
+    except Exception:
+        metrics.incr("digest.fold_errors")
+        return None
+
+
+def _collect_fold(digest: Dict[str, Any] | None) -> Dict[str, Any] | None:
+    # applies a finished background fold; one still running is left alone
+    if not digest or not digest.get("pending"):
+        return digest
+    fold = _digest_folds.get(digest["id"])
+    if fold is not None and not fold.done():
+        return digest
+    _digest_folds.pop(digest["id"], None)
+    return apply_fold(digest, _fold_result(fold))
+
+
+def _update_digest(state: InterviewState, eval_data: Dict[str, Any], start_fold) -> Dict[str, Any]:
+    digest = add_to_digest(_collect_fold(state.get("digest")), eval_data)
+    if state.get("summary_mode") == "local":
+        # the local summary never reads the notes, so nothing is folded
+        return digest
+    digest, lines = take_fold(digest)
+    if lines:
+        metrics.incr("digest.folds")
+        _digest_folds[digest["id"]] = start_fold(digest["notes"], lines)
+    return digest
+
+
+def _start_fold(notes: str, lines: List[str]):
+    # in a copy of this context, so the fold keeps the session
+    return _digest_pool.submit(contextvars.copy_context().run, fold_notes, notes, lines)
+
+
+def _astart_fold(notes: str, lines: List[str]):
+    return asyncio.create_task(afold_notes(notes, lines))
+
+
+def _weak_answer_signal(question: str, answer: str) -> str | None:
+    # the same cheap checks finalize_eval applies after grading
+    words = [w for w in re.findall(r"\w+", answer) if w]
+    if len(words) < 3:
+        return "short"
+    q_tokens = set(re.findall(r"\w+", question.lower()))
+    if not any(w.lower() in q_tokens for w in words):
+        return "off_topic"
+    if len(words) < SPECULATE_BELOW_WORDS:
+        return "brief"
+    return None
+
+
+def _should_speculate(state: InterviewState, question: str, answer: str) -> bool:
+    if not (state.get("speculate") or SPECULATIVE_FOLLOWUP):
+        return False
+    if state.get("followup_mode") or MAX_FOLLOWUPS_PER_Q <= 0 or int(state.get("followup_depth", 0)) >= MAX_FOLLOWUPS_PER_Q:
+        return False
+    signal = _weak_answer_signal(question, answer)
+    if signal is None:
+        return False
+    if signal == "brief":
+        # short/off-topic always force a follow-up; "brief" is a guess, so it
+        # is throttled once the observed waste exceeds the budget
+        started = metrics.counter("speculation.started")
+        if started >= SPECULATION_MIN_SAMPLES and metrics.counter("speculation.misses") / started > SPECULATION_MAX_WASTE:
+            metrics.incr("speculation.throttled")
+            return False
+    metrics.incr("speculation.started")
+    return True
+
+
+def _speculative_request(question: str, answer: str) -> Dict[str, Any]:
+    return _followup_request({"question": question, "answer": answer})
+
+
+def _timed_followup(req: Dict[str, Any]) -> Tuple[str, float]:
+    t0 = time.perf_counter()
+    fq = generate_followup(**req)
+    return fq, (time.perf_counter() - t0) * 1000
+
+
+async def _atimed_followup(req: Dict[str, Any]) -> Tuple[str, float]:
+    t0 = time.perf_counter()
+    fq = await agenerate_followup(**req)
+    return fq, (time.perf_counter() - t0) * 1000
+
+
+def _keep_speculation(update: Dict[str, Any], result: Tuple[str, float], eval_ms: float) -> Dict[str, Any]:
+    fq, followup_ms = result
+    metrics.incr("speculation.hits")
+    metrics.observe("speculation.saved_ms", min(eval_ms, followup_ms))
+    return {**update, "speculative_followup": fq}
+
+
+def _record_waste(future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        metrics.observe("speculation.wasted_ms", future.result()[1])
+
+
+def speculation_stats() -> Dict[str, float]:
+    snap = metrics.snapshot()
+    counters, obs = snap["counters"], snap["observations"]
+    started = counters.get("speculation.started", 0)
+    hits = counters.get("speculation.hits", 0)
+    return {
+        "started": started,
+        "hits": hits,
+        "misses": counters.get("speculation.misses", 0),
+        "throttled": counters.get("speculation.throttled", 0),
+        "hit_rate": round(hits / started, 3) if started else 0.0,
+        "saved_ms": round(obs.get("speculation.saved_ms", {}).get("sum", 0.0), 1),
+        "wasted_ms": round(obs.get("speculation.wasted_ms", {}).get("sum", 0.0), 1),
+    }
+
+
+def node_evaluate(state: InterviewState) -> Dict[str, Any]:
+    question, answer, current_topic = _eval_context(state)
+    spec = None
+    t0 = time.perf_counter()
+    try:
+        if is_non_answer(answer):
+            eval_data = non_answer_eval(question, answer, current_topic)
+        else:
+            eval_data = _pregrade(question, answer, current_topic)
+        if eval_data is None:
+            if _should_speculate(state, question, answer):
+                # in a copy of this context, so the draft keeps the session
+                spec = _speculation_pool.submit(contextvars.copy_context().run, _timed_followup,
+                                                _speculative_request(question, answer))
+            raw = evaluate_answer(question=question, answer=answer, topic=current_topic)
+            eval_data = finalize_eval(raw, question, answer, current_topic)
+    except Exception as e:
+        _say(f"Error evaluating answer: {e}")
+        eval_data = _degraded_eval(e, question, answer, current_topic)
+    eval_ms = (time.perf_counter() - t0) * 1000
+
+    update = _apply_eval(state, eval_data, current_topic)
+    update["digest"] = _update_digest(state, eval_data, _start_fold)
+    if spec is None:
+        return update
+    if _needs_followup(state, eval_data):
+        try:
+            return _keep_speculation(update, spec.result(), eval_ms)
+        except Exception:
+            metrics.incr("speculation.errors")
+            return update
+    metrics.incr("speculation.misses")
+    spec.add_done_callback(_record_waste)
+    return update
+
+
+async def anode_evaluate(state: InterviewState) -> Dict[str, Any]:
+    question, answer, current_topic = _eval_context(state)
+    spec = None
+    t0 = time.perf_counter()
+    try:
+        if is_non_answer(answer):
+            eval_data = non_answer_eval(question, answer, current_topic)
+        else:
+            eval_data = _pregrade(question, answer, current_topic)
+        if eval_data is None:
+            if _should_speculate(state, question, answer):
+                spec = asyncio.create_task(_atimed_followup(_speculative_request(question, answer)))
+            raw = await aevaluate_answer(question=question, answer=answer, topic=current_topic)
+            eval_data = finalize_eval(raw, question, answer, current_topic)
+    except Exception as e:
+        _say(f"Error evaluating answer: {e}")
+        eval_data = _degraded_eval(e, question, answer, current_topic)
+    eval_ms = (time.perf_counter() - t0) * 1000
+
+    update = _apply_eval(state, eval_data, current_topic)
+    update["digest"] = _update_digest(state, eval_data, _astart_fold)
+    if spec is None:
+        return update
+    if _needs_followup(state, eval_data):
+        try:
+            return _keep_speculation(update, await spec, eval_ms)
+        except Exception:
+            metrics.incr("speculation.errors")
+            return update
+    metrics.incr("speculation.misses")
+    if spec.done():
+        _record_waste(spec)
+    else:
+        # cancelled mid-flight: the wasted work is at most the eval window
+        spec.cancel()
+        metrics.observe("speculation.wasted_ms", eval_ms)
+    return update
+
+
+def _followup_skip(state: InterviewState) -> Dict[str, Any] | None:
     followup_depth = int(state.get("followup_depth", 0))
 
-    
     if MAX_FOLLOWUPS_PER_Q <= 0:
-      
-        return {**state, "followup_mode": False, "followup_depth": 0}
+        return {"followup_mode": False, "followup_depth": 0}
 
-  
     if followup_depth >= MAX_FOLLOWUPS_PER_Q:
-        return {**state, "followup_mode": False, "followup_depth": 0}
+        return {"followup_mode": False, "followup_depth": 0}
+    return None
 
 
-    fq = generate_followup(
-        question=last.get("question", ""),
-        answer=last.get("answer", ""),
-        hint=last.get("hint", ""),
-        misconceptions=last.get("misconceptions", []),
-    )
+def _followup_request(last: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "question": last.get("question", ""),
+        "answer": last.get("answer", ""),
+        "hint": last.get("hint", ""),
+        "misconceptions": last.get("misconceptions", []),
+    }
 
-    asked = [*state.get("asked", []), {"question": fq, "topic": last.get("topic"), "difficulty": "follow-up"}]
 
+def _apply_followup(state: InterviewState, last: Dict[str, Any], fq: str) -> Dict[str, Any]:
     return {
-        **state,
         "current_q": fq,
-        "asked": asked,
+        "question_streamed": False,
+        "asked": [{"question": fq, "topic": last.get("topic"), "difficulty": "follow-up"}],
         "followup_mode": True,
-        "followup_depth": followup_depth + 1,
+        "followup_depth": int(state.get("followup_depth", 0)) + 1,
+        "speculative_followup": None,
     }
 
 
-def node_increment_or_finish(state: InterviewState) -> InterviewState:
+def _fallback_followup(last: Dict[str, Any], e: Exception) -> str:
+    # no model: probe the grader's first misconception, or ask for an example
+    _say(f"Error generating follow-up: {e}; asking a fallback follow-up.")
+    metrics.incr("degraded.followup")
+    misconceptions = last.get("misconceptions") or []
+    if misconceptions:
+        return f"(Follow-up) Can you revisit this point: {str(misconceptions[0]).rstrip('.?')}?"
+    return "(Follow-up) Can you walk through a concrete example of your answer?"
+
+
+def node_followup(state: InterviewState) -> Dict[str, Any]:
+    last = state.get("evals", [])[-1] if state.get("evals") else {}
+    skipped = _followup_skip(state)
+    if skipped is not None:
+        return skipped
+
+    fq = state.get("speculative_followup")
+    preview = None
+    if not fq:
+        preview = _console_preview("(Follow-up) ")
+        try:
+            fq = generate_followup(**_followup_request(last), on_token=preview)
+        except Exception as e:
+            if preview and preview.text:
+                _say()
+            fq = _fallback_followup(last, e)
+            preview = None
+    update = _apply_followup(state, last, fq)
+    if preview:
+        update["question_streamed"] = preview.finish(fq)
+    return update
+
+
+async def anode_followup(state: InterviewState) -> Dict[str, Any]:
+    last = state.get("evals", [])[-1] if state.get("evals") else {}
+    skipped = _followup_skip(state)
+    if skipped is not None:
+        return skipped
+
+    fq = state.get("speculative_followup")
+    if fq:
+        on_token = _token_writer("followup")
+        if on_token:
+            on_token(fq)
+    else:
+        try:
+            fq = await agenerate_followup(**_followup_request(last), on_token=_token_writer("followup"))
+        except Exception as e:
+            fq = _fallback_followup(last, e)
+    return _apply_followup(state, last, fq)
+
+
+def node_increment_or_finish(state: InterviewState) -> Dict[str, Any]:
    
-    main_qs = [q for q in state.get("asked", []) if isinstance(q, dict) and q.get("difficulty") != "follow-up"]
     max_q = int(state.get("max_q", 4))
-    done = len(main_qs) >= max_q
+    done = int(state.get("main_count", 0)) >= max_q
 
 
     steps = int(state.get("steps", 0))
     if steps >= MAX_TOTAL_STEPS:
-        print("Reached total step limit; finishing interview to avoid infinite loop.")
+        _say("Reached total step limit; finishing interview to avoid infinite loop.")
         done = True
 
-    return {**state, "done": done}
+    return {"done": done}
 
 
-def node_summary(state: InterviewState) -> InterviewState:
-    
-    summary = generate_summary(
-        topic="Multi-topic",
-        evaluations=state.get("evals", []),
-        max_q=int(state.get("max_q", 4)),
-    )
+def _summary_request(state: InterviewState, digest: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "topic": "Multi-topic",
+        "digest": digest,
+        "max_q": int(state.get("max_q", 4)),
+    }
+
 
-    print("\n===== Interview Summary =====")
-    print(f"Topics Covered: {state.get('topics', [state.get('topic', 'Python')])}")
-    print(f"Asked: {len([q for q in state.get('asked', []) if isinstance(q, dict) and q.get('difficulty') != 'follow-up'])} main question(s)")
-    print(f"Final grade: {summary.get('final_grade')}, signal: {summary.get('signal')}")
+def _apply_summary(state: InterviewState, summary: Dict[str, Any]) -> Dict[str, Any]:
+    _say("\n===== Interview Summary =====")
+    _say(f"Topics Covered: {state.get('topics', [state.get('topic', 'Python')])}")
+    _say(f"Asked: {int(state.get('main_count', 0))} main question(s)")
+    _say(f"Final grade: {summary.get('final_grade')}, signal: {summary.get('signal')}")
     if summary.get("feedback"):
-        print(f"\nFeedback: {summary['feedback']}")
+        _say(f"\nFeedback: {summary['feedback']}")
 
     if state.get("topic_performance"):
-        print("\nPer-topic Performance:")
+        _say("\nPer-topic Performance:")
         for topic, perf in state["topic_performance"].items():
             avg = perf["total_score"] / perf["questions"] if perf["questions"] else 0.0
-            print(f"  • {topic}: {perf['questions']} questions, Avg Score: {avg:.2f}")
+            std = perf.get("variance", 0.0) ** 0.5
+            _say(f"  • {topic}: {perf['questions']} questions, Avg Score: {avg:.2f} ± {std:.2f}")
 
     if summary.get("strengths"):
-        print("\nStrengths:")
+        _say("\nStrengths:")
         for s in summary["strengths"]:
-            print(f"  • {s}")
+            _say(f"  • {s}")
     if summary.get("recommendations"):
-        print("\nRecommendations:")
+        _say("\nRecommendations:")
         for r in summary["recommendations"]:
-            print(f"  • {r}")
-    print("=============================\n")
+            _say(f"  • {r}")
+    _say("=============================\n")
+
+    return {"summary": summary}
+
+
+def _finish_digest(state: InterviewState) -> Dict[str, Any]:
+    # the last fold was started while the candidate answered, so this rarely
+    # waits; lines a lagging fold never reached are folded now, which keeps
+    # the summary input bounded
+    digest = state.get("digest") or new_digest()
+    fold = _digest_folds.get(digest["id"])
+    if fold is not None:
+        wait([fold])
+    digest, lines = take_fold(_collect_fold(digest))
+    if lines:
+        digest = apply_fold(digest, _fold_result(_start_fold(digest["notes"], lines)))
+    return digest
+
+
+async def _afinish_digest(state: InterviewState) -> Dict[str, Any]:
+    digest = state.get("digest") or new_digest()
+    fold = _digest_folds.get(digest["id"])
+    if fold is not None:
+        await asyncio.wait([fold])
+    digest, lines = take_fold(_collect_fold(digest))
+    if lines:
+        fold = _astart_fold(digest["notes"], lines)
+        await asyncio.wait([fold])
+        digest = apply_fold(digest, _fold_result(fold))
+    return digest
+
+
+def _fallback_summary(state: InterviewState, e: Exception) -> Dict[str, Any]:
+    _say(f"Error generating summary: {e}; summarising locally.")
+    metrics.incr("degraded.summary")
+    return local_summary(state.get("evals", []), state.get("topic_performance"))
+
+
+def _local_summary(state: InterviewState) -> Dict[str, Any]:
+    return _apply_summary(state, local_summary(state.get("evals", []), state.get("topic_performance")))
+
+
+def node_summary(state: InterviewState) -> Dict[str, Any]:
+    if state.get("summary_mode") == "local":
+        return _local_summary(state)
+    digest = _finish_digest(state)
+    try:
+        summary = generate_summary(**_summary_request(state, digest))
+    except Exception as e:
+        summary = _fallback_summary(state, e)
+    return {**_apply_summary(state, summary), "digest": digest}
+
 
-    return {**state, "summary": summary}
+async def anode_summary(state: InterviewState) -> Dict[str, Any]:
+    if state.get("summary_mode") == "local":
+        return _local_summary(state)
+    digest = await _afinish_digest(state)
+    try:
+        summary = await agenerate_summary(**_summary_request(state, digest))
+    except Exception as e:
+        summary = _fallback_summary(state, e)
+    return {**_apply_summary(state, summary), "digest": digest}
 
 
 
+def _needs_followup(state: InterviewState, last: Dict[str, Any]) -> bool:
+    return bool(
+        last.get("followup_needed") and not state.get("followup_mode")
+        and MAX_FOLLOWUPS_PER_Q > 0 and int(state.get("followup_depth", 0)) < MAX_FOLLOWUPS_PER_Q
+    )
+
+
 def cond_need_followup(state: InterviewState) -> str:
     evals = state.get("evals", [])
     if not evals:
         return "continue"
-    last = evals[-1]
-   
-    if last.get("followup_needed") and not state.get("followup_mode") and MAX_FOLLOWUPS_PER_Q > 0 and int(state.get("followup_depth", 0)) < MAX_FOLLOWUPS_PER_Q:
-        return "followup"
-    return "continue"
+    return "followup" if _needs_followup(state, evals[-1]) else "continue"
+
+
+def cond_plan_ahead(state: InterviewState) -> str:
+    return "plan" if state.get("plan_ahead") else "skip"
 
 
 def cond_continue_or_finish(state: InterviewState) -> str:
@@ -321,17 +746,28 @@ def cond_continue_or_finish(state: InterviewState) -> str:
 
 
 
-def build_graph():
-    g = StateGraph(InterviewState)
+def _node(name: str, func, afunc) -> RunnableLambda:
+    # sync body for graph.invoke (CLI), async body for graph.ainvoke; both
+    # traced when tracing is enabled (src/utils/logging.py)
+    return RunnableLambda(trace_node(name, func), afunc=trace_node(name, afunc), name=func.__name__)
 
-    g.add_node("next_question", node_next_question)
-    g.add_node("ask", node_ask)
-    g.add_node("evaluate", node_evaluate)
-    g.add_node("followup", node_followup)
-    g.add_node("increment_or_finish", node_increment_or_finish)
-    g.add_node("summary", node_summary)
 
-    g.add_edge(START, "next_question")
+def build_graph(checkpointer=None, interrupt_before: List[str] | None = None):
+    g = StateGraph(InterviewState)
+
+    g.add_node("plan", _node("plan", node_plan, anode_plan))
+    g.add_node("next_question", _node("next_question", node_next_question, anode_next_question))
+    g.add_node("ask", _node("ask", node_ask, anode_ask))
+    g.add_node("evaluate", _node("evaluate", node_evaluate, anode_evaluate))
+    g.add_node("followup", _node("followup", node_followup, anode_followup))
+    g.add_node("increment_or_finish", RunnableLambda(trace_node("increment_or_finish", node_increment_or_finish), name="node_increment_or_finish"))
+    g.add_node("summary", _node("summary", node_summary, anode_summary))
+
+    g.add_conditional_edges(START, cond_plan_ahead, {
+        "plan": "plan",
+        "skip": "next_question",
+    })
+    g.add_edge("plan", "next_question")
     g.add_edge("next_question", "ask")
     g.add_edge("ask", "evaluate")
 
@@ -349,4 +785,4 @@ def build_graph():
 
     g.add_edge("summary", END)
 
-    return g.compile()
+    return g.compile(checkpointer=checkpointer, interrupt_before=interrupt_before)
@@ -0,0 +1,333 @@
+# src/graph/store.py
+from __future__ import annotations
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ..utils import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    thread_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def _pack(snap: Dict[str, Any]) -> bytes:
+    return zlib.compress(pickle.dumps(snap, pickle.HIGHEST_PROTOCOL))
+
+
+class TieredSaver(InMemorySaver):
+    # InMemorySaver for active threads plus compressed per-thread snapshots in
+    # SQLite. Threads over the byte budget (least recently used first) or idle
+    # longer than idle_seconds are dropped from memory and reloaded on their
+    # next read or write. Snapshots hold only the latest checkpoint of each
+    # namespace, so a reloaded thread has no history before that point.
+    #
+    # With write_through every put also refreshes the snapshot, so a new
+    # process on the same file resumes where a crashed one stopped. The
+    # refresh runs on a background flusher thread, not under put: the graph
+    # calls put on the event loop, and pickling plus compressing a thread
+    # there would stall every other session. The flusher also spills idle
+    # threads every sweep_seconds, whether or not anything is being written.
+    # The snapshots are pickled; the file is trusted local state, like
+    # langgraph's PersistentDict.
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 32 * 1024 * 1024,
+        idle_seconds: float = 300.0,
+        write_through: bool = True,
+        sweep_seconds: Optional[float] = None,
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.write_through = write_through
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # thread -> last access, in LRU order
+        self._hot: "OrderedDict[str, float]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total = 0
+        self._write_sizes: Dict[Tuple[str, str, str], int] = {}
+        self._blob_keys: Dict[str, Set[tuple]] = {}
+        self._write_keys: Dict[str, Set[tuple]] = {}
+        self._dirty: Set[str] = set()
+        # threads the flusher is snapshotting outside the lock; False once a
+        # spill, close or delete makes its copy stale
+        self._flushing: Dict[str, bool] = {}
+        self.sweep_seconds = min(idle_seconds / 2, 30.0) if sweep_seconds is None else sweep_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-store-flush", daemon=True)
+        self._flusher.start()
+
+    # --- tiering -----------------------------------------------------------
+
+    @property
+    def hot_bytes(self) -> int:
+        return self._total
+
+    def _grow(self, thread_id: str, size: int) -> None:
+        self._sizes[thread_id] = self._sizes.get(thread_id, 0) + size
+        self._total += size
+
+    def has_thread(self, thread_id: str) -> bool:
+        with self._lock:
+            if thread_id in self._hot:
+                return True
+            return self._db.execute("SELECT 1 FROM snapshots WHERE thread_id = ?", (thread_id,)).fetchone() is not None
+
+    def _touch(self, thread_id: str) -> None:
+        if thread_id in self._hot:
+            self._hot.move_to_end(thread_id)
+            self._hot[thread_id] = time.monotonic()
+            return
+        self._hot[thread_id] = time.monotonic()
+        row = self._db.execute("SELECT data FROM snapshots WHERE thread_id = ?", (thread_id,)).fetchone()
+        if row is not None:
+            self._load(thread_id, pickle.loads(zlib.decompress(row[0])))
+            metrics.incr("sessions.rehydrated")
+
+    def _load(self, thread_id: str, snap: Dict[str, Any]) -> None:
+        size = 0
+        for ns, checkpoints in snap["storage"].items():
+            self.storage[thread_id][ns].update(checkpoints)
+            size += sum(len(c) + len(m) for (_, c), (_, m), _ in checkpoints.values())
+        for key, value in snap["blobs"].items():
+            self.blobs[key] = value
+            size += len(value[1])
+        self._blob_keys[thread_id] = set(snap["blobs"])
+        for key, writes in snap["writes"].items():
+            self.writes[key] = dict(writes)
+            self._write_sizes[key] = sum(len(w[2][1]) for w in writes.values())
+        self._write_keys[thread_id] = set(snap["writes"])
+        self._grow(thread_id, size + sum(self._write_sizes[k] for k in snap["writes"]))
+
+    def _capture(self, thread_id: str) -> Dict[str, Any]:
+        # latest checkpoint per namespace, its pending writes and the blobs
+        # it references; caller holds the lock. Only references are copied,
+        # the checkpoint bytes themselves are immutable
+        storage: Dict[str, Dict[str, tuple]] = {}
+        blobs: Dict[tuple, tuple] = {}
+        writes: Dict[tuple, dict] = {}
+        for ns, checkpoints in self.storage.get(thread_id, {}).items():
+            if not checkpoints:
+                continue
+            checkpoint_id = max(checkpoints)
+            saved = checkpoints[checkpoint_id]
+            storage[ns] = {checkpoint_id: saved}
+            for channel, version in self.serde.loads_typed(saved[0])["channel_versions"].items():
+                key = (thread_id, ns, channel, version)
+                if key in self.blobs:
+                    blobs[key] = self.blobs[key]
+            key = (thread_id, ns, checkpoint_id)
+            if self.writes.get(key):
+                writes[key] = dict(self.writes[key])
+        self._dirty.discard(thread_id)
+        return {"storage": storage, "blobs": blobs, "writes": writes}
+
+    def _write(self, thread_id: str, data: bytes) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO snapshots (thread_id, data, size, updated) VALUES (?, ?, ?, ?)",
+            (thread_id, data, len(data), time.time()),
+        )
+        metrics.incr("sessions.snapshots")
+        metrics.observe("sessions.snapshot_bytes", len(data))
+
+    def _snapshot(self, thread_id: str) -> None:
+        # synchronous snapshot, for spills and close; caller holds the lock
+        if thread_id in self._flushing:
+            self._flushing[thread_id] = False
+        self._write(thread_id, _pack(self._capture(thread_id)))
+
+    def flush(self) -> None:
+        # write every dirty thread; only capturing and the sqlite write hold
+        # the lock, pickling and compressing run outside it
+        with self._lock:
+            dirty = list(self._dirty)
+        for thread_id in dirty:
+            with self._lock:
+                if thread_id not in self._dirty:
+                    continue
+                snap = self._capture(thread_id)
+                self._flushing[thread_id] = True
+            data = _pack(snap)
+            with self._lock:
+                if self._flushing.pop(thread_id, False):
+                    self._write(thread_id, data)
+
+    def sweep(self) -> None:
+        # spill threads idle longer than idle_seconds
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [t for t, last in self._hot.items() if last < cutoff]
+        for thread_id in idle:
+            with self._lock:
+                if thread_id in self._hot and self._hot[thread_id] < cutoff:
+                    self.spill(thread_id)
+
+    def _flush_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.sweep_seconds)
+            self._wake.clear()
+            if self.write_through:
+                self.flush()
+            self.sweep()
+
+    def _drop(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+            self._write_sizes.pop(key, None)
+        self._hot.pop(thread_id, None)
+        self._total -= self._sizes.pop(thread_id, 0)
+        self._dirty.discard(thread_id)
+        if thread_id in self._flushing:
+            self._flushing[thread_id] = False
+
+    def spill(self, thread_id: str) -> None:
+        with self._lock:
+            if thread_id not in self._hot:
+                return
+            if thread_id in self._dirty:
+                self._snapshot(thread_id)
+            self._drop(thread_id)
+            metrics.incr("sessions.spilled")
+
+    def _evict(self, keep: str) -> None:
+        # least recently used first until the budget fits (idle threads go
+        # in sweep); the thread being written is never spilled under its own
+        # caller
+        for thread_id in list(self._hot):
+            if self._total <= self.max_bytes:
+                break
+            if thread_id != keep:
+                self.spill(thread_id)
+
+    # --- checkpointer ------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # without a thread id only hot threads are listed
+        with self._lock:
+            if config:
+                self._touch(config["configurable"]["thread_id"])
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._touch(thread_id)
+            out = super().put(config, checkpoint, metadata, new_versions)
+            keys = self._blob_keys.setdefault(thread_id, set())
+            size = 0
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                keys.add(key)
+                size += len(self.blobs[key][1])
+            (_, c), (_, m), _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            self._grow(thread_id, size + len(c) + len(m))
+            self._dirty.add(thread_id)
+            self._evict(keep=thread_id)
+        if self.write_through:
+            self._wake.set()
+        return out
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            self._touch(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            size = sum(len(w[2][1]) for w in self.writes.get(key, {}).values())
+            self._grow(thread_id, size - self._write_sizes.get(key, 0))
+            self._write_sizes[key] = size
+            self._write_keys.setdefault(thread_id, set()).add(key)
+            self._dirty.add(thread_id)
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop(thread_id)
+            super().delete_thread(thread_id)
+            self._db.execute("DELETE FROM snapshots WHERE thread_id = ?", (thread_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cold, cold_bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM snapshots").fetchone()
+            return {
+                "path": self.path,
+                "hot_threads": len(self._hot),
+                "hot_bytes": self.hot_bytes,
+                "max_bytes": self.max_bytes,
+                "snapshots": cold,
+                "snapshot_bytes": cold_bytes,
+            }
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._flusher.join()
+        with self._lock:
+            for thread_id in list(self._dirty):
+                self._snapshot(thread_id)
+            self._db.close()
+
+
+def build_checkpointer() -> InMemorySaver:
+    # SESSION_STORE=tiered keeps idle sessions on disk and survives restarts;
+    # the default stays purely in memory
+    if os.getenv("SESSION_STORE", "memory") != "tiered":
+        return InMemorySaver()
+    return TieredSaver(
+        path=os.getenv("SESSION_STORE_PATH", os.path.join(".cache", "sessions.sqlite")),
+        max_bytes=int(float(os.getenv("SESSION_HOT_MB", "32")) * 1024 * 1024),
+        idle_seconds=float(os.getenv("SESSION_IDLE_SECONDS", "300")),
+        write_through=os.getenv("SESSION_WRITE_THROUGH", "1") == "1",
+    )
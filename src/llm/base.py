@@ -1,14 +1,250 @@
 # src/llm/base.py
 from __future__ import annotations
-from typing import List, Dict
+import asyncio
+import atexit
+import os
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Iterator, List, Dict, NamedTuple, Tuple
 
-from .ollama_client import OllamaClient
+from ..utils import logging as tracing
+from ..utils import metrics
+from ..utils.jsonscan import JsonObjectScanner
+from .ollama_client import OllamaClient, AsyncOllamaClient, DEFAULT_HOST
+from .pool import AsyncPooledClient, PooledClient, close_pools, hosts_of, pool_for
+from .resilience import AsyncResilientClient, ResilientClient
 
 
 class LLMClient:
     def chat(self, messages: List[Dict], **kwargs) -> str:
         raise NotImplementedError
 
+    def stream(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        yield self.chat(messages, **kwargs)
 
-def build_llm() -> OllamaClient:
-    return OllamaClient()
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    async def astream(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        yield await self.achat(messages, **kwargs)
+
+
+async def achat(llm, messages: List[Dict], **kwargs) -> str:
+    # sync-only clients (e.g. test doubles) are pushed onto a worker thread
+    if hasattr(llm, "achat"):
+        return await llm.achat(messages, **kwargs)
+    return await asyncio.to_thread(llm.chat, messages, **kwargs)
+
+
+def _record_ttft(t0: float) -> None:
+    metrics.observe("llm.ttft_ms", (time.perf_counter() - t0) * 1000)
+
+
+def chat_stream(llm, messages: List[Dict], on_token: Callable[[str], None], **kwargs) -> str:
+    # forwards each chunk to on_token and returns the full text; clients
+    # without stream() report their whole reply as a single chunk
+    t0 = time.perf_counter()
+    if not hasattr(llm, "stream"):
+        text = llm.chat(messages, **kwargs)
+        _record_ttft(t0)
+        on_token(text)
+        return text
+    parts = []
+    for chunk in llm.stream(messages, **kwargs):
+        if not parts:
+            _record_ttft(t0)
+        parts.append(chunk)
+        on_token(chunk)
+    return "".join(parts)
+
+
+async def achat_stream(llm, messages: List[Dict], on_token: Callable[[str], None], **kwargs) -> str:
+    # async twin of chat_stream
+    t0 = time.perf_counter()
+    if not hasattr(llm, "astream"):
+        text = await achat(llm, messages, **kwargs)
+        _record_ttft(t0)
+        on_token(text)
+        return text
+    parts = []
+    async for chunk in llm.astream(messages, **kwargs):
+        if not parts:
+            _record_ttft(t0)
+        parts.append(chunk)
+        on_token(chunk)
+    return "".join(parts)
+
+
+def chat_json(llm, messages: List[Dict], **kwargs) -> str:
+    # streams until the first complete top-level JSON object, then closes the
+    # stream so the server stops decoding whatever prose would follow it.
+    # Closed streams are not cached, so the object is cached here instead
+    if not hasattr(llm, "stream"):
+        return llm.chat(messages, **kwargs)
+    scanner = JsonObjectScanner()
+    stream = llm.stream(messages, **kwargs)
+    obj = None
+    try:
+        for chunk in stream:
+            obj = scanner.feed(chunk)
+            if obj is not None:
+                metrics.incr("llm.json_early_stops")
+                break
+    finally:
+        stream.close()
+    if obj is None:
+        return scanner.text
+    if hasattr(llm, "remember"):
+        llm.remember(messages, obj, **kwargs)
+    return obj
+
+
+async def achat_json(llm, messages: List[Dict], **kwargs) -> str:
+    # async twin of chat_json
+    if not hasattr(llm, "astream"):
+        return await achat(llm, messages, **kwargs)
+    scanner = JsonObjectScanner()
+    stream = llm.astream(messages, **kwargs)
+    obj = None
+    try:
+        async for chunk in stream:
+            obj = scanner.feed(chunk)
+            if obj is not None:
+                metrics.incr("llm.json_early_stops")
+                break
+    finally:
+        await stream.aclose()
+    if obj is None:
+        return scanner.text
+    if hasattr(llm, "remember"):
+        await asyncio.to_thread(llm.remember, messages, obj, **kwargs)
+    return obj
+
+
+class Backend(NamedTuple):
+    # factories take (host, model); host and model give the backend's defaults.
+    # health is a cheap GET path the host pool polls (llm/pool.py)
+    client: Callable[[str, str], Any]
+    async_client: Callable[[str, str], Any]
+    host: Callable[[], str]
+    model: Callable[[], str]
+    health: str = ""
+
+
+_backends: Dict[str, Backend] = {}
+
+
+def register_backend(name: str, backend: Backend) -> None:
+    _backends[name] = backend
+
+
+def _openai(host: str, model: str):
+    from .local_client import OpenAICompatClient
+    return OpenAICompatClient(host=host, model=model)
+
+
+def _async_openai(host: str, model: str):
+    from .local_client import AsyncOpenAICompatClient
+    return AsyncOpenAICompatClient(host=host, model=model)
+
+
+def _fake(host: str, model: str):
+    from .fake_client import FakeClient
+    return FakeClient(host=host, model=model)
+
+
+register_backend("ollama", Backend(
+    lambda host, model: OllamaClient(host=host, model=model),
+    lambda host, model: AsyncOllamaClient(host=host, model=model),
+    lambda: os.getenv("OLLAMA_HOST", DEFAULT_HOST),
+    lambda: os.getenv("OLLAMA_MODEL", "mistral"),
+    "/api/version",
+))
+# any OpenAI-compatible server: llama.cpp's llama-server, vLLM, LM Studio
+register_backend("openai", Backend(
+    _openai, _async_openai,
+    lambda: os.getenv("OPENAI_BASE_URL", "http://localhost:8080/v1"),
+    lambda: os.getenv("OPENAI_MODEL", "local"),
+    "/models",
+))
+register_backend("fake", Backend(_fake, _fake, lambda: "in-process", lambda: "fake"))
+
+
+def route(kind: str | None = None) -> Tuple[str, str, str]:
+    # (backend, host, model) for a call kind. LLM_ROUTE_<KIND>=backend[:model]
+    # picks them per kind (question, followup, eval, summary, digest, plan);
+    # anything unrouted uses LLM_PROVIDER and that backend's default model.
+    # The host may be a comma-separated list, served by a host pool
+    spec = os.getenv(f"LLM_ROUTE_{kind.upper()}", "").strip() if kind else ""
+    name, _, model = spec.partition(":")
+    name = name or os.getenv("LLM_PROVIDER", "ollama")
+    backend = _backends.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown LLM backend {name!r} (known: {', '.join(sorted(_backends))})")
+    return name, backend.host(), model or backend.model()
+
+
+_clients: Dict[Tuple[str, str, str], Any] = {}
+_clients_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str, str], Any]]" = weakref.WeakKeyDictionary()
+
+
+def _backend_client(key: Tuple[str, str, str], sync: bool) -> Any:
+    backend = _backends[key[0]]
+    factory = backend.client if sync else backend.async_client
+    urls = hosts_of(key[1])
+    if len(urls) < 2:
+        return factory(key[1], key[2])
+    pooled = PooledClient if sync else AsyncPooledClient
+    return pooled(pool_for(urls, backend.health), factory, key[2])
+
+
+def build_llm(kind: str | None = None) -> Any:
+    # process-wide registry: one pooled client per (backend, host, model),
+    # spread over a host pool when the host lists several (llm/pool.py), and
+    # wrapped with deadlines, retries, hedging and the host's circuit breaker
+    # (llm/resilience.py). The route defaults to the call kind of the calling
+    # service (tracing.call_kind), so services need not name it.
+    key = route(kind or tracing.current_call())
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = ResilientClient(_backend_client(key, True), key[1])
+    return client
+
+
+def build_async_llm(kind: str | None = None) -> Any:
+    # same registry for async clients, scoped to the running event loop
+    key = route(kind or tracing.current_call())
+    per_loop = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = per_loop.get(key)
+    if client is None:
+        client = per_loop[key] = AsyncResilientClient(_backend_client(key, False), key[1])
+    return client
+
+
+def close_llm() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+    close_pools()
+
+
+async def aclose_llm() -> None:
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+
+atexit.register(close_llm)
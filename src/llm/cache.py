@@ -0,0 +1,146 @@
+# src/llm/cache.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..utils import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def cache_key(backend: str, scope: str, model: str, messages: List[Dict], options: Dict[str, Any]) -> str:
+    # scope is the host (or host pool) that served the reply: the same model
+    # name on two servers may be different weights, quants or templates
+    blob = json.dumps({"backend": backend, "scope": scope, "model": model, "messages": messages, "options": options},
+                      sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttl: float = 7 * 24 * 3600, max_temperature: float = 0.2) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def cacheable(self, options: Dict[str, Any]) -> bool:
+        try:
+            return float(options.get("temperature", 1.0)) <= self.max_temperature
+        except (TypeError, ValueError):
+            return False
+
+    def _bump(self, name: str) -> None:
+        metrics.incr(f"llm_cache.{name}")
+        self._db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bump("misses")
+                return None
+            self._db.execute("UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._bump("hits")
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # least recently used first until the byte budget fits again
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+        metrics.incr("llm_cache.evictions", len(victims))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            counters = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+    def purge(self, expired_only: bool = False) -> int:
+        with self._lock:
+            if expired_only:
+                cur = self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            else:
+                cur = self._db.execute("DELETE FROM responses")
+                self._db.execute("DELETE FROM counters")
+            return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[LLMCache]:
+    # opt-in via LLM_CACHE=1; one shared instance per process
+    global _cache
+    if os.getenv("LLM_CACHE", "0") != "1":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    path=os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")),
+                    max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024),
+                    ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                    max_temperature=float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2")),
+                )
+    return _cache
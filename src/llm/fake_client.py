@@ -0,0 +1,136 @@
+# src/llm/fake_client.py
+# In-process stand-in for a model server (LLM_PROVIDER=fake, or a route such
+# as LLM_ROUTE_FOLLOWUP=fake). Replies are scripted and deterministic; the
+# same script backs scripts/fake_ollama.py, which serves it over HTTP.
+from __future__ import annotations
+import hashlib
+import json
+import re
+import threading
+from typing import AsyncIterator, Dict, Iterator, List
+
+from ..utils import logging as tracing
+from .base import LLMClient
+
+EVAL_REPLY = json.dumps({
+    "accuracy": 6, "clarity": 7, "depth": 5, "overall": 6,
+    "followup_needed": False, "rationale": "Reasonable answer.", "misconceptions": [], "hint": "",
+})
+SUMMARY_REPLY = json.dumps({
+    "feedback": "Solid fundamentals.", "strengths": ["Clear answers"],
+    "recommendations": ["Go deeper on trade-offs"], "final_grade": 6, "signal": "borderline",
+})
+FOLLOWUP_REPLY = "Can you walk through a concrete example of that"
+QUESTION_REPLY = "Explain how you would approach this problem and why"
+
+# scripted replies: the n-th request with the same prompt gets variant n, so
+# a run is reproducible and repeated question prompts do not trip the
+# near-duplicate check. Variants share no content words.
+QUESTION_SCRIPT = [
+    QUESTION_REPLY,
+    "Describe how {topic} manages memory for long running services",
+    "Which data structures in {topic} suit a bounded cache",
+    "Outline error handling conventions that {topic} libraries follow",
+    "Compare threads against event loops when writing {topic} servers",
+    "Walk through testing strategy choices for a {topic} codebase",
+    "Show ways to profile slow startup inside {topic} programs",
+    "Design packaging plus dependency pinning for a {topic} monorepo",
+]
+FOLLOWUP_SCRIPT = [
+    FOLLOWUP_REPLY,
+    "What edge case would break your approach",
+    "How does complexity change once inputs grow tenfold",
+]
+_TOPIC_RE = re.compile(r'topic: "([^"]*)"')
+_ANSWER_RE = re.compile(r"^Answer: (.*)$", re.MULTILINE)
+
+
+def _stable(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _eval_reply(text: str) -> str:
+    # graded from the answer text alone: short answers score low and ask for a
+    # follow-up, the rest get a stable pseudo-random grade
+    m = _ANSWER_RE.search(text)
+    answer = m.group(1).strip() if m else ""
+    if len(answer.split()) < 3:
+        acc = 1
+    else:
+        acc = 4 + _stable(answer) % 6
+    return json.dumps({
+        "accuracy": acc, "clarity": min(10, acc + 1), "depth": max(0, acc - 1), "overall": acc,
+        "followup_needed": acc < 5, "rationale": "Scripted grade.", "misconceptions": [], "hint": "",
+    })
+
+
+def _summary_reply(text: str) -> str:
+    try:
+        grade = float(json.loads(text.split("DIGEST_JSON:", 1)[1])["mean"]["overall"])
+    except (ValueError, IndexError, TypeError, KeyError):
+        grade = 0
+    signal = "hire" if grade >= 7 else "borderline" if grade >= 5 else "no hire"
+    return json.dumps({
+        "feedback": f"Average grade {grade}.", "strengths": ["Clear answers"],
+        "recommendations": ["Go deeper on trade-offs"], "final_grade": grade, "signal": signal,
+    })
+
+
+def reply_for(messages: List[Dict], fmt: object = None, occurrence: int = 0) -> str:
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    if "DIGEST_JSON" in text:
+        return _summary_reply(text)
+    if "NEW_ANSWERS" in text:
+        return f"Covered {text.count(chr(10) + '- ')} more answers with mixed depth."
+    if '"accuracy"' in text or (isinstance(fmt, dict) and "accuracy" in fmt.get("properties", {})):
+        return _eval_reply(text)
+    if "follow-up" in text:
+        return FOLLOWUP_SCRIPT[occurrence % len(FOLLOWUP_SCRIPT)]
+    m = _TOPIC_RE.search(text)
+    return QUESTION_SCRIPT[occurrence % len(QUESTION_SCRIPT)].format(topic=m.group(1) if m else "this language")
+
+
+class FakeClient(LLMClient):
+    def __init__(self, host: str | None = None, model: str | None = None) -> None:
+        self.host = host or "in-process"
+        self.model = model or "fake"
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+
+    def _reply(self, messages: List[Dict], kwargs: Dict) -> str:
+        key = json.dumps(messages, sort_keys=True)
+        with self._lock:
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+        return reply_for(messages, kwargs.get("format"), n)
+
+    def chat(self, messages: List[Dict], **kwargs) -> str:
+        span = tracing.start("chat", self.model, model=self.model)
+        text = self._reply(messages, kwargs)
+        span.end()
+        return text
+
+    def stream(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        span = tracing.start("stream", self.model, model=self.model)
+        try:
+            for i, tok in enumerate(re.findall(r"\S+\s*|\s+", self._reply(messages, kwargs))):
+                if i == 0:
+                    span.mark("ttft_ms")
+                yield tok
+        except GeneratorExit:
+            span.end(closed_early=True)
+            raise
+        span.end()
+
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        return self.chat(messages, **kwargs)
+
+    async def astream(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        for tok in self.stream(messages, **kwargs):
+            yield tok
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
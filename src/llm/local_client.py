@@ -0,0 +1,267 @@
+# src/llm/local_client.py
+# Client for OpenAI-compatible chat servers (llama.cpp's llama-server, vLLM,
+# LM Studio, ...): POST {base_url}/chat/completions, with server-sent events
+# when streaming. Same surface as the Ollama clients, and it shares their
+# per-host slots, response cache and tracing spans.
+from __future__ import annotations
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+from ..utils import logging as tracing
+from .ollama_client import (
+    _async_slots_for, _default_options, _int_env, _key_for, _limits, _record_usage, _slots_for, _timeout,
+)
+from .cache import get_cache
+
+DEFAULT_BASE_URL = "http://localhost:8080/v1"
+
+
+def _headers() -> Dict[str, str]:
+    key = os.getenv("OPENAI_API_KEY", "")
+    return {"Authorization": f"Bearer {key}"} if key else {}
+
+
+def _payload(model: str, messages: List[Dict], options: Dict[str, Any], fmt: Any, stream: bool) -> Dict[str, Any]:
+    # Ollama-style options and format mapped onto the OpenAI request;
+    # num_ctx is a server launch flag there, so it is dropped
+    body: Dict[str, Any] = {"model": model, "messages": messages, "stream": stream}
+    if "temperature" in options:
+        body["temperature"] = options["temperature"]
+    if "top_p" in options:
+        body["top_p"] = options["top_p"]
+    if options.get("num_predict"):
+        body["max_tokens"] = options["num_predict"]
+    if isinstance(fmt, dict):
+        body["response_format"] = {"type": "json_schema", "json_schema": {"name": "reply", "schema": fmt}}
+    elif fmt == "json":
+        body["response_format"] = {"type": "json_object"}
+    if stream:
+        body["stream_options"] = {"include_usage": True}
+    return body
+
+
+def _usage(resp: Dict[str, Any]) -> Dict[str, Any]:
+    # OpenAI usage block in the shape _record_usage and the spans expect
+    usage = resp.get("usage") or {}
+    return {"prompt_eval_count": usage.get("prompt_tokens"), "eval_count": usage.get("completion_tokens")}
+
+
+def _finished(line: str) -> bool:
+    # the [DONE] sentinel: the reply is complete and safe to cache
+    return line.startswith("data:") and line[5:].strip() == "[DONE]"
+
+
+def _event(line: str) -> Dict[str, Any] | None:
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    return json.loads(data)
+
+
+def _delta(event: Dict[str, Any]) -> str:
+    choices = event.get("choices") or []
+    return (choices[0].get("delta") or {}).get("content") or "" if choices else ""
+
+
+class OpenAICompatClient:
+    backend = "openai"
+
+    def __init__(self, host: str | None = None, model: str | None = None) -> None:
+        if httpx is None:
+            raise RuntimeError("httpx package not installed. pip install httpx")
+        self.host = (host or os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.model = model or os.getenv("OPENAI_MODEL", "local")
+        self.default_options: Dict[str, Any] = _default_options()
+
+        max_concurrency = _int_env("OPENAI_MAX_CONCURRENCY", 4)
+        self._slots = _slots_for(self.host, max_concurrency)
+        self.client = httpx.Client(base_url=self.host, headers=_headers(), limits=_limits(max_concurrency), timeout=_timeout())
+        self.cache = get_cache()
+        # cache entries are keyed by backend and host; a pool sets its name here
+        self.cache_scope = self.host
+
+    def chat(self, messages: List[Dict], **kwargs) -> str:
+        span = tracing.start("chat", self.model, model=self.model)
+        options = {**self.default_options, **(kwargs.pop("options", {}) or {})}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                return hit
+        try:
+            with self._slots:
+                span.mark("queue_ms")
+                r = self.client.post("/chat/completions", json=_payload(self.model, messages, options, fmt, False))
+                r.raise_for_status()
+                resp = r.json()
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        _record_usage(_usage(resp), span)
+        content = (resp["choices"][0]["message"].get("content") or "").strip()
+        if key is not None and content:
+            self.cache.put(key, self.model, content)
+        span.end()
+        return content
+
+    def stream(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        span = tracing.start("stream", self.model, model=self.model)
+        options = {**self.default_options, **(kwargs.pop("options", {}) or {})}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                yield hit
+                return
+        seen: List[str] = []
+        done = False
+        try:
+            with self._slots:
+                span.mark("queue_ms")
+                body = _payload(self.model, messages, options, fmt, True)
+                with self.client.stream("POST", "/chat/completions", json=body) as r:
+                    r.raise_for_status()
+                    for line in r.iter_lines():
+                        done = done or _finished(line)
+                        event = _event(line)
+                        if event is None:
+                            continue
+                        if event.get("usage"):
+                            _record_usage(_usage(event), span)
+                        text = _delta(event)
+                        if text:
+                            span.mark("ttft_ms")
+                            seen.append(text)
+                            yield text
+        except GeneratorExit:
+            span.end(closed_early=True)
+            raise
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        span.end()
+        if done:
+            self._store(key, seen)
+
+    def _store(self, key: str | None, parts: List[str]) -> None:
+        content = "".join(parts).strip()
+        if key is not None and content:
+            self.cache.put(key, self.model, content)
+
+    def remember(self, messages: List[Dict], content: str, **kwargs) -> None:
+        options = {**self.default_options, **(kwargs.get("options") or {})}
+        self._store(_key_for(self, messages, options, kwargs.get("format", "")), [content])
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncOpenAICompatClient:
+    # must be created inside a running event loop; pooled connections are bound to it
+    backend = "openai"
+
+    def __init__(self, host: str | None = None, model: str | None = None) -> None:
+        if httpx is None:
+            raise RuntimeError("httpx package not installed. pip install httpx")
+        self.host = (host or os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.model = model or os.getenv("OPENAI_MODEL", "local")
+        self.default_options: Dict[str, Any] = _default_options()
+
+        max_concurrency = _int_env("OPENAI_MAX_CONCURRENCY", 4)
+        self._slots = _async_slots_for(self.host, max_concurrency)
+        self.client = httpx.AsyncClient(base_url=self.host, headers=_headers(), limits=_limits(max_concurrency), timeout=_timeout())
+        self.cache = get_cache()
+        self.cache_scope = self.host
+
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        span = tracing.start("chat", self.model, model=self.model)
+        options = {**self.default_options, **(kwargs.pop("options", {}) or {})}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                return hit
+        try:
+            async with self._slots:
+                span.mark("queue_ms")
+                r = await self.client.post("/chat/completions", json=_payload(self.model, messages, options, fmt, False))
+                r.raise_for_status()
+                resp = r.json()
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        _record_usage(_usage(resp), span)
+        content = (resp["choices"][0]["message"].get("content") or "").strip()
+        if key is not None and content:
+            await asyncio.to_thread(self.cache.put, key, self.model, content)
+        span.end()
+        return content
+
+    async def astream(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        span = tracing.start("stream", self.model, model=self.model)
+        options = {**self.default_options, **(kwargs.pop("options", {}) or {})}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                yield hit
+                return
+        seen: List[str] = []
+        done = False
+        try:
+            async with self._slots:
+                span.mark("queue_ms")
+                body = _payload(self.model, messages, options, fmt, True)
+                async with self.client.stream("POST", "/chat/completions", json=body) as r:
+                    r.raise_for_status()
+                    async for line in r.aiter_lines():
+                        done = done or _finished(line)
+                        event = _event(line)
+                        if event is None:
+                            continue
+                        if event.get("usage"):
+                            _record_usage(_usage(event), span)
+                        text = _delta(event)
+                        if text:
+                            span.mark("ttft_ms")
+                            seen.append(text)
+                            yield text
+        except GeneratorExit:
+            span.end(closed_early=True)
+            raise
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        span.end()
+        if done:
+            self._store(key, seen)
+
+    def _store(self, key: str | None, parts: List[str]) -> None:
+        content = "".join(parts).strip()
+        if key is not None and content:
+            self.cache.put(key, self.model, content)
+
+    def remember(self, messages: List[Dict], content: str, **kwargs) -> None:
+        # sync, like the cache; achat_json runs it on a worker thread
+        options = {**self.default_options, **(kwargs.get("options") or {})}
+        self._store(_key_for(self, messages, options, kwargs.get("format", "")), [content])
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
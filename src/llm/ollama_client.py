@@ -1,12 +1,24 @@
 # src/llm/ollama_client.py
 from __future__ import annotations
+import asyncio
 import os
-from typing import List, Dict, Any
+import threading
+import weakref
+from typing import List, Dict, Any, AsyncIterator, Iterator
 
 try:
-    from ollama import Client as Ollama
-except Exception as e: 
+    import httpx
+    from ollama import Client as Ollama, AsyncClient as AsyncOllama
+except Exception as e:
+    httpx = None
     Ollama = None
+    AsyncOllama = None
+
+from ..utils import logging as tracing
+from ..utils import metrics
+from .cache import cache_key, get_cache
+
+DEFAULT_HOST = "http://localhost:11434"
 
 
 def _float_env(name: str, default: float) -> float:
@@ -23,26 +35,280 @@ def _int_env(name: str, default: int) -> int:
         return default
 
 
+def _default_options() -> Dict[str, Any]:
+    return {
+        "temperature": _float_env("OLLAMA_TEMPERATURE", 0.3),
+        "top_p": _float_env("OLLAMA_TOP_P", 0.9),
+        "num_ctx": _int_env("OLLAMA_NUM_CTX", 2048),
+        "num_predict": _int_env("OLLAMA_NUM_PREDICT", 256),
+    }
+
+
+def _keep_alive() -> float | str | None:
+    # how long Ollama keeps the model, and with it the KV cache of the shared
+    # prompt prefixes, loaded after a request: seconds, or a duration such as
+    # "30m"; -1 keeps it loaded. Unset leaves the server default (5m).
+    value = os.getenv("OLLAMA_KEEP_ALIVE", "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _timeout():
+    # transport backstop only: per-call deadlines live in llm/resilience.py.
+    # It bounds how long an abandoned (timed-out or hedged) request can hold
+    # its thread and connection; unset, a stalled server hung the call forever
+    return httpx.Timeout(_float_env("LLM_HTTP_TIMEOUT", 300.0), connect=5.0)
+
+
+def _limits(max_concurrency: int):
+    return httpx.Limits(
+        max_connections=max_concurrency,
+        max_keepalive_connections=max_concurrency,
+        keepalive_expiry=_float_env("OLLAMA_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+_async_host_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def _slots_for(host: str, limit: int) -> threading.BoundedSemaphore:
+    # one limiter per host, shared by every client (model) talking to it
+    with _host_slots_lock:
+        sem = _host_slots.get(host)
+        if sem is None:
+            sem = _host_slots[host] = threading.BoundedSemaphore(max(1, limit))
+        return sem
+
+
+def _async_slots_for(host: str, limit: int) -> asyncio.Semaphore:
+    per_loop = _async_host_slots.setdefault(asyncio.get_running_loop(), {})
+    sem = per_loop.get(host)
+    if sem is None:
+        sem = per_loop[host] = asyncio.Semaphore(max(1, limit))
+    return sem
+
+
+def _key_for(client, messages: List[Dict], options: Dict[str, Any], fmt: Any = "") -> str | None:
+    cache = client.cache
+    if cache is None or not cache.cacheable(options):
+        return None
+    options = {**options, "format": fmt} if fmt else options
+    return cache_key(client.backend, client.cache_scope, client.model, messages, options)
+
+
+def _record_usage(resp, span=tracing.NOOP) -> None:
+    # Ollama reports token counts and timings on the final (done) message
+    span.usage(resp)
+    if resp.get("prompt_eval_count") is not None:
+        metrics.observe("llm.prompt_tokens", resp["prompt_eval_count"])
+    if resp.get("eval_count") is not None:
+        metrics.observe("llm.eval_tokens", resp["eval_count"])
+
+
 class OllamaClient:
-    def __init__(self) -> None:
+    backend = "ollama"
+
+    def __init__(self, host: str | None = None, model: str | None = None) -> None:
         if Ollama is None:
             raise RuntimeError("ollama package not installed. pip install ollama")
-        host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-        self.model = os.getenv("OLLAMA_MODEL", "mistral")
+        self.host = host or os.getenv("OLLAMA_HOST", DEFAULT_HOST)
+        self.model = model or os.getenv("OLLAMA_MODEL", "mistral")
+        self.default_options: Dict[str, Any] = _default_options()
+        self.keep_alive = _keep_alive()
 
-        self.default_options: Dict[str, Any] = {
-            "temperature": _float_env("OLLAMA_TEMPERATURE", 0.3),
-            "top_p": _float_env("OLLAMA_TOP_P", 0.9),
-            "num_ctx": _int_env("OLLAMA_NUM_CTX", 2048),
-            "num_predict": _int_env("OLLAMA_NUM_PREDICT", 256),
-           
-        }
-
-        self.client = Ollama(host=host)
+        max_concurrency = _int_env("OLLAMA_MAX_CONCURRENCY", 4)
+        self._slots = _slots_for(self.host, max_concurrency)
+        # the connection pool is ours: ollama forwards transport to its httpx
+        # client, and close() shuts it without reaching into the library
+        self._transport = httpx.HTTPTransport(limits=_limits(max_concurrency))
+        self.client = Ollama(host=self.host, transport=self._transport, timeout=_timeout())
+        self.cache = get_cache()
+        # cache entries are keyed by host; a pool sets its name here instead
+        self.cache_scope = self.host
 
     def chat(self, messages: List[Dict], **kwargs) -> str:
-       
+        span = tracing.start("chat", self.model, model=self.model)
+        user_options = kwargs.pop("options", {}) or {}
+        options = {**self.default_options, **user_options}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                return hit
+        try:
+            with self._slots:
+                span.mark("queue_ms")
+                resp = self.client.chat(model=self.model, messages=messages, stream=False, format=fmt, options=options, keep_alive=self.keep_alive)
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        _record_usage(resp, span)
+        content = resp["message"]["content"].strip()
+        if key is not None and content:
+            self.cache.put(key, self.model, content)
+        span.end()
+        return content
+
+    def stream(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        # closing the generator early closes the HTTP response, which makes
+        # Ollama stop decoding. Only a reply that reached its done message is
+        # cached: a stream closed by a deadline, a lost hedge or the caller
+        # holds a fragment (chat_json caches its JSON object via remember())
+        span = tracing.start("stream", self.model, model=self.model)
         user_options = kwargs.pop("options", {}) or {}
         options = {**self.default_options, **user_options}
-        resp = self.client.chat(model=self.model, messages=messages, stream=False, options=options)
-        return resp["message"]["content"].strip()
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                yield hit
+                return
+        seen: List[str] = []
+        done = False
+        try:
+            with self._slots:
+                span.mark("queue_ms")
+                parts = self.client.chat(model=self.model, messages=messages, stream=True, format=fmt, options=options, keep_alive=self.keep_alive)
+                try:
+                    for part in parts:
+                        if part.get("done"):
+                            done = True
+                            _record_usage(part, span)
+                        text = part.get("message", {}).get("content", "")
+                        if text:
+                            span.mark("ttft_ms")
+                            seen.append(text)
+                            yield text
+                finally:
+                    parts.close()
+        except GeneratorExit:
+            span.end(closed_early=True)
+            raise
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        span.end()
+        if done:
+            self._store(key, seen)
+
+    def _store(self, key: str | None, parts: List[str]) -> None:
+        content = "".join(parts).strip()
+        if key is not None and content:
+            self.cache.put(key, self.model, content)
+
+    def remember(self, messages: List[Dict], content: str, **kwargs) -> None:
+        # caches a reply the caller ended early on purpose, under the key of
+        # the request that produced it
+        options = {**self.default_options, **(kwargs.get("options") or {})}
+        self._store(_key_for(self, messages, options, kwargs.get("format", "")), [content])
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncOllamaClient:
+    # must be created inside a running event loop; pooled connections are bound to it
+    backend = "ollama"
+
+    def __init__(self, host: str | None = None, model: str | None = None) -> None:
+        if AsyncOllama is None:
+            raise RuntimeError("ollama package not installed. pip install ollama")
+        self.host = host or os.getenv("OLLAMA_HOST", DEFAULT_HOST)
+        self.model = model or os.getenv("OLLAMA_MODEL", "mistral")
+        self.default_options: Dict[str, Any] = _default_options()
+        self.keep_alive = _keep_alive()
+
+        max_concurrency = _int_env("OLLAMA_MAX_CONCURRENCY", 4)
+        self._slots = _async_slots_for(self.host, max_concurrency)
+        self._transport = httpx.AsyncHTTPTransport(limits=_limits(max_concurrency))
+        self.client = AsyncOllama(host=self.host, transport=self._transport, timeout=_timeout())
+        self.cache = get_cache()
+        self.cache_scope = self.host
+
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        span = tracing.start("chat", self.model, model=self.model)
+        user_options = kwargs.pop("options", {}) or {}
+        options = {**self.default_options, **user_options}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                return hit
+        try:
+            async with self._slots:
+                span.mark("queue_ms")
+                resp = await self.client.chat(model=self.model, messages=messages, stream=False, format=fmt, options=options, keep_alive=self.keep_alive)
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        _record_usage(resp, span)
+        content = resp["message"]["content"].strip()
+        if key is not None and content:
+            await asyncio.to_thread(self.cache.put, key, self.model, content)
+        span.end()
+        return content
+
+    async def astream(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        span = tracing.start("stream", self.model, model=self.model)
+        user_options = kwargs.pop("options", {}) or {}
+        options = {**self.default_options, **user_options}
+        fmt = kwargs.pop("format", "")
+        key = _key_for(self, messages, options, fmt)
+        if key is not None:
+            hit = await asyncio.to_thread(self.cache.get, key)
+            if hit is not None:
+                span.end(cache_hit=True)
+                yield hit
+                return
+        seen: List[str] = []
+        done = False
+        try:
+            async with self._slots:
+                span.mark("queue_ms")
+                parts = await self.client.chat(model=self.model, messages=messages, stream=True, format=fmt, options=options, keep_alive=self.keep_alive)
+                try:
+                    async for part in parts:
+                        if part.get("done"):
+                            done = True
+                            _record_usage(part, span)
+                        text = part.get("message", {}).get("content", "")
+                        if text:
+                            span.mark("ttft_ms")
+                            seen.append(text)
+                            yield text
+                finally:
+                    await parts.aclose()
+        except GeneratorExit:
+            span.end(closed_early=True)
+            raise
+        except Exception as e:
+            span.end(error=type(e).__name__)
+            raise
+        span.end()
+        if done:
+            self._store(key, seen)
+
+    def _store(self, key: str | None, parts: List[str]) -> None:
+        content = "".join(parts).strip()
+        if key is not None and content:
+            self.cache.put(key, self.model, content)
+
+    def remember(self, messages: List[Dict], content: str, **kwargs) -> None:
+        # sync, like the cache; achat_json runs it on a worker thread
+        options = {**self.default_options, **(kwargs.get("options") or {})}
+        self._store(_key_for(self, messages, options, kwargs.get("format", "")), [content])
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
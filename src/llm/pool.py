@@ -0,0 +1,242 @@
+# src/llm/pool.py
+# Several servers behind one backend: OLLAMA_HOST (or OPENAI_BASE_URL) may
+# list hosts separated by commas. llm/base.py then builds one client per host
+# behind a PooledClient, and each request goes to the healthy host with the
+# fewest requests in flight (least outstanding requests; ties rotate), so a
+# slow or busy box gets less work instead of an equal share:
+#   health    every LLM_POOL_HEALTH_INTERVAL seconds each host's health path
+#             (the backend's cheapest GET) is fetched; a failure ejects the
+#             host, a success re-admits it. LLM_POOL_FAILURES consecutive
+#             failed requests (connection errors, 429, 5xx) also eject it.
+#             With health checks off (interval 0, or a backend without a
+#             health path) nothing is ejected, as nothing could re-admit it
+#   affinity  LLM_POOL_AFFINITY=1 keeps one session's calls on one host
+#             (rendezvous hashing on the session id), so its growing prompt
+#             prefix stays in that host's KV cache. The session moves only
+#             while its host has more than LLM_POOL_AFFINITY_SLACK requests
+#             in flight above the least loaded one
+# LLM_POOL_POLICY=round_robin turns the balancing off, for comparison.
+# The settings are read when a pool is built, after the CLI loads .env.
+# Counters: llm.pool.ejections, llm.pool.readmits, llm.pool.affinity_misses.
+# The pool sits inside the resilience wrapper, so retries and hedges pick a
+# host again; a hedge lands on another host than the stalled attempt.
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Sequence, Tuple
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+from ..utils import logging as tracing
+from ..utils import metrics
+from .resilience import _retryable
+
+HEALTH_TIMEOUT = 2.0
+
+
+def hosts_of(spec: str) -> List[str]:
+    return [h.strip().rstrip("/") for h in spec.split(",") if h.strip()]
+
+
+def _weight(session: str, host: str) -> int:
+    digest = hashlib.blake2b(f"{session}|{host}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class Host:
+    __slots__ = ("url", "outstanding", "healthy", "failures", "requests")
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.outstanding = 0
+        self.healthy = True
+        self.failures = 0
+        self.requests = 0
+
+
+class HostPool:
+    def __init__(self, urls: Sequence[str], health_path: str = "", interval: float | None = None) -> None:
+        self.name = ",".join(urls)
+        self.hosts = [Host(u) for u in urls]
+        self.health_path = health_path
+        self.interval = float(os.getenv("LLM_POOL_HEALTH_INTERVAL", "10")) if interval is None else interval
+        self.policy = os.getenv("LLM_POOL_POLICY", "least").strip().lower()
+        self.failures = int(os.getenv("LLM_POOL_FAILURES", "3"))
+        self.affinity = os.getenv("LLM_POOL_AFFINITY", "0").strip().lower() in ("1", "true", "yes")
+        self.affinity_slack = int(os.getenv("LLM_POOL_AFFINITY_SLACK", "2"))
+        self.lock = threading.Lock()
+        self._next = 0
+        self._stop = threading.Event()
+        if self.checks_enabled():
+            threading.Thread(target=self._watch, name="llm-pool-health", daemon=True).start()
+
+    def checks_enabled(self) -> bool:
+        return bool(self.health_path) and self.interval > 0 and httpx is not None
+
+    def acquire(self) -> Host:
+        session = tracing.current_session() if self.affinity else None
+        with self.lock:
+            live = [h for h in self.hosts if h.healthy] or self.hosts
+            start = self._next % len(live)
+            self._next += 1
+            if self.policy == "round_robin":
+                host = live[start]
+            else:
+                host = min(live[start:] + live[:start], key=lambda h: h.outstanding)
+            if session:
+                home = max(live, key=lambda h: _weight(session, h.url))
+                if home.outstanding <= host.outstanding + self.affinity_slack:
+                    host = home
+                else:
+                    metrics.incr("llm.pool.affinity_misses")
+            host.outstanding += 1
+            host.requests += 1
+        return host
+
+    def release(self, host: Host, ok: bool | None) -> None:
+        # ok is None when the outcome says nothing about the host (a bad
+        # request, or the caller closing the stream early)
+        with self.lock:
+            host.outstanding -= 1
+            if ok:
+                host.failures = 0
+            elif ok is False:
+                host.failures += 1
+                if host.healthy and host.failures >= self.failures and self.checks_enabled():
+                    self._set_health(host, False)
+
+    @contextmanager
+    def lease(self) -> Iterator[Host]:
+        host = self.acquire()
+        ok = None
+        try:
+            yield host
+            ok = True
+        except Exception as e:
+            ok = False if _retryable(e) else None
+            raise
+        finally:
+            self.release(host, ok)
+
+    def _set_health(self, host: Host, healthy: bool) -> None:
+        # caller holds the lock
+        host.healthy = healthy
+        host.failures = 0
+        metrics.incr("llm.pool.readmits" if healthy else "llm.pool.ejections")
+
+    def check(self) -> None:
+        # one health-check round over every host
+        for host in self.hosts:
+            try:
+                ok = httpx.get(host.url + self.health_path, timeout=HEALTH_TIMEOUT).is_success
+            except Exception:
+                ok = False
+            with self.lock:
+                if ok != host.healthy:
+                    self._set_health(host, ok)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return {h.url: {"healthy": h.healthy, "outstanding": h.outstanding, "requests": h.requests}
+                    for h in self.hosts}
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+_pools: Dict[Tuple[str, ...], HostPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_for(urls: Sequence[str], health_path: str = "") -> HostPool:
+    # one pool per host list, shared by the sync and async clients of every
+    # model on it, so in-flight counts cover all of them
+    key = tuple(urls)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = HostPool(urls, health_path)
+        return pool
+
+
+def pool_states() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.states() for pool in pools}
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledClient:
+    # one backend client per host; same surface as a single-host client
+    def __init__(self, pool: HostPool, factory: Callable[[str, str], Any], model: str) -> None:
+        self.pool = pool
+        self.host = pool.name
+        self.model = model
+        self.clients = {h.url: factory(h.url, model) for h in pool.hosts}
+        # a reply cached by one host serves the whole pool: they run the same
+        # model, and any of them may take the next identical request
+        for client in self.clients.values():
+            client.cache_scope = pool.name
+
+    def chat(self, messages: List[Dict], **kwargs) -> str:
+        with self.pool.lease() as host:
+            return self.clients[host.url].chat(messages, **kwargs)
+
+    def stream(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        with self.pool.lease() as host:
+            yield from self.clients[host.url].stream(messages, **kwargs)
+
+    def remember(self, messages: List[Dict], content: str, **kwargs) -> None:
+        # the hosts share the pool's cache scope, so any of them can store it
+        next(iter(self.clients.values())).remember(messages, content, **kwargs)
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+
+
+class AsyncPooledClient:
+    # must be created inside a running event loop, like the clients it holds
+    def __init__(self, pool: HostPool, factory: Callable[[str, str], Any], model: str) -> None:
+        self.pool = pool
+        self.host = pool.name
+        self.model = model
+        self.clients = {h.url: factory(h.url, model) for h in pool.hosts}
+        for client in self.clients.values():
+            client.cache_scope = pool.name
+
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        with self.pool.lease() as host:
+            return await self.clients[host.url].achat(messages, **kwargs)
+
+    async def astream(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        with self.pool.lease() as host:
+            stream = self.clients[host.url].astream(messages, **kwargs)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+
+    def remember(self, messages: List[Dict], content: str, **kwargs) -> None:
+        next(iter(self.clients.values())).remember(messages, content, **kwargs)
+
+    async def aclose(self) -> None:
+        for client in self.clients.values():
+            await client.aclose()
@@ -0,0 +1,438 @@
+# src/llm/resilience.py
+# Deadlines, retries, hedged requests and a circuit breaker around every
+# routed client (llm/base.py wraps them). Settings are per call kind, read
+# from tracing.call_kind like the routing table:
+#   deadline  LLM_DEADLINE seconds (LLM_DEADLINE_<KIND> overrides) for the
+#             whole call, retries and hedges included; LLMTimeout after that
+#   retries   up to LLM_RETRIES more attempts with full-jitter exponential
+#             backoff (LLM_BACKOFF base), only before any output arrived and
+#             only for connection errors, 429 and 5xx
+#   hedging   LLM_HEDGE=1 (or a comma list of kinds): once an attempt has
+#             waited longer than the kind's recent p95 without output, a
+#             duplicate is sent; the first to produce output wins and the
+#             other is cancelled
+#   breaker   LLM_BREAKER_FAILURES consecutive failures on a host open its
+#             circuit for LLM_BREAKER_COOLDOWN seconds. Calls then fail fast
+#             with CircuitOpen so the graph takes its degraded path, until
+#             one probe call gets through
+# Outcomes are counted in utils.metrics: llm.retries, llm.timeouts,
+# llm.hedges, llm.hedge_wins, llm.breaker_opens, llm.breaker_rejects.
+# The settings are read when a client (Policy) or a host's breaker is built,
+# not at import, so a .env the CLI loads inside its commands applies.
+from __future__ import annotations
+import asyncio
+import contextvars
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from ..utils import logging as tracing
+from ..utils import metrics
+
+KINDS = ("question", "followup", "eval", "summary", "digest", "plan")
+
+
+def _kinds(value: str) -> Set[str]:
+    value = value.strip().lower()
+    if value in ("", "0"):
+        return set()
+    if value in ("1", "all"):
+        return set(KINDS)
+    return {k.strip() for k in value.split(",") if k.strip()}
+
+
+BACKOFF_CAP = 4.0
+# the p95 a hedge waits for comes from this many recent calls of the kind
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+
+class Policy:
+    # per-client deadline, retry and hedging settings
+    def __init__(self) -> None:
+        self.deadline = float(os.getenv("LLM_DEADLINE", "60"))
+        # summaries, folds and plans write more tokens, so they get twice as long
+        self.deadlines = {
+            kind: float(os.getenv(f"LLM_DEADLINE_{kind.upper()}",
+                                  2 * self.deadline if kind in ("summary", "digest", "plan") else self.deadline))
+            for kind in KINDS
+        }
+        self.retries = int(os.getenv("LLM_RETRIES", "2"))
+        self.backoff = float(os.getenv("LLM_BACKOFF", "0.25"))
+        self.hedge_kinds = _kinds(os.getenv("LLM_HEDGE", "0"))
+
+
+class LLMTimeout(TimeoutError):
+    pass
+
+
+class CircuitOpen(RuntimeError):
+    pass
+
+
+def _retryable(e: BaseException) -> bool:
+    if isinstance(e, (CircuitOpen, ValueError, TypeError, KeyError)):
+        return False
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+class Breaker:
+    # consecutive-failure circuit breaker for one host
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    def state(self) -> str:
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half_open" if self.probing or time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> str:
+        # "closed", "probe" (the one trial call after the cooldown) or "" to reject
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return ""
+            self.probing = True
+            return "probe"
+
+    def success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                if self.opened_at is None or self.probing:
+                    metrics.incr("llm.breaker_opens")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self) -> None:
+        # a probe that ended without a verdict (e.g. a 4xx) frees the slot
+        with self.lock:
+            self.probing = False
+
+
+_breakers: Dict[str, Breaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(host: str) -> Breaker:
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = Breaker(
+                int(os.getenv("LLM_BREAKER_FAILURES", "5")), float(os.getenv("LLM_BREAKER_COOLDOWN", "30")))
+        return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {host: b.state() for host, b in breakers.items()}
+
+
+_latency: Dict[Tuple[str, str], Deque[float]] = {}
+_latency_lock = threading.Lock()
+
+
+def _observe(key: Tuple[str, str], seconds: float) -> None:
+    with _latency_lock:
+        samples = _latency.get(key)
+        if samples is None:
+            samples = _latency[key] = deque(maxlen=HEDGE_WINDOW)
+        samples.append(seconds)
+
+
+def hedge_delay(kind: str, mode: str) -> Optional[float]:
+    # recent p95 of time to first output, once there are enough samples
+    with _latency_lock:
+        samples = sorted(_latency.get((kind, mode), ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return samples[int(0.95 * (len(samples) - 1))]
+
+
+def reset() -> None:
+    with _breakers_lock:
+        _breakers.clear()
+    with _latency_lock:
+        _latency.clear()
+
+
+class _Call:
+    # the decisions for one logical call; the sync and async drivers below
+    # only differ in how they wait
+    def __init__(self, breaker: Breaker, mode: str, policy: Policy) -> None:
+        self.kind = tracing.current_call() or "default"
+        self.mode = mode
+        self.breaker = breaker
+        self.policy = policy
+        self.budget = policy.deadlines.get(self.kind, policy.deadline)
+        self.t0 = time.monotonic()
+        self.deadline = self.t0 + self.budget
+        delay = hedge_delay(self.kind, mode) if self.kind in policy.hedge_kinds else None
+        self.hedge_at = self.t0 + delay if delay is not None else None
+        self.starts: Dict[int, float] = {}
+        self.live: Set[int] = set()
+        self.hedges: Set[int] = set()
+        self.winner: Optional[int] = None
+        self.retries = 0
+        self.probe = False
+
+    def admit(self, hedge: bool = False) -> Optional[int]:
+        verdict = self.breaker.allow()
+        if not verdict:
+            if hedge:
+                return None
+            metrics.incr("llm.breaker_rejects")
+            raise CircuitOpen(f"LLM circuit open for {self.kind} calls; failing fast")
+        self.probe = self.probe or verdict == "probe"
+        aid = len(self.starts)
+        self.starts[aid] = time.monotonic()
+        self.live.add(aid)
+        if hedge:
+            self.hedges.add(aid)
+            metrics.incr("llm.hedges")
+        return aid
+
+    def wake(self) -> float:
+        # seconds until the deadline or the hedge timer, whichever is first
+        at = self.deadline
+        if self.hedge_at is not None and self.winner is None:
+            at = min(at, self.hedge_at)
+        return max(0.0, at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def timeout(self) -> LLMTimeout:
+        metrics.incr("llm.timeouts")
+        self.breaker.failure()
+        return LLMTimeout(f"{self.kind} call exceeded its {self.budget:g}s deadline")
+
+    def hedge_due(self) -> bool:
+        if self.hedge_at is None or self.winner is not None or time.monotonic() < self.hedge_at:
+            return False
+        self.hedge_at = None
+        return True
+
+    def output(self, aid: int) -> List[int]:
+        # first output picks the winner; returns the attempts to cancel
+        self.winner = aid
+        self.breaker.success()
+        _observe((self.kind, self.mode), time.monotonic() - self.starts[aid])
+        if aid in self.hedges:
+            metrics.incr("llm.hedge_wins")
+        losers = sorted(self.live - {aid})
+        self.live = {aid}
+        return losers
+
+    def error(self, aid: int, e: Exception) -> Optional[float]:
+        # None: wait for the attempts still running; a number: retry after
+        # that many seconds; anything else re-raises
+        self.live.discard(aid)
+        if not _retryable(e):
+            raise e
+        self.breaker.failure()
+        if self.winner is not None:
+            raise e
+        if self.live:
+            return None
+        pause = random.uniform(0, min(BACKOFF_CAP, self.policy.backoff * 2 ** self.retries))
+        if self.retries >= self.policy.retries or time.monotonic() + pause >= self.deadline:
+            raise e
+        self.retries += 1
+        metrics.incr("llm.retries")
+        return pause
+
+    def finish(self) -> None:
+        if self.probe:
+            self.breaker.release()
+
+
+def _pump(aid: int, out: queue.Queue, open_stream: Callable[[], Iterator[str]], cancel: threading.Event) -> None:
+    try:
+        stream = open_stream()
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    return
+                out.put((aid, "chunk", chunk))
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        out.put((aid, "done", None))
+    except Exception as e:
+        out.put((aid, "error", e))
+
+
+def _drive(open_stream: Callable[[], Iterator[str]], breaker: Breaker, mode: str, policy: Policy) -> Iterator[str]:
+    # each attempt runs on its own daemon thread (with the caller's context,
+    # so trace spans keep their session and call kind); the caller waits on a
+    # queue, so the deadline and the hedge timer fire even if a request hangs
+    call = _Call(breaker, mode, policy)
+    out: queue.Queue = queue.Queue()
+    cancels: Dict[int, threading.Event] = {}
+
+    def launch(hedge: bool = False) -> None:
+        aid = call.admit(hedge)
+        if aid is None:
+            return
+        cancels[aid] = threading.Event()
+        ctx = contextvars.copy_context()
+        threading.Thread(target=ctx.run, args=(_pump, aid, out, open_stream, cancels[aid]), daemon=True).start()
+
+    try:
+        launch()
+        while True:
+            if call.expired():
+                raise call.timeout()
+            try:
+                aid, event, value = out.get(timeout=call.wake())
+            except queue.Empty:
+                if call.hedge_due():
+                    launch(hedge=True)
+                continue
+            if call.winner is not None and aid != call.winner:
+                continue
+            if event == "error":
+                pause = call.error(aid, value)
+                if pause is not None:
+                    time.sleep(pause)
+                    launch()
+                continue
+            if call.winner is None:
+                for loser in call.output(aid):
+                    cancels[loser].set()
+            if event == "done":
+                return
+            yield value
+    finally:
+        for cancel in cancels.values():
+            cancel.set()
+        call.finish()
+
+
+async def _apump(aid: int, out: asyncio.Queue, open_stream: Callable[[], AsyncIterator[str]]) -> None:
+    try:
+        stream = open_stream()
+        try:
+            async for chunk in stream:
+                out.put_nowait((aid, "chunk", chunk))
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        out.put_nowait((aid, "done", None))
+    except Exception as e:
+        out.put_nowait((aid, "error", e))
+
+
+async def _adrive(open_stream: Callable[[], AsyncIterator[str]], breaker: Breaker, mode: str, policy: Policy) -> AsyncIterator[str]:
+    # async twin of _drive: attempts are tasks, and cancelling a loser closes
+    # its HTTP request
+    call = _Call(breaker, mode, policy)
+    out: asyncio.Queue = asyncio.Queue()
+    tasks: Dict[int, asyncio.Task] = {}
+
+    def launch(hedge: bool = False) -> None:
+        aid = call.admit(hedge)
+        if aid is not None:
+            tasks[aid] = asyncio.create_task(_apump(aid, out, open_stream))
+
+    try:
+        launch()
+        while True:
+            if call.expired():
+                raise call.timeout()
+            try:
+                aid, event, value = await asyncio.wait_for(out.get(), call.wake())
+            except asyncio.TimeoutError:
+                if call.hedge_due():
+                    launch(hedge=True)
+                continue
+            if call.winner is not None and aid != call.winner:
+                continue
+            if event == "error":
+                pause = call.error(aid, value)
+                if pause is not None:
+                    await asyncio.sleep(pause)
+                    launch()
+                continue
+            if call.winner is None:
+                for loser in call.output(aid):
+                    tasks[loser].cancel()
+            if event == "done":
+                return
+            yield value
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        call.finish()
+
+
+def _once(call: Callable[[], str]) -> Iterator[str]:
+    yield call()
+
+
+async def _aonce(call: Callable[[], Any]) -> AsyncIterator[str]:
+    yield await call()
+
+
+class ResilientClient:
+    # wraps a sync backend client; other attributes (model, host, ...) pass through
+    def __init__(self, inner: Any, host: str) -> None:
+        self.inner = inner
+        self.breaker = breaker_for(host)
+        self.policy = Policy()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def chat(self, messages: List[Dict], **kwargs) -> str:
+        return "".join(_drive(lambda: _once(lambda: self.inner.chat(messages, **kwargs)), self.breaker, "chat", self.policy))
+
+    def stream(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        return _drive(lambda: self.inner.stream(messages, **kwargs), self.breaker, "stream", self.policy)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncResilientClient:
+    def __init__(self, inner: Any, host: str) -> None:
+        self.inner = inner
+        self.breaker = breaker_for(host)
+        self.policy = Policy()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        stream = _adrive(lambda: _aonce(lambda: self.inner.achat(messages, **kwargs)), self.breaker, "chat", self.policy)
+        return "".join([chunk async for chunk in stream])
+
+    def astream(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        return _adrive(lambda: self.inner.astream(messages, **kwargs), self.breaker, "stream", self.policy)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,292 @@
+# src/server.py
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from .core.state import new_interview_state
+from .graph.flow import build_graph
+from .graph.store import build_checkpointer
+from .llm import base as llmbase
+from .utils import logging as tracing
+
+
+class SessionCreate(BaseModel):
+    topics: List[str] = Field(default_factory=lambda: ["Python"])
+    difficulty: str = "mixed"
+    questions: int = Field(4, ge=1, le=20)
+    type: str = "mixed"
+    plan: bool = False
+    speculate: bool = False
+    summary: Literal["llm", "local"] = "llm"
+
+
+class AnswerIn(BaseModel):
+    answer: str
+
+
+class Session:
+    def __init__(self, session_id: str) -> None:
+        self.id = session_id
+        self.config = {"configurable": {"thread_id": session_id}}
+        self.task: Optional[asyncio.Task] = None
+        self.running = False
+        self.pending_eval: Optional[asyncio.Future] = None
+        self.error: Optional[str] = None
+        # events of the current turn, replayed to late SSE subscribers
+        self.turn_events: List[tuple] = []
+        self.subscribers: List[asyncio.Queue] = []
+        self.touched = time.monotonic()
+        self.expiry: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def busy(self) -> bool:
+        return self.running
+
+    def resolve_pending(self, error: BaseException) -> None:
+        # a POST /answer waits on pending_eval; never leave it hanging
+        if self.pending_eval and not self.pending_eval.done():
+            self.pending_eval.set_exception(error)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        self.turn_events.append((event, data))
+        for q in self.subscribers:
+            q.put_nowait((event, data))
+
+
+def _ended() -> HTTPException:
+    return HTTPException(status_code=410, detail="Session ended before the answer was graded")
+
+
+class SessionManager:
+    # self.sessions holds a handle per live session; the interview itself is
+    # in the checkpointer. A handle left idle for idle_seconds once its turn
+    # ends is dropped, and get() rebuilds it from the checkpointer if the
+    # session is used again, so a long-running server does not grow without
+    # bound.
+    def __init__(self, checkpointer=None, idle_seconds: float | None = None) -> None:
+        self.graph = build_graph(checkpointer=checkpointer or build_checkpointer(), interrupt_before=["ask"])
+        self.sessions: Dict[str, Session] = {}
+        self.idle_seconds = float(os.getenv("SESSION_IDLE_SECONDS", "300")) if idle_seconds is None else idle_seconds
+
+    def _known(self, session_id: str) -> bool:
+        # a persistent checkpointer may hold sessions from an earlier process
+        checkpointer = self.graph.checkpointer
+        has_thread = getattr(checkpointer, "has_thread", None)
+        if has_thread:
+            return has_thread(session_id)
+        return checkpointer.get_tuple({"configurable": {"thread_id": session_id}}) is not None
+
+    def get(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            if not self._known(session_id):
+                raise HTTPException(status_code=404, detail="Unknown session")
+            session = self.sessions[session_id] = Session(session_id)
+            self._expire_later(session)
+        session.touched = time.monotonic()
+        return session
+
+    def _expire_later(self, session: Session, delay: float | None = None) -> None:
+        if session.expiry:
+            session.expiry.cancel()
+        session.expiry = asyncio.get_running_loop().call_later(
+            self.idle_seconds if delay is None else delay, self._expire, session)
+
+    def _expire(self, session: Session) -> None:
+        session.expiry = None
+        if self.sessions.get(session.id) is not session or session.busy:
+            # deleted, or a turn is running; its end schedules the next check
+            return
+        idle = time.monotonic() - session.touched
+        if session.subscribers or idle < self.idle_seconds:
+            self._expire_later(session, None if session.subscribers else self.idle_seconds - idle)
+            return
+        del self.sessions[session.id]
+
+    async def create(self, params: SessionCreate) -> Session:
+        session = Session(uuid.uuid4().hex)
+        self.sessions[session.id] = session
+        init_state = new_interview_state(
+            topics=[t.strip() for t in params.topics if t.strip()] or ["Python"],
+            difficulty=params.difficulty,
+            max_q=params.questions,
+            question_type=params.type,
+            plan_ahead=params.plan,
+            speculate=params.speculate,
+            summary_mode=params.summary,
+        )
+        session.running = True
+        session.task = asyncio.create_task(self._run(session, init_state))
+        return session
+
+    async def _run(self, session: Session, payload: Optional[Dict]) -> None:
+        try:
+            async for mode, chunk in self.graph.astream(payload, session.config, stream_mode=["custom", "updates"]):
+                if mode == "custom":
+                    session.publish("token", chunk)
+                    continue
+                for node, update in chunk.items():
+                    if not isinstance(update, dict):
+                        continue
+                    if node in ("next_question", "followup") and update.get("current_q"):
+                        session.publish("question", {"question": update["current_q"], "followup": node == "followup"})
+                    elif node == "evaluate" and update.get("last_eval"):
+                        session.publish("evaluation", update["last_eval"])
+                        if session.pending_eval and not session.pending_eval.done():
+                            session.pending_eval.set_result(update["last_eval"])
+                    elif node == "summary":
+                        session.publish("summary", update.get("summary", {}))
+        except asyncio.CancelledError:
+            # DELETE cancelled the turn: release the POST waiting on its
+            # evaluation and end open event streams
+            session.publish("error", {"detail": "Session deleted"})
+            raise
+        except Exception as e:
+            session.error = str(e)
+            session.publish("error", {"detail": session.error})
+            session.resolve_pending(e)
+            return
+        finally:
+            session.running = False
+            session.resolve_pending(_ended())
+            self._expire_later(session)
+        snap = await self.graph.aget_state(session.config)
+        session.publish("waiting" if snap.next else "done", {})
+
+    async def status(self, session: Session) -> Dict[str, Any]:
+        snap = await self.graph.aget_state(session.config)
+        values = snap.values or {}
+        if session.error:
+            status = "error"
+        elif session.busy:
+            status = "generating"
+        elif snap.next:
+            status = "awaiting_answer"
+        else:
+            status = "done"
+        return {
+            "session_id": session.id,
+            "status": status,
+            "question": values.get("current_q") if status == "awaiting_answer" else None,
+            "followup": bool(values.get("followup_mode")),
+            "question_number": int(values.get("main_count", 0)),
+            "max_q": values.get("max_q"),
+            "error": session.error,
+        }
+
+    async def answer(self, session: Session, text: str) -> Dict[str, Any]:
+        if session.busy:
+            raise HTTPException(status_code=409, detail="Session is still generating")
+        # claimed before the first await, so a concurrent POST gets the 409
+        # instead of appending a second answer
+        session.running = True
+        try:
+            snap = await self.graph.aget_state(session.config)
+            if not snap.next:
+                raise HTTPException(status_code=409, detail="Interview already finished")
+            # `answers` is append-only: send just the new one, as node_ask would
+            await self.graph.aupdate_state(
+                session.config,
+                {"answers": [text.strip() or "(no answer)"], "steps": int(snap.values.get("steps", 0)) + 1},
+                as_node="ask",
+            )
+        except BaseException:
+            session.running = False
+            raise
+        session.turn_events = []
+        session.pending_eval = asyncio.get_running_loop().create_future()
+        session.task = asyncio.create_task(self._run(session, None))
+        return await session.pending_eval
+
+    async def events(self, session: Session) -> AsyncIterator[str]:
+        q: asyncio.Queue = asyncio.Queue()
+        for item in session.turn_events:
+            q.put_nowait(item)
+        session.subscribers.append(q)
+        try:
+            while True:
+                event, data = await q.get()
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                if event in ("done", "error"):
+                    return
+        finally:
+            session.subscribers.remove(q)
+
+
+def create_app(manager: Optional[SessionManager] = None) -> FastAPI:
+    manager = manager or SessionManager()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await llmbase.aclose_llm()
+        close = getattr(manager.graph.checkpointer, "close", None)
+        if close:
+            close()
+
+    app = FastAPI(title="AI Interviewer", lifespan=lifespan)
+    app.state.manager = manager
+
+    @app.post("/sessions", status_code=201)
+    async def create_session(params: SessionCreate):
+        session = await manager.create(params)
+        return {"session_id": session.id}
+
+    @app.get("/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return await manager.status(manager.get(session_id))
+
+    @app.get("/sessions/{session_id}/question")
+    async def get_question(session_id: str):
+        status = await manager.status(manager.get(session_id))
+        return JSONResponse(status, status_code=200 if status["question"] else 202)
+
+    @app.post("/sessions/{session_id}/answer")
+    async def post_answer(session_id: str, body: AnswerIn):
+        return await manager.answer(manager.get(session_id), body.answer)
+
+    @app.get("/sessions/{session_id}/evaluations")
+    async def get_evaluations(session_id: str):
+        snap = await manager.graph.aget_state(manager.get(session_id).config)
+        return snap.values.get("evals", [])
+
+    @app.get("/sessions/{session_id}/summary")
+    async def get_summary(session_id: str):
+        session = manager.get(session_id)
+        snap = await manager.graph.aget_state(session.config)
+        summary = snap.values.get("summary")
+        if not summary:
+            return JSONResponse({"status": (await manager.status(session))["status"]}, status_code=202)
+        return summary
+
+    @app.get("/sessions/{session_id}/events")
+    async def get_events(session_id: str):
+        session = manager.get(session_id)
+        return StreamingResponse(manager.events(session), media_type="text/event-stream")
+
+    @app.delete("/sessions/{session_id}", status_code=204)
+    async def delete_session(session_id: str):
+        session = manager.get(session_id)
+        if session.busy and session.task:
+            session.task.cancel()
+        # also covers a turn whose task was cancelled before it started
+        session.resolve_pending(_ended())
+        if session.expiry:
+            session.expiry.cancel()
+        manager.sessions.pop(session_id, None)
+        await manager.graph.checkpointer.adelete_thread(session_id)
+
+    @app.get("/metrics")
+    async def get_metrics():
+        return PlainTextResponse(tracing.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+    return app
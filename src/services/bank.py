@@ -0,0 +1,105 @@
+# src/services/bank.py
+from __future__ import annotations
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from ..llm import base as llmbase
+from ..utils import logging as tracing
+from . import questions
+from .questions import _question_messages, _seed_difficulty, _seed_text, _strip_tag, _tag
+from .similarity import QuestionIndex
+
+QUESTION_TYPES = ["coding", "theory", "design", "debugging"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def load_bank(path: Optional[str] = None) -> Dict[str, Dict[str, List[Any]]]:
+    try:
+        with open(path or questions.SEED_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_bank(bank: Dict[str, Dict[str, List[Any]]], path: Optional[str] = None) -> None:
+    path = path or questions.SEED_PATH
+    tmp = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(bank, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _count(bucket: List[Any], difficulty: str) -> int:
+    return sum(1 for q in bucket if _seed_difficulty(q) == difficulty)
+
+
+@tracing.call_kind("question")
+def warm_bank(
+    topics: List[str],
+    difficulties: List[str] = DIFFICULTIES,
+    types: List[str] = QUESTION_TYPES,
+    per_combo: int = 5,
+    concurrency: int = 4,
+    max_rounds: int = 3,
+    path: Optional[str] = None,
+    progress: Callable[[str, str, str, int, int], None] | None = None,
+) -> Dict[str, int]:
+    # tops every (topic, difficulty, type) up to per_combo entries; entries
+    # already in the bank are kept, so reruns only generate the shortfall
+    bank = load_bank(path)
+    llm = llmbase.build_llm()
+    source = f"llm:{getattr(llm, 'model', 'unknown')}"
+    stats = {"generated": 0, "duplicates": 0, "failed": 0, "skipped": 0}
+
+    def generate(args):
+        topic, difficulty, qtype = args
+        try:
+            raw = llm.chat(_question_messages(topic, difficulty, qtype)).strip()
+            return _strip_tag(_tag(raw, qtype)) if raw else None
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for topic in topics:
+            for qtype in types:
+                bucket = bank.setdefault(topic, {}).setdefault(qtype, [])
+                seen = QuestionIndex(_seed_text(q) for q in bucket)
+                for difficulty in difficulties:
+                    missing = per_combo - _count(bucket, difficulty)
+                    if missing <= 0:
+                        stats["skipped"] += 1
+                        continue
+                    added = 0
+                    for _ in range(max_rounds):
+                        if added >= missing:
+                            break
+                        # each call runs in a copy of this context, so the worker
+                        # threads keep the "question" call kind (deadline, hedging,
+                        # trace spans)
+                        futures = [pool.submit(contextvars.copy_context().run, generate, (topic, difficulty, qtype))
+                                   for _ in range(missing - added)]
+                        for text in (f.result() for f in futures):
+                            if not text:
+                                stats["failed"] += 1
+                                continue
+                            if text in seen:
+                                stats["duplicates"] += 1
+                                continue
+                            seen.add(text)
+                            bucket.append({
+                                "question": text,
+                                "difficulty": difficulty,
+                                "source": source,
+                                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                            })
+                            added += 1
+                    stats["generated"] += added
+                    save_bank(bank, path)
+                    if progress:
+                        progress(topic, difficulty, qtype, added, missing)
+    return stats
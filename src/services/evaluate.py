@@ -1,121 +1,152 @@
 # src/services/evaluate.py
 from __future__ import annotations
-import json
-import re
 import os
-from typing import Dict, Any
-from ..llm.base import build_llm
-from ..core.prompts import EVAL_PROMPT
-from ..core.scoring import normalize_eval
+import re
+from typing import Dict, Any, List, Tuple
 
+from ..llm import base as llmbase
+from ..core.prompts import EVAL_SYSTEM, EVAL_SYSTEM_STRUCTURED, EVAL_USER
+from ..core.schemas import EVAL_ADAPTER, EVAL_SCHEMA
+from ..utils import metrics
+from ..utils import logging as tracing
+from ..utils.jsonscan import extract_json_block as _extract_json_block, parse_json_block
 
-FENCED_JSON_RE = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL | re.IGNORECASE)
 
+EVAL_EARLY_STOP = os.getenv("EVAL_EARLY_STOP", "1") == "1"
+# needs Ollama >= 0.5 (JSON schema accepted as `format`)
+STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "0") == "1"
 
-def _extract_json_block(text: str) -> str:
-   
-    if not text:
-        return "{}"
-    m = FENCED_JSON_RE.search(text)
-    if m:
-        return m.group(1)
 
-   
-    start = text.find("{")
-    while start != -1:
-        depth = 0
-        in_str = False
-        esc = False
-        for i in range(start, len(text)):
-            ch = text[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == "\\":
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-                continue
-            else:
-                if ch == '"':
-                    in_str = True
-                elif ch == "{":
-                    depth += 1
-                elif ch == "}":
-                    depth -= 1
-                    if depth == 0:
-                        return text[start : i + 1]
-        start = text.find("{", start + 1)
-    return "{}"
+def _eval_request(topic: str, question: str, answer: str) -> Tuple[List[Dict], Dict[str, Any]]:
+    # returns the messages plus the chat kwargs (options, and the schema in
+    # structured mode)
+    messages = [
+        {"role": "system", "content": EVAL_SYSTEM_STRUCTURED if STRUCTURED_OUTPUT else EVAL_SYSTEM},
+        {"role": "user", "content": EVAL_USER.format(topic=topic, question=question, answer=answer)},
+    ]
+    kwargs: Dict[str, Any] = {"options": {"temperature": 0.1, "num_predict": int(os.getenv("EVAL_NUM_PREDICT", 220))}}
+    if STRUCTURED_OUTPUT:
+        kwargs["format"] = EVAL_SCHEMA
+    return messages, kwargs
 
 
+@tracing.call_kind("eval")
 def evaluate_answer(topic: str, question: str, answer: str) -> Dict[str, Any]:
    
-    llm = build_llm()
-    prompt = EVAL_PROMPT.format(topic=topic, question=question, answer=answer)
-
-    raw = llm.chat(
-        [{"role": "user", "content": prompt}],
-        options={"temperature": 0.1, "num_predict": int(os.getenv("EVAL_NUM_PREDICT", 220))},
-    ).strip()
-
-    
-    try:
-        parsed = json.loads(_extract_json_block(raw))
-        if not isinstance(parsed, dict):
-            parsed = {}
-    except Exception:
-        parsed = {}
-
- 
-    scores_src = parsed.get("scores", parsed)
-    accuracy = scores_src.get("accuracy", parsed.get("accuracy", 0.0))
-    clarity = scores_src.get("clarity", parsed.get("clarity", 0.0))
-    depth = scores_src.get("depth", parsed.get("depth", 0.0))
-    overall = scores_src.get("overall", parsed.get("overall", None)) 
-
-    followup_needed = parsed.get("followup_needed", parsed.get("followup", False))
-    rationale = parsed.get("rationale", parsed.get("explanation", ""))
-    hint = parsed.get("hint", "")
-    misconceptions = parsed.get("misconceptions", parsed.get("errors", []))
-
- 
-    payload = {
-        "accuracy": accuracy,
-        "clarity": clarity,
-        "depth": depth,
-        "overall": overall if overall is not None else 0.0,
-        "scores": {
-            "accuracy": accuracy,
-            "clarity": clarity,
-            "depth": depth,
-            "overall": overall if overall is not None else 0.0,
-        },
-        "followup_needed": bool(followup_needed),
-        "rationale": str(rationale)[:500],
-        "hint": str(hint)[:200],
-        "misconceptions": misconceptions if isinstance(misconceptions, list) else [str(misconceptions)],
+    llm = llmbase.build_llm()
+    messages, kwargs = _eval_request(topic, question, answer)
+    if EVAL_EARLY_STOP:
+        raw = llmbase.chat_json(llm, messages, **kwargs).strip()
+    else:
+        raw = llm.chat(messages, **kwargs).strip()
+    return _parse_eval(raw, topic, question, answer)
+
+
+@tracing.call_kind("eval")
+async def aevaluate_answer(topic: str, question: str, answer: str) -> Dict[str, Any]:
+    llm = llmbase.build_async_llm()
+    messages, kwargs = _eval_request(topic, question, answer)
+    if EVAL_EARLY_STOP:
+        raw = (await llmbase.achat_json(llm, messages, **kwargs)).strip()
+    else:
+        raw = (await llmbase.achat(llm, messages, **kwargs)).strip()
+    return _parse_eval(raw, topic, question, answer)
+
+
+def _parse_eval(raw: str, topic: str, question: str, answer: str) -> Dict[str, Any]:
+    # validate_json is the scanner's check, so the block that wins is parsed,
+    # coerced and clamped in one call; anything unusable grades as zeros
+    metrics.incr("eval.parses")
+    ev = parse_json_block(raw, EVAL_ADAPTER.validate_json)
+    if ev is None:
+        metrics.incr("eval.parse_failures")
+        ev = EVAL_ADAPTER.validate_python({})
+
+    out = ev.model_dump()
+    out["scores"] = {k: out[k] for k in ("accuracy", "clarity", "depth", "overall")}
+    out.update(question=question, answer=answer, topic=topic)
+    return out
+
+
+NON_ANSWERS = {
+    "i dont know", "sorry, i dont know", "idk", "don't know", "do not know",
+}
+
+
+def is_non_answer(answer: str) -> bool:
+    return not answer.strip() or answer.strip().lower() in NON_ANSWERS
+
+
+def non_answer_eval(question: str, answer: str, topic: str) -> Dict[str, Any]:
+    return {
+        "accuracy": 0.0,
+        "clarity": 0.0,
+        "depth": 0.0,
+        "overall": 0.0,
+        "scores": {"accuracy": 0.0, "clarity": 0.0, "depth": 0.0, "overall": 0.0},
+        "rationale": "Candidate explicitly said they do not know.",
+        "followup_needed": True,
+        "hint": "",
+        "misconceptions": [],
         "question": question,
         "answer": answer,
         "topic": topic,
     }
 
-   
-    try:
-        return normalize_eval(payload)
-    except Exception:
-      
-        safe = {
-            "accuracy": 0.0,
-            "clarity": 0.0,
-            "depth": 0.0,
-            "overall": 0.0,
-            "followup_needed": True,
-            "rationale": "Evaluation failed to parse LLM output.",
-            "misconceptions": [],
-            "hint": "",
-            "question": question,
-            "answer": answer,
-            "topic": topic,
+
+def finalize_eval(raw: Any, question: str, answer: str, topic: str) -> Dict[str, Any]:
+    # the checks the interview applies on top of the grader's scores (short
+    # answers zeroed, answers sharing no word with the question capped);
+    # regrading runs them too, so its deltas compare like with like
+    if not isinstance(raw, dict):
+        raw = {}
+
+    if "scores" not in raw:
+        raw_scores = {
+            "accuracy": raw.get("accuracy", 0.0),
+            "clarity": raw.get("clarity", 0.0),
+            "depth": raw.get("depth", 0.0),
+            "overall": raw.get("overall", 0.0),
         }
-        return normalize_eval(safe)
+    else:
+        raw_scores = raw.get("scores", {"accuracy": 0.0, "clarity": 0.0, "depth": 0.0, "overall": 0.0})
+
+    eval_data = {
+        "accuracy": raw.get("accuracy", raw_scores.get("accuracy", 0.0)),
+        "clarity": raw.get("clarity", raw_scores.get("clarity", 0.0)),
+        "depth": raw.get("depth", raw_scores.get("depth", 0.0)),
+        "overall": raw.get("overall", raw_scores.get("overall", 0.0)),
+        "scores": raw_scores,
+        "rationale": raw.get("rationale", ""),
+        "followup_needed": bool(raw.get("followup_needed", False)),
+        "hint": raw.get("hint", ""),
+        "misconceptions": raw.get("misconceptions", []),
+        "question": question,
+        "answer": answer,
+        "topic": topic,
+    }
+
+    words = [w for w in re.findall(r"\w+", answer) if w]
+    if len(words) < 3:
+        eval_data["scores"] = {"accuracy": 0.0, "clarity": max(eval_data["scores"].get("clarity", 0.0), 1.0), "depth": 0.0, "overall": 0.0}
+        eval_data["rationale"] = (eval_data.get("rationale", "") + " | Overridden: Answer too short or uninformative.").strip(" |")
+        eval_data["followup_needed"] = True
+    else:
+        q_tokens = set(re.findall(r"\w+", question.lower()))
+        overlap = sum(1 for w in words if w.lower() in q_tokens)
+        if overlap == 0:
+            eval_data["scores"]["accuracy"] = min(eval_data["scores"].get("accuracy", 0.0), 2.0)
+            eval_data["rationale"] = (eval_data.get("rationale", "") + " | Penalized: Answer may not address the question.").strip(" |")
+            eval_data["followup_needed"] = True
+
+    return eval_data
+
+
+def grade_answer(topic: str, question: str, answer: str) -> Dict[str, Any]:
+    # grading as the interview does it: non-answers skip the model, and the
+    # model's scores go through finalize_eval. Batch grading and regrade use
+    # it, so all three score the same record the same way
+    if is_non_answer(answer):
+        return non_answer_eval(question, answer, topic)
+    raw = evaluate_answer(topic=topic, question=question, answer=answer)
+    return finalize_eval(raw, question, answer, topic)
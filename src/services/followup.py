@@ -1,20 +1,53 @@
-# src/services/followup.py
 from __future__ import annotations
-from typing import List
-from ..llm.base import build_llm
-from ..core.prompts import FOLLOWUP_PROMPT
+from typing import Callable, Dict, List
+from ..llm import base as llmbase
+from ..core.prompts import FOLLOWUP_SYSTEM, FOLLOWUP_USER
+from ..utils import logging as tracing
 
-def generate_followup(question: str, answer: str, hint: str = "", misconceptions: List[str] | None = None) -> str:
-    llm = build_llm()
-    msg = FOLLOWUP_PROMPT.format(
+def _followup_messages(question: str, answer: str, hint: str, misconceptions: List[str] | None) -> List[Dict]:
+    msg = FOLLOWUP_USER.format(
         question=question,
         answer=answer,
         hint=hint or "",
         misconceptions=", ".join(misconceptions or []),
     )
-    out = llm.chat([{"role": "user", "content": msg}]).strip()
+    return [{"role": "system", "content": FOLLOWUP_SYSTEM}, {"role": "user", "content": msg}]
 
+def _finish_followup(out: str) -> str:
+    out = out.strip()
     if not out.endswith("?"):
         out = out.rstrip(".") + "?"
 
     return f"(Follow-up) {out}"
+
+@tracing.call_kind("followup")
+def generate_followup(
+    question: str,
+    answer: str,
+    hint: str = "",
+    misconceptions: List[str] | None = None,
+    on_token: Callable[[str], None] | None = None,
+) -> str:
+    llm = llmbase.build_llm()
+    messages = _followup_messages(question, answer, hint, misconceptions)
+    if on_token is None:
+        out = llm.chat(messages)
+    else:
+        out = llmbase.chat_stream(llm, messages, on_token)
+    return _finish_followup(out)
+
+@tracing.call_kind("followup")
+async def agenerate_followup(
+    question: str,
+    answer: str,
+    hint: str = "",
+    misconceptions: List[str] | None = None,
+    on_token: Callable[[str], None] | None = None,
+) -> str:
+    llm = llmbase.build_async_llm()
+    messages = _followup_messages(question, answer, hint, misconceptions)
+    if on_token is None:
+        out = await llmbase.achat(llm, messages)
+    else:
+        out = await llmbase.achat_stream(llm, messages, on_token)
+    return _finish_followup(out)
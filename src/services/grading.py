@@ -0,0 +1,123 @@
+# src/services/grading.py
+from __future__ import annotations
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, TextIO, Tuple
+
+from ..utils import metrics
+from . import evaluate
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+def read_records(lines: Iterable[str]) -> Iterator[Record]:
+    # (id, record) per JSONL line; records without an "id" are keyed by line
+    # number, so a rerun over the same input lines up with earlier output
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            metrics.incr("grade_batch.bad_lines")
+            continue
+        if isinstance(rec, dict):
+            yield str(rec.get("id", lineno)), rec
+
+
+def completed_ids(path: str) -> Set[str]:
+    # ids already graded in an earlier (possibly interrupted) run. A torn last
+    # line from a crash is cut off, so that record is graded again and the
+    # next append starts on a fresh line.
+    done: Set[str] = set()
+    try:
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                data = data[:data.rfind(b"\n") + 1]
+    except FileNotFoundError:
+        return done
+    for line in data.decode("utf-8").splitlines():
+        try:
+            done.add(str(json.loads(line)["id"]))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return done
+
+
+def _grade(item: Record) -> Dict[str, Any]:
+    rid, rec = item
+    # same path as the interview and regrade, so their scores are comparable
+    result = evaluate.grade_answer(
+        topic=rec.get("topic", "General"),
+        question=rec.get("question", ""),
+        answer=rec.get("answer", ""),
+    )
+    return {"id": rid, **result}
+
+
+def grade_batch(
+    records: Iterable[Record],
+    out: TextIO,
+    concurrency: int = 4,
+    ordered: bool = True,
+    skip: Optional[Set[str]] = None,
+    progress: Callable[[Dict[str, Any]], None] | None = None,
+) -> Dict[str, Any]:
+    # at most 2 * concurrency records are in flight, so the input is streamed
+    # rather than loaded; each result is flushed as one line, which is what
+    # makes an interrupted run resumable via completed_ids()
+    skip = skip or set()
+    stats: Dict[str, Any] = {"graded": 0, "skipped": 0, "failed": 0}
+    window = max(1, concurrency) * 2
+    pending: deque = deque()
+    t0 = time.perf_counter()
+
+    def finish(fut: Future, rid: str) -> None:
+        try:
+            row = fut.result()
+        except Exception as e:
+            stats["failed"] += 1
+            metrics.incr("grade_batch.failed")
+            print(f"grade-batch: record {rid} failed: {e}", file=sys.stderr)
+        else:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            stats["graded"] += 1
+            metrics.incr("grade_batch.graded")
+        if progress:
+            progress({**stats, "elapsed": time.perf_counter() - t0})
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            if ordered:
+                finish(*pending.popleft())
+                continue
+            done, _ = wait([f for f, _ in pending], return_when=FIRST_COMPLETED)
+            for item in [p for p in pending if p[0] in done]:
+                pending.remove(item)
+                finish(*item)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for item in records:
+            if item[0] in skip:
+                stats["skipped"] += 1
+                continue
+            pending.append((pool.submit(_grade, item), item[0]))
+            drain(window - 1)
+        drain(0)
+
+    elapsed = time.perf_counter() - t0
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["per_s"] = round(stats["graded"] / elapsed, 2) if elapsed else 0.0
+    return stats
+
+
+def count_records(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
@@ -0,0 +1,124 @@
+# src/services/planner.py
+from __future__ import annotations
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from ..llm import base as llmbase
+from ..utils import logging as tracing
+from .questions import _pick_seed_question, _pick_type, _question_messages, _tag
+from .similarity import QuestionIndex
+
+PLAN_CONCURRENCY = int(os.getenv("PLAN_CONCURRENCY", "4"))
+PLAN_MAX_ROUNDS = int(os.getenv("PLAN_MAX_ROUNDS", "2"))
+
+
+def plan_slots(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # replays node_next_question's topic rotation, difficulty and type
+    # balancing for every remaining main question
+    topics = state.get("topics", [state.get("topic", "Python")])
+    topic_index = int(state.get("topic_index", 0))
+    counts = dict(state.get("difficulty_counts", {"easy": 0, "medium": 0, "hard": 0}))
+    requested_type = state.get("question_type", "mixed")
+
+    asked_by_topic: Dict[str, List[str]] = {}
+    for q in state.get("asked", []):
+        if isinstance(q, dict) and q.get("difficulty") != "follow-up":
+            asked_by_topic.setdefault(q.get("topic"), []).append(q.get("question", ""))
+    type_counts = {t: dict(c) for t, c in (state.get("type_counts") or {}).items()}
+
+    slots = []
+    for i in range(max(0, int(state.get("max_q", 4)) - int(state.get("main_count", 0)))):
+        topic = topics[(topic_index + i) % len(topics)]
+        difficulty = state.get("difficulty", "mixed")
+        if difficulty == "mixed":
+            difficulty = min(counts, key=counts.get)
+        counts[difficulty] = counts.get(difficulty, 0) + 1
+
+        asked = asked_by_topic.setdefault(topic, [])
+        types = type_counts.setdefault(topic, {})
+        qtype = _pick_type(requested_type, asked, types)
+        types[qtype] = types.get(qtype, 0) + 1
+        slot = {"topic": topic, "difficulty": difficulty, "question_type": qtype, "question": None}
+        seed_q = _pick_seed_question(topic, qtype, asked, difficulty)
+        if seed_q:
+            slot["question"] = seed_q
+            asked.append(seed_q)
+        slots.append(slot)
+    return slots
+
+
+def _accept(slots: List[Dict[str, Any]], results: List[tuple], seen: QuestionIndex) -> List[Dict[str, Any]]:
+    retry = []
+    for slot, text in results:
+        if isinstance(text, Exception) or not text:
+            retry.append(slot)
+            continue
+        if text in seen:
+            retry.append(slot)
+            continue
+        seen.add(text)
+        slot["question"] = text
+    return retry
+
+
+def _finish(slots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"question": s["question"], "topic": s["topic"], "difficulty": s["difficulty"]} for s in slots]
+
+
+def _seen_index(state: Dict[str, Any], slots: List[Dict[str, Any]]) -> QuestionIndex:
+    seen = QuestionIndex(s["question"] for s in slots if s["question"])
+    for q in state.get("asked", []):
+        if isinstance(q, dict):
+            seen.add(q.get("question", ""))
+    return seen
+
+
+@tracing.call_kind("plan")
+def plan_questions(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    slots = plan_slots(state)
+    seen = _seen_index(state, slots)
+    pending = [s for s in slots if not s["question"]]
+    llm = llmbase.build_llm()
+
+    def generate(slot):
+        try:
+            q = llm.chat(_question_messages(slot["topic"], slot["difficulty"], slot["question_type"])).strip()
+            return slot, _tag(q, slot["question_type"])
+        except Exception as e:
+            return slot, e
+
+    with ThreadPoolExecutor(max_workers=max(1, PLAN_CONCURRENCY)) as pool:
+        for _ in range(PLAN_MAX_ROUNDS):
+            if not pending:
+                break
+            # each call runs in a copy of this context, so the worker threads
+            # keep the session and the "plan" call kind for routing and traces
+            futures = [pool.submit(contextvars.copy_context().run, generate, s) for s in pending]
+            pending = _accept(pending, [f.result() for f in futures], seen)
+    return _finish(slots)
+
+
+@tracing.call_kind("plan")
+async def aplan_questions(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    slots = plan_slots(state)
+    seen = _seen_index(state, slots)
+    pending = [s for s in slots if not s["question"]]
+    llm = llmbase.build_async_llm()
+    limit = asyncio.Semaphore(max(1, PLAN_CONCURRENCY))
+
+    async def generate(slot):
+        try:
+            async with limit:
+                q = await llmbase.achat(llm, _question_messages(slot["topic"], slot["difficulty"], slot["question_type"]))
+            return slot, _tag(q.strip(), slot["question_type"])
+        except Exception as e:
+            return slot, e
+
+    for _ in range(PLAN_MAX_ROUNDS):
+        if not pending:
+            break
+        pending = _accept(pending, await asyncio.gather(*(generate(s) for s in pending)), seen)
+    return _finish(slots)
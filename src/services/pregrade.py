@@ -0,0 +1,133 @@
+# src/services/pregrade.py
+# Local pre-grader for seed questions that carry a reference answer and key
+# concepts (data/questions.json). It settles the clear-cut failures without
+# a model call and returns None for everything else, which goes to the LLM:
+#   empty      no content words at all
+#   off_topic  nothing in common with the question or reference
+# Concept coverage says which ideas an answer mentions, not whether it gets
+# them right ("generators do not use yield" covers yield), so an answer that
+# looks complete is never scored here; it still needs the grader.
+from __future__ import annotations
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils import metrics
+from .questions import _load_seeds, _seed_text
+from .similarity import terms
+
+PREGRADE = os.getenv("PREGRADE", "0") == "1"
+# BM25 relevance (0-1, against question + reference) below which an answer
+# with no key concept counts as off-topic
+OFF_TOPIC_RELEVANCE = float(os.getenv("PREGRADE_OFF_TOPIC", "0.05"))
+
+K1 = 1.2
+B = 0.75
+
+_TAG_RE = re.compile(r"^\s*(\(follow-up\)\s*)?\[[^\]]*\]\s*", flags=re.IGNORECASE)
+
+_index: Dict[str, Any] = {"seeds": None}
+
+
+def _key(question: str) -> str:
+    return " ".join(_TAG_RE.sub("", question or "").lower().rstrip(" ?.").split())
+
+
+def _build(seeds: Dict[str, Dict[str, List[Any]]]) -> None:
+    # reference docs plus document frequencies over the whole seed bank,
+    # rebuilt only when _load_seeds() hands back a different object
+    refs: Dict[str, Dict[str, Any]] = {}
+    df: Counter = Counter()
+    docs = 0
+    for types in seeds.values():
+        for bucket in types.values():
+            for entry in bucket:
+                text = _seed_text(entry)
+                doc = terms(text + " " + (entry.get("reference", "") if isinstance(entry, dict) else ""))
+                df.update(set(doc))
+                docs += 1
+                if isinstance(entry, dict) and entry.get("reference") and entry.get("concepts"):
+                    concepts = [t for t in (terms(c) for c in entry["concepts"]) if t]
+                    refs[_key(text)] = {"doc": Counter(doc), "length": len(doc), "concepts": concepts,
+                                        "labels": [c for c in entry["concepts"] if terms(c)]}
+    lengths = [r["length"] for r in refs.values()]
+    _index.update(seeds=seeds, refs=refs, df=df, docs=max(docs, 1),
+                  avgdl=sum(lengths) / len(lengths) if lengths else 1.0)
+
+
+def _idf(term: str) -> float:
+    n, df = _index["docs"], _index["df"].get(term, 0)
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def _bm25(query: List[str], doc: Counter, length: int) -> float:
+    norm = K1 * (1 - B + B * length / _index["avgdl"])
+    return sum(_idf(t) * doc[t] * (K1 + 1) / (doc[t] + norm) for t in set(query) if t in doc)
+
+
+def reference_for(question: str) -> Optional[Dict[str, Any]]:
+    seeds = _load_seeds()
+    if _index["seeds"] is not seeds:
+        _build(seeds)
+    return _index["refs"].get(_key(question))
+
+
+def _coverage(ref: Dict[str, Any], answer: set) -> Tuple[float, List[str]]:
+    # partial credit for multi-word concepts, each weighted by its mean IDF
+    total = got = 0.0
+    hit = []
+    for label, concept in zip(ref["labels"], ref["concepts"]):
+        weight = sum(_idf(t) for t in concept) / len(concept)
+        share = sum(1 for t in concept if t in answer) / len(concept)
+        total += weight
+        got += weight * share
+        if share >= 0.5:
+            hit.append(label)
+    return (got / total if total else 0.0), hit
+
+
+def assess(question: str, answer: str) -> Dict[str, Any]:
+    words = terms(answer)
+    if not words:
+        return {"decision": "empty", "coverage": 0.0, "relevance": 0.0, "concepts": []}
+    ref = reference_for(question)
+    if ref is None:
+        return {"decision": None, "coverage": None, "relevance": None, "concepts": []}
+
+    coverage, hit = _coverage(ref, set(words))
+    best = _bm25(list(ref["doc"]), ref["doc"], ref["length"])
+    relevance = _bm25(words, ref["doc"], ref["length"]) / best if best else 0.0
+    decision = "off_topic" if not hit and relevance < OFF_TOPIC_RELEVANCE else None
+    return {"decision": decision, "coverage": round(coverage, 3), "relevance": round(relevance, 3), "concepts": hit}
+
+
+def _eval(question: str, answer: str, topic: str, scores: Dict[str, float], **fields: Any) -> Dict[str, Any]:
+    return {
+        **scores,
+        "scores": dict(scores),
+        "hint": "",
+        "misconceptions": [],
+        "question": question,
+        "answer": answer,
+        "topic": topic,
+        **fields,
+    }
+
+
+def pregrade(question: str, answer: str, topic: str) -> Optional[Dict[str, Any]]:
+    # an evaluation in the LLM's shape for an empty or off-topic answer, else None
+    result = assess(question, answer)
+    decision = result["decision"]
+    metrics.incr(f"pregrade.{decision or 'deferred'}")
+    if decision is None:
+        return None
+    info = {k: result[k] for k in ("decision", "coverage", "relevance")}
+    rationale = ("Pre-graded: no content words in the answer." if decision == "empty"
+                 else "Pre-graded: the answer shares no key concept with the question or reference.")
+    return _eval(
+        question, answer, topic,
+        {"accuracy": 0.0, "clarity": 1.0 if decision == "off_topic" else 0.0, "depth": 0.0, "overall": 0.0},
+        rationale=rationale, followup_needed=True, pregrade=info,
+    )
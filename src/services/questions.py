@@ -1,33 +1,66 @@
 from __future__ import annotations
-from typing import List, Dict, Literal, Optional
+from typing import Any, Callable, List, Dict, Literal, Optional, Tuple
 import random, json, os
-from ..llm.base import build_llm
-from ..core.prompts import SYSTEM_INTERVIEWER, QUESTION_GEN_PROMPT
+from ..llm import base as llmbase
+from ..core.prompts import QUESTION_SYSTEM, QUESTION_USER
+from ..utils import metrics
+from ..utils import logging as tracing
+from .similarity import QuestionIndex
 
 QuestionType = Literal["coding", "theory", "design", "debugging", "mixed"]
 
 SEED_PATH = os.getenv("QUESTION_SEED_PATH", os.path.join("data", "questions.json"))
+DEDUP_RETRIES = int(os.getenv("QUESTION_DEDUP_RETRIES", "2"))
 
-def _load_seeds() -> Dict[str, Dict[str, List[str]]]:
+# last resort when no model is reachable and the bank has nothing unasked
+FALLBACK_QUESTIONS = [
+    "Walk through a {topic} problem you solved recently and the trade-offs you made",
+    "How would you track down a performance problem in a {topic} service in production",
+    "Which {topic} feature do you see misused most often, and how would you fix it",
+    "How do you test {topic} code that depends on external systems",
+]
+
+_seed_cache: Dict[str, Any] = {"key": None, "seeds": {}}
+
+def _load_seeds() -> Dict[str, Dict[str, List[Any]]]:
+    # re-parsed only when the file changes; warmed banks can get large
     try:
-        with open(SEED_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        st = os.stat(SEED_PATH)
+        key = (SEED_PATH, st.st_mtime_ns, st.st_size)
+        if _seed_cache["key"] != key:
+            with open(SEED_PATH, "r", encoding="utf-8") as f:
+                _seed_cache["seeds"] = json.load(f)
+            _seed_cache["key"] = key
+        return _seed_cache["seeds"]
     except Exception:
         return {}
 
-def _pick_type(requested: QuestionType, asked: List[str] | None) -> str:
-    if requested != "mixed":
-        return requested
-    types = ["coding", "theory", "design", "debugging"]
-    asked = asked or []
+def _seed_text(entry: Any) -> str:
+    # bank entries are plain strings or {"question", "difficulty", "source", ...}
+    return entry.get("question", "") if isinstance(entry, dict) else str(entry)
+
+def _seed_difficulty(entry: Any) -> Optional[str]:
+    return entry.get("difficulty") if isinstance(entry, dict) else None
 
-    asked_strs = []
+def _asked_strings(asked: List[Any]) -> List[str]:
+    out = []
     for q in asked:
         if isinstance(q, dict):
-            asked_strs.append(q.get("question", ""))
+            out.append(q.get("question", ""))
         elif isinstance(q, str):
-            asked_strs.append(q)
-    counts = {t: sum(1 for q in asked_strs if f"[{t}]" in q.lower()) for t in types}
+            out.append(q)
+    return out
+
+def _pick_type(requested: QuestionType, asked: List[str] | None, counts: Dict[str, int] | None = None) -> str:
+    # counts (type -> n) is the state's running tally; without it the asked
+    # strings are scanned
+    if requested != "mixed":
+        return requested
+    types = ["coding", "theory", "design", "debugging"]
+    if counts is None:
+        asked_strs = _asked_strings(asked or [])
+        counts = {t: sum(1 for q in asked_strs if f"[{t}]" in q.lower()) for t in types}
+    counts = {t: counts.get(t, 0) for t in types}
     least = min(counts.values()) if counts else 0
     candidates = [t for t, c in counts.items() if c == least] or types
     return random.choice(candidates)
@@ -45,49 +78,134 @@ def _strip_tag(q: str) -> str:
             return q[close+1:].strip()
     return q
 
-def _pick_seed_question(topic: str, qtype: str, asked: List[str]) -> Optional[str]:
+def _seed_candidates(topic: str, qtype: str, difficulty: str) -> Tuple[List[str], QuestionIndex]:
+    # the bucket's seed texts and their index, built once per loaded bank
     seeds = _load_seeds()
-    topic_bucket = seeds.get(topic) or {}
-    type_bucket = topic_bucket.get(qtype) or []
-    if not type_bucket:
+    if _seed_cache.get("indexed") is not seeds:
+        _seed_cache["indexed"] = seeds
+        _seed_cache["indexes"] = {}
+    key = (topic, qtype, difficulty)
+    built = _seed_cache["indexes"].get(key)
+    if built is None:
+        type_bucket = (seeds.get(topic) or {}).get(qtype) or []
+        candidates = [
+            _seed_text(q) for q in type_bucket
+            if difficulty == "mixed" or _seed_difficulty(q) in (None, difficulty)
+        ]
+        built = _seed_cache["indexes"][key] = (candidates, QuestionIndex(candidates))
+    return built
+
+def _pick_seed_question(topic: str, qtype: str, asked: List[str], difficulty: str = "mixed") -> Optional[str]:
+    candidates, index = _seed_candidates(topic, qtype, difficulty)
+    if not candidates:
         return None
 
-    asked_strs = []
-    for q in asked:
-        if isinstance(q, dict):
-            asked_strs.append(q.get("question", ""))
-        elif isinstance(q, str):
-            asked_strs.append(q)
-    asked_norm = {_strip_tag(q).lower() for q in asked_strs}
+    # seeds that paraphrase something already asked, found through the index
+    excluded = {m for q in _asked_strings(asked) for m in index.matches(q)}
+    # a few random draws almost always land on a fresh seed, as the asked
+    # questions are few next to the bank; the scan is the fallback
+    for _ in range(4):
+        q = random.choice(candidates)
+        if q not in excluded:
+            return _tag(q, qtype)
+    fresh = [q for q in candidates if q not in excluded]
+    return _tag(random.choice(fresh), qtype) if fresh else None
 
-    remaining = [q for q in type_bucket if q.lower().strip().rstrip("?") not in asked_norm]
-    if not remaining:
-        return None
-    return _tag(random.choice(remaining), qtype)
+def _question_messages(topic: str, difficulty: str, qtype: str) -> List[Dict]:
+    user_prompt = QUESTION_USER.format(
+        topic=topic, difficulty=difficulty, question_type=qtype
+    )
+    return [
+        {"role": "system", "content": QUESTION_SYSTEM},
+        {"role": "user", "content": user_prompt},
+    ]
 
+@tracing.call_kind("question")
 def generate_question(
     topic: str,
     difficulty: str = "mixed",
     question_type: QuestionType = "mixed",
     asked_so_far: List[str] | None = None,
+    on_token: Callable[[str], None] | None = None,
+    on_retry: Callable[[], None] | None = None,
+    type_counts: Dict[str, int] | None = None,
 ) -> str:
 
     asked = asked_so_far or []
-    qtype = _pick_type(question_type, asked)
+    qtype = _pick_type(question_type, asked, type_counts)
 
    
-    seed_q = _pick_seed_question(topic, qtype, asked)
+    seed_q = _pick_seed_question(topic, qtype, asked, difficulty)
     if seed_q:
         return seed_q
 
     
-    llm = build_llm()
-    user_prompt = QUESTION_GEN_PROMPT.format(
-        topic=topic, difficulty=difficulty, question_type=qtype
-    )
-    messages: List[Dict] = [
-        {"role": "system", "content": SYSTEM_INTERVIEWER},
-        {"role": "user", "content": user_prompt},
-    ]
-    q = llm.chat(messages).strip()
+    llm = llmbase.build_llm()
+    messages = _question_messages(topic, difficulty, qtype)
+    asked_index = QuestionIndex(_asked_strings(asked))
+    for attempt in range(DEDUP_RETRIES + 1):
+        if attempt and on_retry is not None:
+            # lets a streaming caller drop the rejected attempt's tokens
+            on_retry()
+        if on_token is None:
+            q = llm.chat(messages)
+        else:
+            q = llmbase.chat_stream(llm, messages, on_token)
+        q = q.strip()
+        if q not in asked_index:
+            break
+        metrics.incr("questions.near_duplicates")
     return _tag(q, qtype)
+
+@tracing.call_kind("question")
+async def agenerate_question(
+    topic: str,
+    difficulty: str = "mixed",
+    question_type: QuestionType = "mixed",
+    asked_so_far: List[str] | None = None,
+    on_token: Callable[[str], None] | None = None,
+    on_retry: Callable[[], None] | None = None,
+    type_counts: Dict[str, int] | None = None,
+) -> str:
+    asked = asked_so_far or []
+    qtype = _pick_type(question_type, asked, type_counts)
+
+    seed_q = _pick_seed_question(topic, qtype, asked, difficulty)
+    if seed_q:
+        return seed_q
+
+    llm = llmbase.build_async_llm()
+    messages = _question_messages(topic, difficulty, qtype)
+    asked_index = QuestionIndex(_asked_strings(asked))
+    for attempt in range(DEDUP_RETRIES + 1):
+        if attempt and on_retry is not None:
+            # lets a streaming caller drop the rejected attempt's tokens
+            on_retry()
+        if on_token is None:
+            q = await llmbase.achat(llm, messages)
+        else:
+            q = await llmbase.achat_stream(llm, messages, on_token)
+        q = q.strip()
+        if q not in asked_index:
+            break
+        metrics.incr("questions.near_duplicates")
+    return _tag(q, qtype)
+
+def fallback_question(
+    topic: str,
+    difficulty: str = "mixed",
+    question_type: QuestionType = "mixed",
+    asked_so_far: List[str] | None = None,
+    type_counts: Dict[str, int] | None = None,
+) -> str:
+    # no model call: an unasked seed for the topic (requested type first,
+    # any difficulty), else a generic question
+    asked = asked_so_far or []
+    qtype = _pick_type(question_type, asked, type_counts)
+    for t in [qtype] + [t for t in ("coding", "theory", "design", "debugging") if t != qtype]:
+        seed_q = _pick_seed_question(topic, t, asked)
+        if seed_q:
+            return seed_q
+    asked_index = QuestionIndex(_asked_strings(asked))
+    generic = [q.format(topic=topic) for q in FALLBACK_QUESTIONS]
+    return _tag(next((q for q in generic if q not in asked_index), generic[0]), qtype)
@@ -0,0 +1,138 @@
+# src/services/regrade.py
+from __future__ import annotations
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils import metrics
+from . import evaluate
+
+_TYPE_TAG_RE = re.compile(r"^\s*\[(coding|theory|design|debugging)\]\s*", flags=re.IGNORECASE)
+
+
+def _question_text(q: Any) -> str:
+    # `asked` holds plain strings in old logs and dicts in current ones
+    text = q.get("question", "") if isinstance(q, dict) else str(q or "")
+    return _TYPE_TAG_RE.sub("", text).strip()
+
+
+def _original_score(ev: Dict[str, Any]) -> Optional[float]:
+    # scores.overall is the score after the interview's own checks; the
+    # top-level overall is the grader's raw number
+    value = (ev.get("scores") or {}).get("overall", ev.get("overall"))
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_session_pairs(path: Path) -> List[Dict[str, Any]]:
+    # one row per graded answer; evals carry question, answer and score in
+    # both formats, asked/answers fill in anything the evals are missing
+    with open(path, "r", encoding="utf-8") as f:
+        log = json.load(f)
+    topics = log.get("topics") or [log.get("topic", "General")]
+    evals = log.get("evals") or []
+    asked = log.get("asked") or []
+    answers = log.get("answers") or []
+
+    pairs = []
+    for i in range(max(len(evals), min(len(asked), len(answers)))):
+        ev = evals[i] if i < len(evals) else {}
+        q = asked[i] if i < len(asked) else {}
+        pairs.append({
+            "session": path.stem,
+            "index": i,
+            "topic": ev.get("topic") or (q.get("topic") if isinstance(q, dict) else None) or topics[0],
+            "question": _question_text(ev.get("question") or q),
+            "answer": ev.get("answer", answers[i] if i < len(answers) else ""),
+            "original": _original_score(ev),
+        })
+    return pairs
+
+
+def load_sessions(directory: str) -> List[Dict[str, Any]]:
+    pairs: List[Dict[str, Any]] = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            pairs.extend(load_session_pairs(path))
+        except (OSError, ValueError, AttributeError) as e:
+            metrics.incr("regrade.bad_logs")
+            print(f"regrade: skipping {path}: {e}")
+    return pairs
+
+
+def _ranks(values: List[float]) -> List[float]:
+    # average ranks, so tied scores (common on a 0-10 scale) share a rank
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def spearman(xs: List[float], ys: List[float]) -> Optional[float]:
+    if len(xs) < 2:
+        return None
+    rx, ry = _ranks(xs), _ranks(ys)
+    mx, my = sum(rx) / len(rx), sum(ry) / len(ry)
+    cov = sum((a - mx) * (b - my) for a, b in zip(rx, ry))
+    vx = sum((a - mx) ** 2 for a in rx)
+    vy = sum((b - my) ** 2 for b in ry)
+    if not vx or not vy:
+        return None
+    return round(cov / (vx * vy) ** 0.5, 3)
+
+
+def regrade(pairs: List[Dict[str, Any]], concurrency: int = 4) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    # identical (topic, question, answer) triples are graded once; rows come
+    # back in input order with the new score and the delta to the original
+    unique: Dict[Tuple[str, str, str], Any] = {}
+    for p in pairs:
+        unique.setdefault((p["topic"], p["question"], p["answer"]), None)
+
+    def grade(key: Tuple[str, str, str]) -> Any:
+        topic, question, answer = key
+        # graded the way the interview grades, so the deltas compare like
+        # with like
+        try:
+            return evaluate.grade_answer(topic=topic, question=question, answer=answer)
+        except Exception as e:
+            metrics.incr("regrade.failed")
+            return e
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for key, result in zip(unique, pool.map(grade, list(unique))):
+            unique[key] = result
+    elapsed = time.perf_counter() - t0
+
+    rows = []
+    for p in pairs:
+        result = unique[(p["topic"], p["question"], p["answer"])]
+        new = None if isinstance(result, Exception) else float(result["scores"].get("overall", 0.0))
+        delta = round(new - p["original"], 2) if new is not None and p["original"] is not None else None
+        rows.append({**p, "regraded": new, "delta": delta, **({"error": str(result)} if isinstance(result, Exception) else {})})
+
+    compared = [r for r in rows if r["delta"] is not None]
+    stats = {
+        "pairs": len(pairs),
+        "graded": len(unique),
+        "cached": len(pairs) - len(unique),
+        "failed": sum(1 for r in unique.values() if isinstance(r, Exception)),
+        "mean_delta": round(sum(r["delta"] for r in compared) / len(compared), 2) if compared else None,
+        "mean_abs_delta": round(sum(abs(r["delta"]) for r in compared) / len(compared), 2) if compared else None,
+        "spearman": spearman([r["original"] for r in compared], [r["regraded"] for r in compared]),
+        "elapsed_s": round(elapsed, 2),
+        "per_s": round(len(unique) / elapsed, 2) if elapsed else 0.0,
+    }
+    return rows, stats
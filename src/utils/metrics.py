@@ -0,0 +1,41 @@
+# src/utils/metrics.py
+from __future__ import annotations
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_observations: Dict[str, Dict[str, float]] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float) -> None:
+    with _lock:
+        obs = _observations.get(name)
+        if obs is None:
+            obs = _observations[name] = {"count": 0, "sum": 0.0, "max": 0.0}
+        obs["count"] += 1
+        obs["sum"] += value
+        obs["max"] = max(obs["max"], value)
+
+
+def counter(name: str) -> float:
+    return _counters.get(name, 0)
+
+
+def snapshot() -> Dict[str, Dict]:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "observations": {k: dict(v) for k, v in _observations.items()},
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _observations.clear()
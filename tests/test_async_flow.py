@@ -0,0 +1,60 @@
+import asyncio
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.graph.flow import build_graph
+from src.llm import base as llmbase
+
+
+class AsyncDummyLLM:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def achat(self, messages, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        text = " ".join(m["content"] for m in messages)
+        if "DIGEST_JSON" in text:
+            return '{"feedback": "ok", "strengths": [], "recommendations": [], "final_grade": 5, "signal": "borderline"}'
+        if '"accuracy"' in text:
+            return '{"accuracy": 6, "clarity": 6, "depth": 6, "overall": 6, "followup_needed": false}'
+        return "Explain X?"
+
+
+async def _run_session(app, i):
+    config = {"configurable": {"thread_id": f"session-{i}"}}
+    await app.ainvoke({
+        "topics": ["Go"],
+        "topic_index": 0,
+        "difficulty": "mixed",
+        "max_q": 2,
+        "asked": [],
+        "answers": [],
+        "evals": [],
+        "question_type": "theory",
+        "difficulty_counts": {"easy": 0, "medium": 0, "hard": 0},
+        "topic_performance": {},
+    }, config)
+    while True:
+        snap = await app.aget_state(config)
+        if not snap.next:
+            return snap.values
+        await app.aupdate_state(config, {"answers": ["X is explained by an example"]}, as_node="ask")
+        await app.ainvoke(None, config)
+
+
+def test_many_sessions_share_one_event_loop(monkeypatch):
+    llm = AsyncDummyLLM()
+    monkeypatch.setattr(llmbase, "build_async_llm", lambda: llm)
+    app = build_graph(checkpointer=InMemorySaver(), interrupt_before=["ask"])
+
+    async def main():
+        return await asyncio.gather(*(_run_session(app, i) for i in range(100)))
+
+    finals = asyncio.run(main())
+    assert all(st.get("summary", {}).get("final_grade") == 5 for st in finals)
+    assert all(len(st["evals"]) >= 2 for st in finals)
+    assert llm.peak > 50
@@ -0,0 +1,58 @@
+import json
+import threading
+
+from src.llm import base as llmbase
+from src.services import questions
+from src.services.bank import warm_bank
+from src.utils import logging as tracing
+
+
+class BankLLM:
+    model = "fake"
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.kinds = set()
+
+    def chat(self, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.kinds.add(tracing.current_call())
+            n = self.calls
+        # every third answer repeats an earlier one
+        return "What is question one." if n % 3 == 0 else f"What is question {n}"
+
+
+def test_warm_bank_fills_gaps_incrementally(tmp_path, monkeypatch):
+    path = tmp_path / "bank.json"
+    path.write_text(json.dumps({"Go": {"theory": ["What is question one?"]}}))
+    llm = BankLLM()
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+
+    stats = warm_bank(["Go"], difficulties=["easy", "hard"], types=["theory"], per_combo=3, path=str(path))
+    bank = json.loads(path.read_text())["Go"]["theory"]
+    assert bank[0] == "What is question one?"
+    generated = [q for q in bank if isinstance(q, dict)]
+    assert stats["generated"] == 6 and len(generated) == 6
+    assert stats["duplicates"] > 0
+    assert all(q["question"].endswith("?") and q["source"] == "llm:fake" for q in generated)
+    assert len({q["question"].lower() for q in generated}) == 6
+    assert llm.kinds == {"question"}
+
+    calls = llm.calls
+    again = warm_bank(["Go"], difficulties=["easy", "hard"], types=["theory"], per_combo=3, path=str(path))
+    assert again["generated"] == 0 and again["skipped"] == 2
+    assert llm.calls == calls
+
+
+def test_seed_pick_respects_difficulty_and_dedupes(tmp_path, monkeypatch):
+    path = tmp_path / "bank.json"
+    path.write_text(json.dumps({"Go": {"theory": [
+        "Legacy question.",
+        {"question": "Hard one?", "difficulty": "hard"},
+    ]}}))
+    monkeypatch.setattr(questions, "SEED_PATH", str(path))
+
+    assert questions._pick_seed_question("Go", "theory", ["[theory] Legacy question?"], "easy") is None
+    assert questions._pick_seed_question("Go", "theory", ["[theory] Legacy question?"], "hard") == "[theory] Hard one?"
@@ -0,0 +1,12 @@
+from scripts import bench_e2e
+
+
+def test_full_interviews_over_http_report_node_latency():
+    report = bench_e2e.run(sessions=4, questions=2, concurrency=2, latency=0.0)
+    nodes = report["nodes"]
+    assert nodes["summary"]["count"] == 4
+    assert nodes["next_question"]["count"] == 8
+    # every answer is graded, follow-ups included
+    assert nodes["evaluate"]["count"] == nodes["ask"]["count"] == 8 + nodes.get("followup", {}).get("count", 0)
+    assert report["sessions_per_s"] > 0 and report["llm_requests"] >= 4 * (2 + 2 + 1)
+    assert all(s["p50"] <= s["p95"] for s in nodes.values())
@@ -22,3 +22,49 @@ def test_normalize_eval_defaults():
     assert data["clarity"] == 0.0
     assert data["depth"] == 5.0
     assert data["overall"] == round((10 + 0 + 5) / 3, 2)
+
+def test_structured_mode_sends_schema_and_trimmed_prompt(monkeypatch):
+    from src.core.schemas import EVAL_SCHEMA, SUMMARY_SCHEMA
+    from src.llm import base as llmbase
+    from src.services import evaluate, summary
+    from src.utils import metrics
+
+    calls = []
+
+    class RecordingLLM:
+        def chat(self, messages, **kwargs):
+            calls.append((messages, kwargs))
+            return "not json at all"
+
+    monkeypatch.setattr(llmbase, "build_llm", lambda: RecordingLLM())
+    metrics.reset()
+    evaluate.evaluate_answer("Python", "What is a list?", "A sequence.")
+    monkeypatch.setattr(evaluate, "STRUCTURED_OUTPUT", True)
+    monkeypatch.setattr(summary, "STRUCTURED_OUTPUT", True)
+    evaluate.evaluate_answer("Python", "What is a list?", "A sequence.")
+    summary.generate_summary("Python", summary.new_digest(), 1)
+
+    (plain_msgs, plain_kw), (msgs, kw), (_, summary_kw) = calls
+    assert "format" not in plain_kw and kw["format"] == EVAL_SCHEMA
+    assert summary_kw["format"] == SUMMARY_SCHEMA
+    assert len(msgs[0]["content"]) < len(plain_msgs[0]["content"]) / 2
+    assert metrics.counter("eval.parse_failures") == 2
+    assert metrics.counter("summary.parse_failures") == 1
+
+def test_parse_eval_coerces_nested_and_renamed_fields():
+    from src.services.evaluate import _parse_eval
+
+    raw = 'Result: {"scores": {"accuracy": "12", "clarity": 6, "depth": 3}, "followup": "true", "errors": "off by one"} done'
+    ev = _parse_eval(raw, "Python", "q", "a")
+    assert (ev["accuracy"], ev["clarity"], ev["depth"], ev["overall"]) == (10.0, 6.0, 3.0, 6.33)
+    assert ev["scores"]["overall"] == 6.33
+    assert ev["followup_needed"] is True
+    assert ev["misconceptions"] == ["off by one"]
+
+def test_extractor_is_linear_on_unclosed_braces():
+    import time
+    valid = '{"accuracy": 7, "clarity": 8, "depth": 6}'
+    t0 = time.perf_counter()
+    assert json.loads(_extract_json_block("{" * 50000 + valid))["accuracy"] == 7
+    assert json.loads(_extract_json_block("code { x(); } " * 2000 + valid))["depth"] == 6
+    assert time.perf_counter() - t0 < 1.0
@@ -0,0 +1,76 @@
+import io
+import json
+import threading
+import time
+
+from src.llm import base as llmbase
+from src.services import evaluate
+from src.services.grading import completed_ids, grade_batch, read_records
+
+
+class SlowGrader:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def chat(self, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+        text = messages[-1]["content"]
+        n = int(text.split("answer number ")[1].split()[0])
+        # later records finish first, so ordering is actually exercised
+        time.sleep(0.05 if n % 2 else 0.01)
+        return '{"accuracy": %d, "clarity": 5, "depth": 5, "followup_needed": false}' % (n % 10)
+
+
+def _lines(n):
+    return [json.dumps({"topic": "Go", "question": "What is a goroutine?", "answer": f"answer number {i} here"}) for i in range(n)]
+
+
+def test_batch_is_concurrent_ordered_and_resumable(monkeypatch, tmp_path):
+    llm = SlowGrader()
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+    out = tmp_path / "graded.jsonl"
+
+    # "interrupted" run: only the first 5 records, plus a torn last line
+    with out.open("a", encoding="utf-8") as f:
+        grade_batch(read_records(_lines(5)), f, concurrency=4)
+        f.write('{"id": "6", "accur')
+
+    done = completed_ids(str(out))
+    t0 = time.perf_counter()
+    with out.open("a", encoding="utf-8") as f:
+        stats = grade_batch(read_records(_lines(16)), f, concurrency=8, skip=done)
+    assert time.perf_counter() - t0 < 0.3
+    assert stats["skipped"] == 5 and stats["graded"] == 11
+    assert llm.calls == 16
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["id"] for r in rows] == [str(i) for i in range(1, 17)]
+    assert rows[3]["accuracy"] == 3.0
+
+
+def test_as_completed_mode_writes_every_record(monkeypatch):
+    monkeypatch.setattr(evaluate, "evaluate_answer", lambda topic, question, answer: {"overall": len(answer)})
+    buf = io.StringIO()
+    stats = grade_batch(read_records(_lines(10)), buf, concurrency=3, ordered=False)
+    ids = sorted(int(json.loads(line)["id"]) for line in buf.getvalue().splitlines())
+    assert ids == list(range(1, 11)) and stats["graded"] == 10
+
+
+def test_batch_grades_like_the_interview(monkeypatch):
+    calls = []
+
+    def fake_eval(topic, question, answer):
+        calls.append(answer)
+        return {"accuracy": 7, "clarity": 7, "depth": 7, "overall": 7}
+
+    monkeypatch.setattr(evaluate, "evaluate_answer", fake_eval)
+    lines = [json.dumps({"topic": "Go", "question": "What is a goroutine?", "answer": a})
+             for a in ("idk", "a thread", "a goroutine is a lightweight thread")]
+    buf = io.StringIO()
+    grade_batch(read_records(lines), buf, concurrency=2)
+    rows = [json.loads(line) for line in buf.getvalue().splitlines()]
+    # the non-answer never reaches the model; the two-word answer is zeroed
+    assert sorted(calls) == ["a goroutine is a lightweight thread", "a thread"]
+    assert [r["scores"]["overall"] for r in rows] == [0.0, 0.0, 7]
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+from src.llm import resilience
+from src.utils import logging as tracing
+from src.utils import metrics
+
+
+@pytest.fixture
+def servers(request, monkeypatch):
+    # one fake server per latency, all behind OLLAMA_HOST
+    metrics.reset()
+    resilience.reset()
+    started = [start_fake_ollama(reply="pong", latency=s) for s in request.param]
+    monkeypatch.setenv("OLLAMA_HOST", ",".join(url for _, url in started))
+    yield [server for server, _ in started]
+    llmbase.close_llm()
+    for server, _ in started:
+        server.shutdown()
+
+
+def _run(calls: int) -> float:
+    llm = llmbase.build_llm()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda i: llm.chat([{"role": "user", "content": f"q{i}"}]), range(calls)))
+    return calls / (time.perf_counter() - t0)
+
+
+@pytest.mark.parametrize("servers", [(0.01, 0.01, 0.1)], indirect=True)
+def test_least_outstanding_beats_round_robin(servers, monkeypatch):
+    monkeypatch.setenv("LLM_POOL_POLICY", "round_robin")
+    rr = _run(60)
+    rr_slow = servers[2].requests
+    llmbase.close_llm()
+
+    monkeypatch.setenv("LLM_POOL_POLICY", "least")
+    lor = _run(60)
+    lor_slow = servers[2].requests - rr_slow
+    assert rr_slow == 20 and lor_slow < 12
+    assert lor > 1.3 * rr
+
+
+@pytest.mark.parametrize("servers", [(0.0, 0.0)], indirect=True)
+def test_unhealthy_host_is_ejected_and_readmitted(servers):
+    llm = llmbase.build_llm()
+    pool = llm.inner.pool
+    servers[1].down = True
+    for _ in range(6):
+        assert llm.chat([{"role": "user", "content": "ping"}]) == "pong"
+    down = pool.states()[pool.hosts[1].url]
+    assert not down["healthy"] and down["requests"] == pool.failures
+    assert metrics.counter("llm.pool.ejections") == 1 and servers[0].requests == 6
+
+    pool.check()
+    assert not pool.hosts[1].healthy
+    servers[1].down = False
+    pool.check()
+    assert all(s["healthy"] for s in pool.states().values())
+    assert metrics.counter("llm.pool.readmits") == 1
+
+    async def run():
+        try:
+            llm = llmbase.build_async_llm()
+            return [await llm.achat([{"role": "user", "content": "ping"}]) for _ in range(2)] + \
+                [chunk async for chunk in llm.astream([{"role": "user", "content": "ping"}])]
+        finally:
+            await llmbase.aclose_llm()
+
+    assert asyncio.run(run()) == ["pong"] * 3
+    assert [s["outstanding"] for s in pool.states().values()] == [0, 0]
+    assert servers[1].requests >= 1
+
+
+@pytest.mark.parametrize("servers", [(0.0, 0.0, 0.0)], indirect=True)
+def test_session_affinity_keeps_a_session_on_one_host(servers, monkeypatch):
+    monkeypatch.setenv("LLM_POOL_AFFINITY", "1")
+    llm = llmbase.build_llm()
+    for session in ("s-1", "s-2", "s-3", "s-4", "s-5", "s-6"):
+        token = tracing.set_session(session)
+        try:
+            before = [s.requests for s in servers]
+            for _ in range(4):
+                llm.chat([{"role": "user", "content": "ping"}])
+        finally:
+            tracing._session.reset(token)
+        assert sorted(s.requests - b for s, b in zip(servers, before)) == [0, 0, 4]
+    assert sum(s.requests > 0 for s in servers) > 1
@@ -0,0 +1,57 @@
+import asyncio
+
+from scripts.fake_ollama import EVAL_REPLY, start_fake_ollama
+from src.llm import base as llmbase
+from src.services.evaluate import aevaluate_answer, evaluate_answer
+from src.utils.jsonscan import JsonObjectScanner
+
+TRAILER = " and some more words" * 40
+
+
+def test_scanner_finds_first_object_across_chunks():
+    text = 'Sure {not json} here: {"a": "x}{\\"y", "b": {"c": 1}} trailing {"d": 2}'
+    scanner = JsonObjectScanner()
+    found = [scanner.feed(text[i:i + 3]) for i in range(0, len(text), 3)]
+    hits = [f for f in found if f]
+    assert hits[0] == '{"a": "x}{\\"y", "b": {"c": 1}}'
+    assert scanner.text.startswith("Sure {not json}")
+
+
+def test_evaluation_stops_decoding_after_json(monkeypatch):
+    server, url = start_fake_ollama(reply=EVAL_REPLY + TRAILER, token_delay=0.001)
+    monkeypatch.setenv("OLLAMA_HOST", url)
+    try:
+        result = evaluate_answer("Python", "What is a list?", "An ordered mutable sequence.")
+        assert result["overall"] == 6
+        assert server.tokens_sent < 40
+
+        server.tokens_sent = 0
+
+        async def run():
+            try:
+                return await aevaluate_answer("Python", "What is a list?", "An ordered mutable sequence.")
+            finally:
+                await llmbase.aclose_llm()
+
+        assert asyncio.run(run())["overall"] == 6
+        assert server.tokens_sent < 40
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+
+def test_parse_json_block_validates_each_candidate_once():
+    from src.core.schemas import EVAL_ADAPTER
+    from src.utils.jsonscan import parse_json_block
+
+    seen = []
+
+    def validate(block):
+        seen.append(block)
+        return EVAL_ADAPTER.validate_json(block)
+
+    text = 'Draft {"accuracy": seven} final {"accuracy": 7, "clarity": 6, "depth": 5} and {"x": 1}'
+    ev = parse_json_block(text, validate)
+    assert ev.accuracy == 7 and ev.overall == 6.0
+    assert seen == ['{"accuracy": seven}', '{"accuracy": 7, "clarity": 6, "depth": 5}']
+    assert parse_json_block("no json here", validate) is None
@@ -0,0 +1,69 @@
+import time
+
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+from src.llm import cache as llmcache
+from src.llm.cache import LLMCache, cache_key
+from src.llm.ollama_client import OllamaClient
+
+
+def test_lru_eviction_and_ttl(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "c.sqlite"), max_bytes=10, ttl=60)
+    cache.put("a", "m", "aaaa")
+    cache.put("b", "m", "bbbb")
+    assert cache.get("a") == "aaaa"  # a is now the most recent
+    cache.put("c", "m", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+
+    now = time.time()
+    monkeypatch.setattr(llmcache.time, "time", lambda: now + 120)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_client_serves_low_temperature_calls_from_cache(tmp_path, monkeypatch):
+    server, url = start_fake_ollama(reply="cached")
+    monkeypatch.setattr(llmcache, "_cache", LLMCache(str(tmp_path / "c.sqlite")))
+    monkeypatch.setenv("LLM_CACHE", "1")
+    llm = OllamaClient(host=url, model="fake")
+    messages = [{"role": "user", "content": "grade this"}]
+    try:
+        for _ in range(3):
+            assert llm.chat(messages, options={"temperature": 0.1}) == "cached"
+        assert server.requests == 1
+        llm.chat(messages, options={"temperature": 0.7})
+        llm.chat(messages, options={"temperature": 0.7})
+        assert server.requests == 3
+        assert cache_key("ollama", url, "fake", messages, {"a": 1}) != cache_key("ollama", url, "other", messages, {"a": 1})
+    finally:
+        llm.close()
+        server.shutdown()
+
+
+def test_cache_is_scoped_to_the_host_or_its_pool(tmp_path, monkeypatch):
+    started = [start_fake_ollama(reply="cached") for _ in range(3)]
+    monkeypatch.setattr(llmcache, "_cache", LLMCache(str(tmp_path / "c.sqlite")))
+    monkeypatch.setenv("LLM_CACHE", "1")
+    (a, url_a), (b, url_b), (c, url_c) = started
+    messages = [{"role": "user", "content": "grade this"}]
+    try:
+        # same model name on another server: not the same replies
+        for url in (url_a, url_b):
+            llm = OllamaClient(host=url, model="fake")
+            llm.chat(messages, options={"temperature": 0.1})
+            llm.close()
+        assert (a.requests, b.requests) == (1, 1)
+
+        # the hosts of one pool share entries, whichever host served them
+        monkeypatch.setenv("OLLAMA_HOST", f"{url_b},{url_c}")
+        monkeypatch.setenv("OLLAMA_MODEL", "fake")
+        pooled = llmbase.build_llm()
+        for _ in range(4):
+            assert pooled.chat(messages, options={"temperature": 0.1}) == "cached"
+        assert b.requests + c.requests == 2
+    finally:
+        llmbase.close_llm()
+        for server, _ in started:
+            server.shutdown()
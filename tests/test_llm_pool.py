@@ -0,0 +1,24 @@
+from scripts.fake_ollama import start_fake_ollama
+from src.llm import base as llmbase
+
+
+def test_build_llm_reuses_one_client_per_host(monkeypatch):
+    server, url = start_fake_ollama(reply="pong")
+    monkeypatch.setenv("OLLAMA_HOST", url)
+    try:
+        llm = llmbase.build_llm()
+        assert llmbase.build_llm() is llm
+        for _ in range(5):
+            assert llm.chat([{"role": "user", "content": "ping"}]) == "pong"
+        assert len(server.connections) == 1
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+
+def test_close_llm_drops_registry(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", "http://127.0.0.1:9")
+    llm = llmbase.build_llm()
+    llmbase.close_llm()
+    assert llmbase.build_llm() is not llm
+    llmbase.close_llm()
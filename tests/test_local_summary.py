@@ -0,0 +1,41 @@
+from src.core.schemas import SUMMARY_ADAPTER
+from src.core.state import apply_update, new_interview_state, update_topic_performance
+from src.graph import flow
+from src.llm import base as llmbase
+from src.services.summary import local_summary
+
+
+def _ev(question, overall, misconceptions=(), hint=""):
+    return {"question": question, "scores": {"overall": overall}, "overall": overall,
+            "misconceptions": list(misconceptions), "hint": hint, "followup_needed": overall < 5}
+
+
+EVALS = [
+    _ev("How do channels work?", 9),
+    _ev("What does select do?", 3, ["Thinks select blocks forever"], "Consider the default case."),
+    _ev("When is a mutex better?", 6, ["Thinks select blocks forever"], "Think about shared counters."),
+]
+
+
+def test_local_summary_matches_llm_schema():
+    perf = None
+    for ev in EVALS:
+        perf = update_topic_performance(perf, ev["overall"])
+    out = local_summary(EVALS, {"Go": perf})
+    assert SUMMARY_ADAPTER.validate_python(out).model_dump() == out
+    assert out["final_grade"] == 6.0 and out["signal"] == "borderline"
+    assert out["strengths"] == ["How do channels work? (9/10)"]
+    assert out["recommendations"] == ["Revisit: Thinks select blocks forever", "Consider the default case.",
+                                      "Think about shared counters."]
+    assert "Go 6.00 ± 2.45 (3)" in out["feedback"] and 'Weakest: "What does select do?" (3)' in out["feedback"]
+    assert local_summary([])["final_grade"] == 0.0
+
+
+def test_local_mode_skips_the_model(monkeypatch):
+    def no_llm():
+        raise AssertionError("local summary must not call the model")
+
+    monkeypatch.setattr(llmbase, "build_llm", no_llm)
+    st = {**new_interview_state(topics=["Go"], summary_mode="local"), "evals": EVALS}
+    st = apply_update(st, flow.node_summary(st))
+    assert st["summary"]["signal"] == "borderline"
@@ -0,0 +1,57 @@
+import threading
+
+from src.core.state import apply_update, new_interview_state
+from src.graph.flow import node_next_question, node_plan
+from src.llm import base as llmbase
+from src.utils import logging as tracing
+
+
+class CountingLLM:
+    def __init__(self, repeats=0):
+        self.calls = 0
+        self.repeats = repeats
+        self.lock = threading.Lock()
+        self.kinds = set()
+
+    def chat(self, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.kinds.add(tracing.current_call())
+            n = self.calls
+        if n <= self.repeats:
+            return "Explain the same thing"
+        return f"Explain concept number {n}"
+
+
+def test_plan_generates_all_slots_and_next_question_pops(monkeypatch):
+    llm = CountingLLM(repeats=3)
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+    st = new_interview_state(topics=["Go", "Rust"], max_q=4, question_type="theory", plan_ahead=True)
+
+    st = apply_update(st, node_plan(st))
+    plan = st["question_plan"]
+    assert [p["topic"] for p in plan] == ["Go", "Rust", "Go", "Rust"]
+    assert [p["difficulty"] for p in plan] == ["easy", "medium", "hard", "easy"]
+    questions = [p["question"] for p in plan]
+    assert all(questions) and len(set(questions)) == 4
+    assert llm.kinds == {"plan"}
+
+    calls = llm.calls
+    for expected in questions:
+        st = apply_update(st, node_next_question(st))
+        assert st["asked"][-1]["question"] == expected
+    assert llm.calls == calls
+    assert st["question_plan"] == []
+    assert st["main_count"] == 4
+    assert st["type_counts"] == {"Go": {"theory": 2}, "Rust": {"theory": 2}}
+
+
+def test_mismatched_plan_entry_falls_back_to_live_generation(monkeypatch):
+    llm = CountingLLM()
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+    st = new_interview_state(topics=["Go"], max_q=2, difficulty="hard", question_type="theory")
+    st["question_plan"] = [{"question": "[theory] Planned?", "topic": "Go", "difficulty": "easy"}]
+
+    st = apply_update(st, node_next_question(st))
+    assert st["asked"][-1]["question"] != "[theory] Planned?"
+    assert llm.calls == 1
@@ -0,0 +1,47 @@
+from src.core.state import apply_update, new_interview_state
+from src.graph import flow
+from src.llm import base as llmbase
+from src.services import pregrade
+
+QUESTION = "[theory] Explain generators in Python and when to use them."
+COMPLETE = ("A generator function uses yield to produce values lazily. Calling it returns an iterator, and "
+            "each next() resumes where it paused with its local state kept. They suit large or infinite "
+            "sequences because they use far less memory than a list.")
+
+
+OFF_TOPIC = "I would add an index on the join column in Postgres."
+# names every concept and gets each one wrong
+NEGATED = ("Generators never use yield and are not lazy. Calling one does not return an iterator, next() "
+           "restarts from scratch with no state kept, and they need more memory than a list, so they are "
+           "useless for large or infinite sequences.")
+
+
+def test_clear_cut_failures_are_decided_and_the_rest_deferred():
+    assert pregrade.assess(QUESTION, " ... ")["decision"] == "empty"
+    assert pregrade.assess(QUESTION, OFF_TOPIC)["decision"] == "off_topic"
+    # coverage alone cannot tell a right answer from a wrong one that names
+    # the same concepts, so both go to the LLM
+    full = pregrade.assess(QUESTION, COMPLETE)
+    assert full["decision"] is None and full["coverage"] >= 0.75
+    assert pregrade.assess(QUESTION, NEGATED)["decision"] is None
+    assert pregrade.pregrade(QUESTION, NEGATED, "Python") is None
+    # partial answers, keyword lists and unknown questions go to the LLM too
+    assert pregrade.assess(QUESTION, "They use yield.")["decision"] is None
+    assert pregrade.assess(QUESTION, "yield lazy iterator next state memory infinite")["decision"] is None
+    assert pregrade.assess("What is a monad?", COMPLETE)["decision"] is None
+
+
+def test_pregraded_answer_skips_the_llm(monkeypatch):
+    def no_llm():
+        raise AssertionError("pre-graded answers must not reach the LLM")
+
+    monkeypatch.setattr(pregrade, "PREGRADE", True)
+    monkeypatch.setattr(llmbase, "build_llm", no_llm)
+    st = new_interview_state(topics=["Python"], max_q=2)
+    st = {**st, "topic_index": 1, "current_q": QUESTION, "answers": [OFF_TOPIC]}
+    st = apply_update(st, flow.node_evaluate(st))
+
+    ev = st["last_eval"]
+    assert ev["pregrade"]["decision"] == "off_topic"
+    assert ev["overall"] == 0.0 and ev["followup_needed"]
+    assert st["topic_performance"]["Python"]["questions"] == 1
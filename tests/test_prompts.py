@@ -0,0 +1,46 @@
+from scripts.fake_ollama import _prompt_tokens, start_fake_ollama
+from src.llm import base as llmbase
+from src.services import evaluate, summary
+from src.services.followup import _followup_messages
+from src.services.questions import _question_messages
+
+
+def _builders(i):
+    return [
+        _question_messages(f"Topic{i}", "easy" if i else "hard", "theory" if i else "coding"),
+        evaluate._eval_request(f"Topic{i}", f"Question {i}?", f"answer {i}")[0],
+        _followup_messages(f"Question {i}?", f"answer {i}", f"hint {i}", [f"m{i}"]),
+        summary._summary_request(f"Topic{i}", summary.add_to_digest(None, {"question": f"Q{i}?", "overall": i}), i + 1)[0],
+        summary._fold_request(f"notes {i}", [f"line {i}"])[0],
+    ]
+
+
+def test_static_prefix_is_identical_and_values_come_last():
+    for a, b in zip(_builders(0), _builders(1)):
+        assert a[:-1] == b[:-1] and a[0]["role"] == "system"
+        assert a[-1] != b[-1] and a[-1]["role"] == "user"
+
+
+def test_second_call_of_a_kind_only_evaluates_its_user_message():
+    server, url = start_fake_ollama(reply="ok", num_slots=len(_builders(0)))
+    try:
+        for msgs in _builders(0):
+            server.cached_prefix(_prompt_tokens(msgs))
+        for msgs in _builders(1):
+            before = server.prompt_tokens_evaluated
+            server.cached_prefix(_prompt_tokens(msgs))
+            assert server.prompt_tokens_evaluated - before <= len(_prompt_tokens(msgs[-1:]))
+    finally:
+        server.shutdown()
+
+
+def test_keep_alive_is_sent_with_each_request(monkeypatch):
+    server, url = start_fake_ollama(reply="pong")
+    monkeypatch.setenv("OLLAMA_HOST", url)
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "30m")
+    try:
+        assert llmbase.build_llm().chat([{"role": "user", "content": "ping"}]) == "pong"
+        assert server.keep_alive == "30m"
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
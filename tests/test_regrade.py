@@ -0,0 +1,59 @@
+import json
+import shutil
+from pathlib import Path
+
+from src.services import evaluate
+from src.services.regrade import load_sessions, regrade, spearman
+
+
+def _current_log():
+    evals = []
+    asked = []
+    for i, (q, a, score) in enumerate([("What is a slice?", "A view over an array", 4.0),
+                                        ("What is a map?", "A hash table", 8.0),
+                                        ("What is a slice?", "A view over an array", 4.0)]):
+        asked.append({"question": f"[theory] {q}", "topic": "Go", "difficulty": "easy"})
+        evals.append({"question": q, "answer": a, "topic": "Go", "overall": score, "scores": {"overall": score}})
+    return {"topics": ["Go"], "asked": asked, "answers": [e["answer"] for e in evals], "evals": evals}
+
+
+def test_regrade_reads_both_formats_and_dedupes(monkeypatch, tmp_path):
+    shutil.copy(Path(__file__).parents[1] / "runs" / "test1.json", tmp_path / "old.json")
+    (tmp_path / "new.json").write_text(json.dumps(_current_log()), encoding="utf-8")
+    calls = []
+
+    def fake_eval(topic, question, answer):
+        calls.append((topic, question))
+        return {"overall": 9.0 if "map" in question else 5.0}
+
+    monkeypatch.setattr(evaluate, "evaluate_answer", fake_eval)
+    pairs = load_sessions(str(tmp_path))
+    assert [(p["session"], p["topic"]) for p in pairs][:3] == [("new", "Go")] * 3
+    assert pairs[3]["topic"] == "Python" and pairs[3]["original"] == 3.0
+    assert not pairs[0]["question"].startswith("[")
+
+    rows, stats = regrade(pairs, concurrency=4)
+    assert stats["pairs"] == 5 and stats["graded"] == 4 and stats["cached"] == 1
+    # the old log's "I dont know" is settled without the grader, as in the
+    # interview, and its recorded 0 stands
+    assert len(calls) == 3
+    assert [r["delta"] for r in rows] == [1.0, 1.0, 1.0, 2.0, 0.0]
+    assert stats["spearman"] is not None
+
+
+def test_regrade_applies_the_interview_checks(monkeypatch, tmp_path):
+    # a two-word answer is zeroed by the interview whatever the grader says;
+    # the regrade must zero it too rather than report the raw score as drift
+    log = {"topics": ["Go"], "evals": [{"question": "What is a map?", "answer": "hash table", "topic": "Go",
+                                        "overall": 7.0, "scores": {"overall": 0.0}}]}
+    (tmp_path / "short.json").write_text(json.dumps(log), encoding="utf-8")
+    monkeypatch.setattr(evaluate, "evaluate_answer", lambda topic, question, answer: {"overall": 7.0})
+    rows, _ = regrade(load_sessions(str(tmp_path)))
+    assert rows[0]["original"] == 0.0 and rows[0]["regraded"] == 0.0 and rows[0]["delta"] == 0.0
+
+
+def test_spearman_handles_ties():
+    assert spearman([1, 2, 3, 4], [10, 20, 30, 40]) == 1.0
+    assert spearman([1, 2, 3, 4], [4, 3, 2, 1]) == -1.0
+    assert spearman([0, 0, 5, 10], [1, 1, 2, 3]) == 1.0
+    assert spearman([5, 5], [1, 2]) is None
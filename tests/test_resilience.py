@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from scripts.fake_ollama import EVAL_REPLY, start_fake_ollama
+from src.core.state import apply_update, new_interview_state
+from src.graph import flow
+from src.llm import base as llmbase
+from src.llm import cache as llmcache
+from src.llm import resilience
+from src.services import evaluate
+from src.utils import logging as tracing
+from src.utils import metrics
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    metrics.reset()
+    resilience.reset()
+    server, url = start_fake_ollama(reply="pong")
+    monkeypatch.setenv("OLLAMA_HOST", url)
+    yield server
+    llmbase.close_llm()
+    server.shutdown()
+
+
+def test_deadline_bounds_a_stalled_call(server, monkeypatch):
+    monkeypatch.setenv("LLM_DEADLINE_EVAL", "0.2")
+    monkeypatch.setenv("LLM_RETRIES", "0")
+    server.reply = EVAL_REPLY
+    server.stall_next, server.stall_s = 2, 1.0
+
+    t0 = time.perf_counter()
+    with pytest.raises(resilience.LLMTimeout):
+        evaluate.evaluate_answer("Go", "What is a goroutine?", "A lightweight thread")
+
+    async def run():
+        try:
+            await evaluate.aevaluate_answer("Go", "What is a goroutine?", "A lightweight thread")
+        finally:
+            await llmbase.aclose_llm()
+
+    with pytest.raises(resilience.LLMTimeout):
+        asyncio.run(run())
+    assert time.perf_counter() - t0 < 0.8
+    assert metrics.counter("llm.timeouts") == 2
+
+
+def test_cut_off_streams_are_not_cached(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(llmcache, "_cache", llmcache.LLMCache(str(tmp_path / "c.sqlite")))
+    monkeypatch.setenv("LLM_CACHE", "1")
+    monkeypatch.setenv("LLM_RETRIES", "0")
+    monkeypatch.setenv("LLM_DEADLINE_EVAL", "0.3")
+    server.reply = " ".join(f"w{i}" for i in range(60))
+    server.token_delay = 0.02
+    llm = llmbase.build_llm("eval")
+    opts = {"options": {"temperature": 0.0}}
+    read = tracing.call_kind("eval")(lambda: "".join(llm.stream(MESSAGES, **opts)))
+    with pytest.raises(resilience.LLMTimeout):
+        read()
+    llm.policy.deadlines["eval"] = 10.0
+    assert llm.chat(MESSAGES, **opts) == server.reply and server.requests == 2
+
+    server.reply = '{"overall": 7} and some trailing prose'
+    other = [{"role": "user", "content": "grade"}]
+    assert llmbase.chat_json(llm, other, **opts) == '{"overall": 7}'
+    assert llm.chat(other, **opts) == '{"overall": 7}' and server.requests == 3
+
+
+def test_server_errors_are_retried(server):
+    server.fail_next = 2
+    assert llmbase.build_llm().chat(MESSAGES) == "pong"
+    assert metrics.counter("llm.retries") == 2 and server.requests == 3
+
+
+def test_slow_attempt_is_hedged(server, monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE", "default")
+    for _ in range(resilience.HEDGE_MIN_SAMPLES):
+        resilience._observe(("default", "chat"), 0.02)
+    server.stall_next, server.stall_s = 1, 1.0
+
+    t0 = time.perf_counter()
+    assert llmbase.build_llm().chat(MESSAGES) == "pong"
+    assert time.perf_counter() - t0 < 0.5
+    assert metrics.counter("llm.hedges") == 1 and metrics.counter("llm.hedge_wins") == 1
+
+
+def test_breaker_fails_fast_then_probes(server, monkeypatch):
+    monkeypatch.setenv("LLM_RETRIES", "0")
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "2")
+    monkeypatch.setenv("LLM_BREAKER_COOLDOWN", "0.1")
+    llm = llmbase.build_llm()
+    server.fail_next = 2
+    for _ in range(2):
+        with pytest.raises(Exception):
+            llm.chat(MESSAGES)
+    with pytest.raises(resilience.CircuitOpen):
+        llm.chat(MESSAGES)
+    assert server.requests == 2 and metrics.counter("llm.breaker_rejects") == 1
+
+    time.sleep(0.15)
+    assert llm.chat(MESSAGES) == "pong"
+    assert resilience.breaker_states()[llm.host] == "closed"
+
+
+def test_open_circuit_degrades_instead_of_ending_the_interview(monkeypatch):
+    metrics.reset()
+
+    def down():
+        raise resilience.CircuitOpen("circuit open")
+
+    monkeypatch.setattr(llmbase, "build_llm", down)
+    st = new_interview_state(topics=["Go"], max_q=1, question_type="design")
+    st = apply_update(st, flow.node_next_question(st))
+    assert not st["done"] and st["current_q"]
+
+    st = apply_update(st, {"answers": ["Goroutines talk over channels and share memory via mutexes"]})
+    st = apply_update(st, flow.node_evaluate(st))
+    assert st["last_eval"]["degraded"] and st["last_eval"]["overall"] == 5.0
+    assert flow.cond_need_followup(st) == "continue"
+
+    st = apply_update(st, flow.node_summary(st))
+    assert st["summary"]["final_grade"] == 5.0
+    assert [metrics.counter(f"degraded.{k}") for k in ("question", "eval", "summary")] == [1, 1, 1]
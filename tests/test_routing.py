@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from scripts.fake_ollama import EVAL_REPLY, start_fake_ollama
+from src.llm import base as llmbase
+from src.llm.fake_client import FakeClient
+from src.services import evaluate, followup
+
+
+def test_routes_pick_backend_and_model_per_call_kind(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "ollama")
+    monkeypatch.setenv("OLLAMA_MODEL", "big")
+    monkeypatch.setenv("LLM_ROUTE_FOLLOWUP", "fake:small")
+    monkeypatch.setenv("LLM_ROUTE_EVAL", "openai")
+    monkeypatch.setenv("OPENAI_MODEL", "qwen2.5:7b")
+    assert llmbase.route("question")[::2] == ("ollama", "big")
+    assert llmbase.route("followup")[::2] == ("fake", "small")
+    assert llmbase.route("eval")[::2] == ("openai", "qwen2.5:7b")
+    monkeypatch.setenv("LLM_ROUTE_SUMMARY", "nope:x")
+    with pytest.raises(ValueError):
+        llmbase.route("summary")
+
+
+def test_services_are_routed_by_their_call_kind(monkeypatch):
+    server, url = start_fake_ollama()
+    monkeypatch.setenv("OLLAMA_HOST", url)
+    monkeypatch.setenv("LLM_ROUTE_FOLLOWUP", "fake")
+    try:
+        out = followup.generate_followup("What is a goroutine?", "a thread")
+        assert out.startswith("(Follow-up)") and server.requests == 0
+        assert isinstance(llmbase.build_llm("followup").inner, FakeClient)
+
+        ev = evaluate.evaluate_answer("Go", "What is a goroutine?", "A lightweight thread managed by the runtime")
+        assert ev["overall"] > 0 and server.requests == 1
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+
+def test_openai_compatible_backend(monkeypatch):
+    server, url = start_fake_ollama(reply=EVAL_REPLY)
+    monkeypatch.setenv("OPENAI_BASE_URL", url + "/v1")
+    monkeypatch.setenv("LLM_ROUTE_EVAL", "openai:local-7b")
+    try:
+        ev = evaluate.evaluate_answer("Go", "What is a goroutine?", "A lightweight thread")
+        assert ev["overall"] == 6
+
+        async def run():
+            try:
+                return await evaluate.aevaluate_answer("Go", "What is a channel?", "A typed pipe")
+            finally:
+                await llmbase.aclose_llm()
+
+        assert asyncio.run(run())["overall"] == 6
+        assert server.paths == {"/v1/chat/completions": 2}
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+
+from src.llm import base as llmbase
+from src.server import SessionManager, create_app
+
+
+class StreamingDummyLLM:
+    async def astream(self, messages, **kwargs):
+        if '"accuracy"' in " ".join(m["content"] for m in messages):
+            yield await self.achat(messages, **kwargs)
+            return
+        for tok in ["Explain ", "X ", "in ", "depth"]:
+            yield tok
+
+    async def achat(self, messages, **kwargs):
+        text = " ".join(m["content"] for m in messages)
+        if "DIGEST_JSON" in text:
+            return '{"feedback": "ok", "strengths": [], "recommendations": [], "final_grade": 7, "signal": "hire"}'
+        return '{"accuracy": 7, "clarity": 7, "depth": 7, "overall": 7, "followup_needed": false}'
+
+
+async def _wait_question(client, sid):
+    for _ in range(200):
+        r = await client.get(f"/sessions/{sid}/question")
+        if r.status_code == 200:
+            return r.json()
+        await asyncio.sleep(0.01)
+    raise AssertionError("question never became ready")
+
+
+def test_session_api_runs_interview_and_streams_tokens(monkeypatch, capsys):
+    monkeypatch.setattr(llmbase, "build_async_llm", lambda: StreamingDummyLLM())
+    manager = SessionManager()
+    app = create_app(manager)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            sid = (await client.post("/sessions", json={"topics": ["Go"], "questions": 2, "type": "theory"})).json()["session_id"]
+            q = await _wait_question(client, sid)
+            assert q["question"] == "Explain X in depth?"
+            tokens = [d["text"] for e, d in manager.sessions[sid].turn_events if e == "token"]
+            assert "".join(tokens) == "Explain X in depth"
+
+            ev = (await client.post(f"/sessions/{sid}/answer", json={"answer": "X means an example in depth"})).json()
+            assert ev["scores"]["overall"] == 7
+            await _wait_question(client, sid)
+            await client.post(f"/sessions/{sid}/answer", json={"answer": "X again with depth and detail"})
+
+            for _ in range(200):
+                r = await client.get(f"/sessions/{sid}/summary")
+                if r.status_code == 200:
+                    break
+                await asyncio.sleep(0.01)
+            assert r.json()["final_grade"] == 7
+            # the summary is saved a moment before the turn's task ends
+            for _ in range(200):
+                status = (await client.get(f"/sessions/{sid}")).json()["status"]
+                if status != "generating":
+                    break
+                await asyncio.sleep(0.01)
+            assert status == "done"
+            assert len((await client.get(f"/sessions/{sid}/evaluations")).json()) == 2
+
+    asyncio.run(main())
+
+
+
+class GatedLLM(StreamingDummyLLM):
+    # grading blocks until the test opens the gate
+    def __init__(self, gate):
+        self.gate = gate
+
+    async def achat(self, messages, **kwargs):
+        await self.gate.wait()
+        return await super().achat(messages, **kwargs)
+
+
+def test_concurrent_answers_and_delete_never_hang(monkeypatch):
+    manager = SessionManager()
+    app = create_app(manager)
+
+    async def main():
+        gate = asyncio.Event()
+        monkeypatch.setattr(llmbase, "build_async_llm", lambda: GatedLLM(gate))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            sid = (await client.post("/sessions", json={"topics": ["Go"], "questions": 2, "type": "theory"})).json()["session_id"]
+            await _wait_question(client, sid)
+
+            async def post(text):
+                return (await client.post(f"/sessions/{sid}/answer", json={"answer": text})).status_code
+
+            answers = [asyncio.create_task(post("one")), asyncio.create_task(post("two"))]
+            done, waiting = await asyncio.wait(answers, timeout=2, return_when=asyncio.FIRST_COMPLETED)
+            assert [t.result() for t in done] == [409] and len(waiting) == 1
+            snap = await manager.graph.aget_state(manager.sessions[sid].config)
+            assert len(snap.values["answers"]) == 1
+
+            # the accepted answer is stuck behind the gate; deleting the
+            # session must release its request instead of leaving it hanging
+            assert (await client.delete(f"/sessions/{sid}")).status_code == 204
+            assert await asyncio.wait_for(waiting.pop(), 2) == 410
+
+    asyncio.run(main())
+
+
+def test_idle_sessions_are_dropped_and_rebuilt_on_demand(monkeypatch):
+    monkeypatch.setattr(llmbase, "build_async_llm", lambda: StreamingDummyLLM())
+    manager = SessionManager(idle_seconds=0.05)
+    app = create_app(manager)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            sid = (await client.post("/sessions", json={"topics": ["Go"], "questions": 1, "type": "theory"})).json()["session_id"]
+            await _wait_question(client, sid)
+            for _ in range(100):
+                if sid not in manager.sessions:
+                    break
+                await asyncio.sleep(0.01)
+            assert sid not in manager.sessions
+
+            # the interview lives on in the checkpointer
+            q = await _wait_question(client, sid)
+            assert q["question"] == "Explain X in depth?"
+            ev = (await client.post(f"/sessions/{sid}/answer", json={"answer": "X means an example in depth"})).json()
+            assert ev["scores"]["overall"] == 7
+            assert (await client.get("/sessions/unknown")).status_code == 404
+
+    asyncio.run(main())
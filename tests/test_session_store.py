@@ -0,0 +1,100 @@
+import asyncio
+
+from src.graph.flow import build_graph
+from src.graph.store import TieredSaver
+from src.llm import base as llmbase
+from src.utils import metrics
+
+
+class AsyncDummyLLM:
+    async def achat(self, messages, **kwargs):
+        text = " ".join(m["content"] for m in messages)
+        if "DIGEST_JSON" in text:
+            return '{"feedback": "ok", "strengths": [], "recommendations": [], "final_grade": 5, "signal": "borderline"}'
+        if '"accuracy"' in text:
+            return '{"accuracy": 6, "clarity": 6, "depth": 6, "overall": 6, "followup_needed": false}'
+        return "Explain X?"
+
+
+def _config(i):
+    return {"configurable": {"thread_id": f"session-{i}"}}
+
+
+async def _start(app, i):
+    await app.ainvoke({
+        "topics": ["Go"],
+        "topic_index": 0,
+        "difficulty": "mixed",
+        "max_q": 2,
+        "question_type": "theory",
+        "difficulty_counts": {"easy": 0, "medium": 0, "hard": 0},
+    }, _config(i))
+
+
+async def _answer(app, i):
+    await app.aupdate_state(_config(i), {"answers": ["X is explained by an example"]}, as_node="ask")
+    await app.ainvoke(None, _config(i))
+
+
+def test_idle_sessions_spill_and_resume_after_restart(monkeypatch, tmp_path):
+    monkeypatch.setattr(llmbase, "build_async_llm", lambda: AsyncDummyLLM())
+    path = str(tmp_path / "sessions.sqlite")
+    metrics.reset()
+    saver = TieredSaver(path, max_bytes=4096)
+    app = build_graph(checkpointer=saver, interrupt_before=["ask"])
+
+    async def first_process():
+        for i in range(20):
+            await _start(app, i)
+        assert saver.hot_bytes <= 4096 and saver.stats()["hot_threads"] < 20
+        # a spilled session comes back transparently
+        await _answer(app, 0)
+        snap = await app.aget_state(_config(0))
+        assert len(snap.values["evals"]) == 1 and snap.next == ("ask",)
+
+    asyncio.run(first_process())
+    assert metrics.counter("sessions.spilled") > 0
+    assert metrics.counter("sessions.rehydrated") > 0
+    saver.close()
+
+    # a new process on the same file picks up every session where it stopped
+    saver = TieredSaver(path)
+    app = build_graph(checkpointer=saver, interrupt_before=["ask"])
+
+    async def second_process():
+        await _answer(app, 0)
+        await _answer(app, 7)
+        return (await app.aget_state(_config(0))).values, (await app.aget_state(_config(7))).values
+
+    done, mid = asyncio.run(second_process())
+    assert done["summary"]["final_grade"] == 5 and done["main_count"] == 2
+    assert len(mid["evals"]) == 1 and mid["current_q"]
+    assert saver.has_thread("session-19") and not saver.has_thread("session-99")
+
+
+def test_snapshots_and_idle_spills_run_off_the_write_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(llmbase, "build_async_llm", lambda: AsyncDummyLLM())
+    path = str(tmp_path / "sessions.sqlite")
+    metrics.reset()
+    saver = TieredSaver(path, idle_seconds=0.05, sweep_seconds=0.01)
+    app = build_graph(checkpointer=saver, interrupt_before=["ask"])
+
+    async def run():
+        await _start(app, 0)
+        # nothing writes after this; the flusher alone snapshots and spills
+        for _ in range(200):
+            if not saver.stats()["hot_threads"]:
+                break
+            await asyncio.sleep(0.01)
+        assert saver.stats()["hot_threads"] == 0
+        # a process that never closed this saver still finds the session
+        other = TieredSaver(path)
+        assert other.has_thread("session-0")
+        other.close()
+        await _answer(app, 0)
+        return (await app.aget_state(_config(0))).values
+
+    values = asyncio.run(run())
+    assert len(values["evals"]) == 1
+    assert metrics.counter("sessions.spilled") >= 1 and metrics.counter("sessions.rehydrated") >= 1
+    saver.close()
@@ -0,0 +1,57 @@
+import os
+import random
+import time
+
+from src.services import questions
+from src.services.similarity import QuestionIndex, similarity
+
+
+def test_paraphrases_match_and_distinct_questions_do_not():
+    index = QuestionIndex(["[theory] What is the difference between a list and a tuple in Python?"])
+    assert "Explain the differences between lists and tuples in Python." in index
+    assert "How does the GIL affect multiprocessing in Python?" not in index
+    assert similarity("What is a Python dict?", "What is a Python list?") < 0.5
+
+
+def test_lookup_stays_fast_on_large_bank():
+    rng = random.Random(7)
+    vocab = [f"term{i}" for i in range(3000)]
+    bank = [" ".join(rng.sample(vocab, 6)) + "?" for _ in range(10000)]
+    index = QuestionIndex(bank)
+    t0 = time.perf_counter()
+    for q in bank[:200]:
+        assert q.rstrip("?") + "." in index
+    assert time.perf_counter() - t0 < 0.5
+
+
+def test_seed_pick_skips_paraphrased_repeats(monkeypatch):
+    bank = {"Python": {"theory": ["What are Python decorators?", "How does garbage collection work in CPython?"]}}
+    monkeypatch.setattr(questions, "_load_seeds", lambda: bank)
+    asked = ["[theory] Explain decorators in Python?"]
+    for _ in range(10):
+        q = questions._pick_seed_question("Python", "theory", asked)
+        assert q == "[theory] How does garbage collection work in CPython?"
+
+
+def test_seed_index_is_built_once_per_bank_file(tmp_path, monkeypatch):
+    path = tmp_path / "bank.json"
+    path.write_text('{"Go": {"theory": ["What is a channel?", "How do goroutines get scheduled?"]}}')
+    monkeypatch.setattr(questions, "SEED_PATH", str(path))
+    built = []
+
+    class CountingIndex(QuestionIndex):
+        def __init__(self, texts=(), threshold=None):
+            built.append(1)
+            super().__init__(texts, threshold)
+
+    monkeypatch.setattr(questions, "QuestionIndex", CountingIndex)
+    for _ in range(5):
+        assert questions._pick_seed_question("Go", "theory", ["[theory] Explain channels?"]) == \
+            "[theory] How do goroutines get scheduled?"
+    assert len(built) == 1
+
+    path.write_text('{"Go": {"theory": ["What is a channel?", "What is a select statement?"]}}')
+    os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+    assert questions._pick_seed_question("Go", "theory", ["[theory] Explain channels?"]) == \
+        "[theory] What is a select statement?"
+    assert len(built) == 2
@@ -0,0 +1,72 @@
+import threading
+
+from src.core.state import apply_update, new_interview_state
+from src.graph import flow
+from src.llm import base as llmbase
+from src.utils import logging as tracing
+from src.utils import metrics
+
+
+class SlowLLM:
+    # the grader only returns once the follow-up draft has started, so the
+    # two calls overlap exactly when the draft runs during grading
+    def __init__(self, followup_needed):
+        self.followup_needed = followup_needed
+        self.calls = []
+        self.sessions = set()
+        self.drafting = threading.Event()
+        self.overlapped = None
+
+    def chat(self, messages, **kwargs):
+        text = " ".join(m["content"] for m in messages)
+        self.sessions.add(tracing.current_session())
+        if '"accuracy"' in text:
+            self.overlapped = self.drafting.wait(5)
+            self.calls.append("eval")
+            need = "true" if self.followup_needed else "false"
+            return '{"accuracy": 3, "clarity": 3, "depth": 3, "overall": 3, "followup_needed": %s}' % need
+        self.drafting.set()
+        self.calls.append("followup")
+        return "What happens on the error path"
+
+
+def _state(answer):
+    st = new_interview_state(topics=["Go"], max_q=2, speculate=True)
+    return {**st, "topic_index": 1, "current_q": "How do goroutines communicate?", "answers": [answer]}
+
+
+def test_weak_answer_drafts_followup_during_evaluation(monkeypatch):
+    metrics.reset()
+    llm = SlowLLM(followup_needed=True)
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+
+    token = tracing.set_session("s-1")
+    try:
+        st = _state("no idea")
+        st = apply_update(st, flow.node_evaluate(st))
+    finally:
+        tracing._session.reset(token)
+    assert llm.overlapped
+    assert st["speculative_followup"] == "(Follow-up) What happens on the error path?"
+
+    st = apply_update(st, flow.node_followup(st))
+    assert st["current_q"] == "(Follow-up) What happens on the error path?"
+    assert st["speculative_followup"] is None
+    assert sorted(llm.calls) == ["eval", "followup"]
+    assert llm.sessions == {"s-1"}
+    stats = flow.speculation_stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+    assert metrics.snapshot()["observations"]["speculation.saved_ms"]["count"] == 1
+
+
+def test_unneeded_speculation_is_discarded_and_counted(monkeypatch):
+    metrics.reset()
+    llm = SlowLLM(followup_needed=False)
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+    monkeypatch.setattr(flow, "SPECULATE_BELOW_WORDS", 10)
+
+    st = _state("goroutines communicate over channels")
+    st = apply_update(st, flow.node_evaluate(st))
+    assert not st.get("speculative_followup")
+    assert flow.cond_need_followup(st) == "continue"
+    assert llm.overlapped and flow.speculation_stats()["misses"] == 1
@@ -0,0 +1,23 @@
+import statistics
+
+from src.core.state import apply_update, new_interview_state, update_topic_performance
+
+
+def test_reducers_append_and_merge():
+    st = new_interview_state(topics=["Go", "Rust"])
+    st = apply_update(st, {"asked": [{"question": "a"}], "difficulty_counts": {"easy": 1}})
+    st = apply_update(st, {"asked": [{"question": "b"}], "difficulty_counts": {"hard": 1}, "main_count": 2})
+    assert [q["question"] for q in st["asked"]] == ["a", "b"]
+    assert st["difficulty_counts"] == {"easy": 1, "medium": 0, "hard": 1}
+    assert st["main_count"] == 2
+
+
+def test_topic_performance_matches_batch_statistics():
+    scores = [3.0, 7.5, 10.0, 0.0, 6.25]
+    perf = None
+    for s in scores:
+        perf = update_topic_performance(perf, s)
+    assert perf["questions"] == 5
+    assert perf["total_score"] == sum(scores)
+    assert abs(perf["mean"] - statistics.fmean(scores)) < 1e-9
+    assert abs(perf["variance"] - statistics.pvariance(scores)) < 1e-9
@@ -0,0 +1,63 @@
+import re
+
+from scripts.fake_ollama import QUESTION_REPLY, start_fake_ollama
+from src.core.state import apply_update, new_interview_state
+from src.graph import flow
+from src.llm import base as llmbase
+from src.services import questions
+from src.utils import metrics
+
+
+def test_cli_streams_question_once_and_records_ttft(monkeypatch, capsys):
+    server, url = start_fake_ollama()
+    monkeypatch.setenv("OLLAMA_HOST", url)
+    monkeypatch.setattr(flow, "STREAM_TOKENS", True)
+    monkeypatch.setattr(flow, "CONSOLE", True)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "my answer")
+    metrics.reset()
+    try:
+        st = new_interview_state(topics=["Zig"], max_q=1, question_type="theory")
+        st = apply_update(st, flow.node_next_question(st))
+        assert st["current_q"] == QUESTION_REPLY + "?"
+        assert st["question_streamed"] is True
+        st = apply_update(st, flow.node_ask(st))
+    finally:
+        llmbase.close_llm()
+        server.shutdown()
+
+    out = capsys.readouterr().out
+    assert out.count(f"[Q] {QUESTION_REPLY}?\n") == 1
+    assert out.index("Question 1 of 1") < out.index("[Q]")
+    assert metrics.snapshot()["observations"]["llm.ttft_ms"]["count"] == 1
+
+
+def test_preview_holds_back_trailing_dot(capsys):
+    preview = flow._ConsolePreview("(Follow-up) ")
+    for chunk in ["  Why ", "does it ", "fail."]:
+        preview(chunk)
+    assert preview.finish("(Follow-up) Why does it fail?")
+    assert capsys.readouterr().out == "\n[Q] (Follow-up) Why does it fail?\n"
+
+
+class RepeatingLLM:
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    def stream(self, messages, **kwargs):
+        yield from re.findall(r"\S+\s*", self.replies.pop(0))
+
+
+def test_dedup_retry_starts_a_new_preview_line(monkeypatch, capsys):
+    monkeypatch.setattr(flow, "STREAM_TOKENS", True)
+    monkeypatch.setattr(flow, "CONSOLE", True)
+    monkeypatch.setattr(questions, "_pick_seed_question", lambda *a, **k: None)
+    llm = RepeatingLLM(["How do goroutines communicate", "What does a nil map do"])
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+    st = new_interview_state(topics=["Zig"], max_q=2, question_type="theory")
+    st["asked"] = [{"question": "[theory] How do goroutines communicate?", "topic": "Zig", "difficulty": "easy"}]
+
+    st = apply_update(st, flow.node_next_question(st))
+    assert st["current_q"] == "What does a nil map do?"
+    out = capsys.readouterr().out
+    assert "\n[Q] How do goroutines communicate  (too close to an earlier question, regenerating)\n" in out
+    assert out.endswith("\n[Q] What does a nil map do?\n")
@@ -0,0 +1,70 @@
+import json
+import threading
+
+from src.core.state import apply_update, new_interview_state
+from src.graph import flow
+from src.llm import base as llmbase
+from src.services import summary
+from src.utils import logging as tracing
+
+
+class GraderLLM:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.summary_prompts = []
+        self.folds = 0
+        self.fold_sessions = set()
+
+    def chat(self, messages, **kwargs):
+        text = messages[-1]["content"]
+        if "DIGEST_JSON" in text:
+            self.summary_prompts.append(text)
+            digest = json.loads(text.split("DIGEST_JSON:", 1)[1])
+            return json.dumps({"feedback": digest["notes"], "strengths": [], "recommendations": [],
+                               "final_grade": digest["mean"]["overall"], "signal": "borderline"})
+        if "NEW_ANSWERS" in text:
+            with self.lock:
+                self.folds += 1
+                self.fold_sessions.add(tracing.current_session())
+            return f"notes covering {text.count('- ')} answers"
+        score = 2 + len(text) % 7
+        return '{"accuracy": %d, "clarity": %d, "depth": %d, "overall": %d, "followup_needed": false, ' \
+               '"rationale": "ok", "misconceptions": ["m%d"]}' % (score, score, score, score, score)
+
+
+def _interview(n):
+    st = new_interview_state(topics=["Go"], max_q=n)
+    for i in range(n):
+        st = {**st, "current_q": f"Question {i} about goroutines {'x' * i}?", "answers": st["answers"] + [f"answer {i} in several words"]}
+        st = apply_update(st, flow.node_evaluate(st))
+    return apply_update(st, flow.node_summary(st))
+
+
+def test_summary_prompt_stays_small_as_interview_grows(monkeypatch):
+    llm = GraderLLM()
+    monkeypatch.setattr(llmbase, "build_llm", lambda: llm)
+    monkeypatch.setattr(summary, "SUMMARY_KEEP_RECENT", 3)
+
+    token = tracing.set_session("s-1")
+    try:
+        short, long = _interview(4), _interview(20)
+    finally:
+        tracing._session.reset(token)
+    assert llm.folds >= 1 and llm.fold_sessions == {"s-1"}
+    assert long["digest"]["answers"] == 20 and len(long["digest"]["recent"]) < 2 * 3
+    assert long["digest"]["notes"].startswith("notes covering")
+    mean = sum(e["scores"]["overall"] for e in long["evals"]) / 20
+    assert long["summary"]["final_grade"] == round(mean, 2)
+    # the final prompt is bounded, not proportional to the number of answers
+    assert len(llm.summary_prompts[1]) < 1.5 * len(llm.summary_prompts[0])
+
+
+def test_failed_fold_keeps_its_lines():
+    digest = None
+    for i in range(6):
+        digest = summary.add_to_digest(digest, {"question": f"Q{i}", "overall": i, "misconceptions": ["same"]})
+    digest, lines = summary.take_fold(digest, keep=2)
+    assert len(lines) == 4 and summary.take_fold(digest, keep=2)[1] == []
+    assert summary.digest_payload(digest)["recent"][0].startswith("Q0")
+    digest = summary.apply_fold(digest, None)
+    assert len(digest["recent"]) == 6 and digest["misconceptions"] == ["same"]
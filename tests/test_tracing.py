@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import httpx
+
+from scripts import bench_e2e
+from src.server import SessionManager, create_app
+from src.utils import logging as tracing
+
+
+def test_nodes_and_llm_calls_are_traced_and_exported(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracing.reset()
+    tracing.configure(True, str(path))
+    token = tracing.set_session("s-1")
+    try:
+        bench_e2e.run(sessions=2, questions=1, concurrency=1, latency=0.0)
+    finally:
+        tracing._session.reset(token)
+        tracing.configure(False)
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert all(r["session"] == "s-1" for r in records)
+    nodes = {r["name"] for r in records if r["kind"] == "node"}
+    assert {"next_question", "ask", "evaluate", "summary", "increment_or_finish"} <= nodes
+
+    calls = [r for r in records if r["kind"] != "node"]
+    by_call = {(r["node"], r["call"]) for r in calls}
+    assert {("next_question", "question"), ("evaluate", "eval"), ("summary", "summary")} <= by_call
+    for r in calls:
+        assert r["queue_ms"] <= r["wall_ms"]
+        if r.get("closed_early"):
+            # the grader stops reading once the JSON object is complete
+            continue
+        assert r["prompt_tokens"] > 0 and r["eval_tokens"] > 0 and "eval_ms" in r
+    assert all("ttft_ms" in r for r in calls if r["kind"] == "stream")
+
+    async def scrape():
+        transport = httpx.ASGITransport(app=create_app(SessionManager()))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics")
+
+    r = asyncio.run(scrape())
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    assert 'interviewer_node_seconds_count{node="evaluate"} ' in r.text
+    assert 'interviewer_llm_prompt_tokens_total{call="question",model=' in r.text
+    tracing.reset()
+
+
+def test_disabled_tracing_writes_nothing(tmp_path):
+    calls = []
+
+    def node(state):
+        calls.append(state)
+        return {"steps": 1}
+
+    wrapped = tracing.trace_node("plan", node)
+    assert wrapped({"x": 1}) == {"steps": 1} and calls == [{"x": 1}]
+    assert tracing.start("chat") is tracing.NOOP